@@ -13,11 +13,16 @@ import time
 import random
 import os
 import threading
+import atexit
 from datetime import datetime
 from dotenv import load_dotenv
 
 from playwright.async_api import async_playwright
 from product_price import EcommerceScraper
+from scrapers.base_scraper import parse_fields
+from scrapers.canonical import product_key
+from scrapers.scraper_factory import ScraperFactory
+from scrapers.page_analysis import PAGE_ANALYZER
 
 # Import Chrome cleanup utilities
 try:
@@ -43,6 +48,10 @@ logger = logging.getLogger(__name__)
 
 # Initialize scraper
 scraper = EcommerceScraper()
+# Persist engine routing stats that have not hit the periodic save yet
+atexit.register(scraper.router.save)
+atexit.register(scraper.selector_stats.save)
+atexit.register(PAGE_ANALYZER.shutdown)
 
 # Configuration from environment variables (with defaults)
 MAX_RETRIES = int(os.getenv('MAX_RETRIES', 5))  # Maximum number of retry attempts
@@ -66,6 +75,10 @@ playwright_semaphore = threading.Semaphore(MAX_PLAYWRIGHT_INSTANCES)
 CHROME_CLEANUP_INTERVAL = int(os.getenv('CHROME_CLEANUP_INTERVAL', 300))  # Cleanup every 5 minutes
 CHROME_CLEANUP_THRESHOLD = int(os.getenv('CHROME_CLEANUP_THRESHOLD', 50))  # Cleanup if more than 50 processes
 
+# selectors.json hot reload: POST /admin/reload, plus an optional mtime poll
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')  # When set, /admin/* requires the X-Admin-Token header
+SELECTORS_WATCH_INTERVAL = float(os.getenv('SELECTORS_WATCH_INTERVAL', 0))  # Seconds between polls, 0 = off
+
 
 def default_stock_status():
     return {'in_stock': True, 'stock_status': 'unknown', 'message': None}
@@ -82,6 +95,31 @@ def get_result_stock_status(result: dict) -> dict:
     return stock
 
 
+# Response keys owned by each projectable field (price and metadata are always returned)
+FIELD_RESPONSE_KEYS = {
+    'original_price': ('original_price',),
+    'name': ('name',),
+    'image_url': ('image_url',),
+    'stock': ('stock_status', 'in_stock', 'stock_message'),
+}
+
+
+def project_fields(response: dict, fields) -> dict:
+    """Drop the response keys of fields the caller did not request (``fields=None`` keeps all)."""
+    if not fields:
+        return response
+    for field, keys in FIELD_RESPONSE_KEYS.items():
+        if field not in fields:
+            for key in keys:
+                response.pop(key, None)
+    if response.get('field_sources'):
+        response['field_sources'] = {
+            name: source for name, source in response['field_sources'].items()
+            if ('stock' if name == 'in_stock' else name) in fields
+        }
+    return response
+
+
 def run_async(coro):
     """Helper function to run async code in Flask with proper resource cleanup"""
     loop = None
@@ -140,7 +178,7 @@ def calculate_backoff_delay(attempt: int) -> float:
 
 
 async def scrape_with_retries(product_url: str, max_retries: int = MAX_RETRIES, 
-                               use_virtual_display: bool = None) -> dict:
+                               use_virtual_display: bool = None, fields: frozenset = None) -> dict:
     """
     Scrape price with retry logic until successful or max retries reached
     
@@ -148,6 +186,7 @@ async def scrape_with_retries(product_url: str, max_retries: int = MAX_RETRIES,
         product_url: Product URL to scrape
         max_retries: Maximum number of retry attempts
         use_virtual_display: Use virtual display for browser automation (defaults to DEFAULT_USE_VIRTUAL_DISPLAY)
+        fields: Limit the scrape to these fields (see scrapers.base_scraper.parse_fields); None scrapes all
         
     Returns:
         Dictionary with scraping result
@@ -175,7 +214,8 @@ async def scrape_with_retries(product_url: str, max_retries: int = MAX_RETRIES,
                         result = await scraper.scrape_product_price(
                             playwright,
                             product_url,
-                            use_virtual_display=use_virtual_display
+                            use_virtual_display=use_virtual_display,
+                            fields=fields
                         )
                         logger.info(f"Scrape completed. Success: {result.get('success')}, Price: {result.get('price')}, Status: {result.get('status')}, Error: {result.get('error')}")
                         return result
@@ -227,6 +267,7 @@ async def scrape_with_retries(product_url: str, max_retries: int = MAX_RETRIES,
                 # Last attempt failed
                 return {
                     'url': product_url,
+                    'product_key': product_key(product_url),
                     'site': scraper.identify_site(product_url),
                     'price': None,
                     'original_price': None,
@@ -243,6 +284,7 @@ async def scrape_with_retries(product_url: str, max_retries: int = MAX_RETRIES,
     logger.error(f"❌ All {max_retries} attempts failed for URL: {product_url[:80]}...")
     return {
         'url': product_url,
+        'product_key': product_key(product_url),
         'site': scraper.identify_site(product_url),
         'price': None,
         'original_price': None,
@@ -268,7 +310,8 @@ def index():
                 'description': 'Get price for a product URL',
                 'parameters': {
                     'url': 'Product URL (required)',
-                    'use_virtual_display': 'Use virtual display (optional, boolean)'
+                    'use_virtual_display': 'Use virtual display (optional, boolean)',
+                    'fields': 'Fields to scrape (optional list: price, original_price, name, image_url, stock)'
                 }
             },
             '/api/price': {
@@ -276,7 +319,8 @@ def index():
                 'description': 'Get price for a product URL (query parameter)',
                 'parameters': {
                     'url': 'Product URL (required)',
-                    'use_virtual_display': 'Use virtual display (optional, boolean)'
+                    'use_virtual_display': 'Use virtual display (optional, boolean)',
+                    'fields': 'Fields to scrape (optional, comma-separated)'
                 }
             }
         }
@@ -288,8 +332,11 @@ def get_price():
     """
     Get product price from URL with automatic retries
     
-    GET: ?url=<product_url>&use_virtual_display=false&max_retries=5
-    POST: {"url": "<product_url>", "use_virtual_display": false, "max_retries": 5}
+    GET: ?url=<product_url>&use_virtual_display=false&max_retries=5&fields=price,stock
+    POST: {"url": "<product_url>", "use_virtual_display": false, "max_retries": 5, "fields": ["price", "stock"]}
+
+    ``fields`` limits which extraction stages run and which fields the
+    response contains (price is always included); omit it for everything.
     
     Returns:
         {
@@ -313,6 +360,7 @@ def get_price():
             # Use DEFAULT_USE_VIRTUAL_DISPLAY if not specified in request
             use_virtual_display = data.get('use_virtual_display', DEFAULT_USE_VIRTUAL_DISPLAY)
             max_retries = int(data.get('max_retries', MAX_RETRIES))
+            fields_param = data.get('fields')
         else:  # GET
             product_url = request.args.get('url', '').strip()
             # Use DEFAULT_USE_VIRTUAL_DISPLAY if not specified in request
@@ -322,6 +370,7 @@ def get_price():
             else:
                 use_virtual_display = DEFAULT_USE_VIRTUAL_DISPLAY
             max_retries = int(request.args.get('max_retries', MAX_RETRIES))
+            fields_param = request.args.get('fields')
         
         # Validate URL
         if not product_url:
@@ -343,12 +392,22 @@ def get_price():
         
         # Validate max_retries
         max_retries = max(1, min(max_retries, 10))  # Clamp between 1 and 10
+
+        try:
+            fields = parse_fields(fields_param)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e),
+                'url': product_url,
+                'price': None
+            }), 400
         
         logger.info(f"📥 Request received: URL={product_url[:80]}..., max_retries={max_retries}, use_virtual_display={use_virtual_display}")
         
         # Scrape price with retries
         try:
-            result = run_async(scrape_with_retries(product_url, max_retries, use_virtual_display))
+            result = run_async(scrape_with_retries(product_url, max_retries, use_virtual_display, fields))
             
             elapsed_time = time.time() - start_time
             
@@ -367,6 +426,7 @@ def get_price():
                 response_data = {
                     'success': True,
                     'url': result['url'],
+                    'product_key': result.get('product_key'),
                     'price': result['price'],
                     'original_price': original_price,
                     'name': name,
@@ -379,17 +439,20 @@ def get_price():
                     'elapsed_time': round(elapsed_time, 2),
                     'stock_status': stock_status.get('stock_status', 'in_stock'),
                     'in_stock': stock_status.get('in_stock', True),
-                    'stock_message': stock_status.get('message')
+                    'stock_message': stock_status.get('message'),
+                    'field_sources': result.get('field_sources'),
+                    'config_version': result.get('config_version')
                 }
                 # Remove None values for cleaner JSON
                 if response_data['stock_message'] is None:
                     del response_data['stock_message']
-                return jsonify(response_data)
+                return jsonify(project_fields(response_data, fields))
             else:
                 logger.error(f"❌ Failed after {result.get('attempts', max_retries)} attempts")
-                return jsonify({
+                return jsonify(project_fields({
                     'success': False,
                     'url': result['url'],
+                    'product_key': result.get('product_key'),
                     'price': None,
                     'original_price': result.get('original_price'),
                     'site': result['site'],
@@ -401,8 +464,9 @@ def get_price():
                     'elapsed_time': round(elapsed_time, 2),
                     'stock_status': stock_status.get('stock_status', 'unknown'),
                     'in_stock': stock_status.get('in_stock', True),
-                    'stock_message': stock_status.get('message')
-                }), 404
+                    'stock_message': stock_status.get('message'),
+                    'config_version': result.get('config_version')
+                }, fields)), 404
         
         except Exception as e:
             elapsed_time = time.time() - start_time
@@ -436,7 +500,8 @@ def get_prices_batch():
         "urls": ["url1", "url2", ...], 
         "use_virtual_display": false,
         "max_retries": 5,
-        "max_concurrent": 10
+        "max_concurrent": 10,
+        "fields": ["price", "stock"]
     }
     
     Returns:
@@ -469,6 +534,14 @@ def get_prices_batch():
         use_virtual_display = data.get('use_virtual_display', DEFAULT_USE_VIRTUAL_DISPLAY)
         max_retries = int(data.get('max_retries', MAX_RETRIES))
         max_concurrent = int(data.get('max_concurrent', DEFAULT_MAX_CONCURRENT))
+        try:
+            fields = parse_fields(data.get('fields'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e),
+                'results': []
+            }), 400
         
         if not urls:
             return jsonify({
@@ -506,11 +579,13 @@ def get_prices_batch():
         
         # Scrape prices with retries (process each URL individually with retries)
         async def scrape_batch_with_retries():
+            # Expand all short links concurrently first; each scrape then hits the redirect cache
+            await scraper.url_resolver.resolve_many(valid_urls)
             semaphore = asyncio.Semaphore(max_concurrent)
             
             async def scrape_one(url):
                 async with semaphore:
-                    return await scrape_with_retries(url, max_retries, use_virtual_display)
+                    return await scrape_with_retries(url, max_retries, use_virtual_display, fields)
             
             tasks = [scrape_one(url) for url in valid_urls]
             return await asyncio.gather(*tasks, return_exceptions=True)
@@ -524,9 +599,10 @@ def get_prices_batch():
         
         for i, result in enumerate(results):
             if isinstance(result, Exception):
-                formatted_results.append({
+                formatted_results.append(project_fields({
                     'success': False,
                     'url': valid_urls[i] if i < len(valid_urls) else 'unknown',
+                    'product_key': product_key(valid_urls[i]) if i < len(valid_urls) else None,
                     'price': None,
                     'original_price': None,
                     'site': 'unknown',
@@ -535,7 +611,7 @@ def get_prices_batch():
                     'attempts': max_retries,
                     'retried': True,
                     'error': str(result)
-                })
+                }, fields))
                 failed_count += 1
             else:
                 success = result.get('price') and result['price'] != 'N/A' and result['price'] is not None
@@ -555,6 +631,7 @@ def get_prices_batch():
                 formatted_result = {
                     'success': success,
                     'url': result.get('url', valid_urls[i] if i < len(valid_urls) else 'unknown'),
+                    'product_key': result.get('product_key'),
                     'price': result.get('price') if result.get('price') != 'N/A' else None,
                     'original_price': original_price,
                     'name': name,
@@ -565,11 +642,13 @@ def get_prices_batch():
                     'attempts': result.get('attempts', 1),
                     'retried': result.get('retried', False),
                     'stock_status': stock_status.get('stock_status', 'unknown'),
-                    'in_stock': stock_status.get('in_stock', True)
+                    'in_stock': stock_status.get('in_stock', True),
+                    'field_sources': result.get('field_sources'),
+                    'config_version': result.get('config_version')
                 }
                 if stock_status.get('message'):
                     formatted_result['stock_message'] = stock_status.get('message')
-                formatted_results.append(formatted_result)
+                formatted_results.append(project_fields(formatted_result, fields))
         
         elapsed_time = time.time() - start_time
         logger.info(f"✅ Batch complete: {success_count} success, {failed_count} failed in {elapsed_time:.2f}s")
@@ -616,10 +695,60 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.utcnow().isoformat(),
-        'service': 'price-scraper-api'
+        'service': 'price-scraper-api',
+        'selenium_pool': scraper.driver_pool.stats(),
+        'undetected_pool': scraper.undetected_pool.stats(),
+        'site_slots': scraper.site_limiter.stats(),
+        'page_analysis': PAGE_ANALYZER.stats()
     })
 
 
+@app.route('/api/stats/selectors', methods=['GET'])
+def selector_stats():
+    """
+    Selector hit rates, per-field source shares and likely broken selectors
+
+    GET: ?site=<site_name> (optional)
+    """
+    site = request.args.get('site', '').strip() or None
+    return jsonify(scraper.selector_stats.snapshot(site))
+
+
+@app.route('/admin/reload', methods=['POST'])
+def reload_selectors():
+    """
+    Re-read selectors.json and swap in the compiled per-site plans without a restart
+
+    The new file is validated first; an invalid file is rejected with 400 and
+    the running config is kept. Scrapes already in flight finish on the old
+    config; every result reports the ``config_version`` it was scraped with.
+    """
+    if ADMIN_TOKEN and request.headers.get('X-Admin-Token') != ADMIN_TOKEN:
+        return jsonify({'success': False, 'error': 'Invalid admin token'}), 403
+    try:
+        reloaded = ScraperFactory.reload()
+    except ValueError as e:
+        logger.error(f"❌ Selectors reload rejected: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'version': ScraperFactory.config_version()
+        }), 400
+    logger.info(f"🔄 Selectors config {reloaded['previous_version']} -> {reloaded['version']}")
+    return jsonify({'success': True, **reloaded})
+
+
+def watch_selectors(interval: float):
+    """Poll selectors.json and hot-reload it when it changes"""
+    def run():
+        while True:
+            time.sleep(interval)
+            ScraperFactory.reload_if_changed()
+
+    ScraperFactory.reload_if_changed()  # Record the current mtime
+    threading.Thread(target=run, name='selectors-watch', daemon=True).start()
+
+
 if __name__ == '__main__':
     import os
     
@@ -639,6 +768,8 @@ if __name__ == '__main__':
     print("\nAPI Endpoints:")
     print("  GET/POST  /api/price       - Get price for a single product URL (with retries)")
     print("  POST      /api/price/batch - Get prices for multiple product URLs (with retries)")
+    print("  GET       /api/stats/selectors - Selector hit rates and broken selectors")
+    print("  POST      /admin/reload    - Reload selectors.json without a restart")
     print("  GET       /health          - Health check endpoint")
     print("\nBatch Configuration:")
     print(f"  max_concurrent: 1-{MAX_MAX_CONCURRENT} (default: {DEFAULT_MAX_CONCURRENT}, max: {MAX_MAX_CONCURRENT} concurrent requests)")
@@ -674,6 +805,14 @@ if __name__ == '__main__':
     print(f"Logging level: {logging.getLevelName(logger.level)}")
     print("=" * 70)
     
+    if os.getenv('SELENIUM_POOL_WARM', 'false').lower() == 'true':
+        warmed = run_async(scraper.driver_pool.warm())
+        logger.info(f"Pre-started {warmed} Selenium sessions")
+
+    if SELECTORS_WATCH_INTERVAL > 0:
+        watch_selectors(SELECTORS_WATCH_INTERVAL)
+        logger.info(f"Watching selectors.json every {SELECTORS_WATCH_INTERVAL:g}s")
+
     logger.info("🚀 Starting Price Scraper API server")
     
     app.run(debug=debug_mode, host=host, port=port, threaded=True)
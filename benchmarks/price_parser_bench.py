@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark: scrapers.prices against the previous per-call regex helpers.
+
+Usage:
+    python benchmarks/price_parser_bench.py [page.html | corpus_dir ...] [--repeat 10]
+
+Runs the whole-page MRP scan and per-element price cleaning over each saved
+page (directories are searched for *.html). Without arguments a synthetic
+corpus of product pages is generated. Save real pages with
+SAVE_SCRAPED_HTML=true (last_scraped_page.html).
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers import prices  # noqa: E402
+
+
+# ── Previous implementation (BaseScraper before scrapers.prices), kept for comparison ──
+
+def legacy_clean_price(price_str):
+    if not price_str:
+        return "N/A"
+    cleaned = re.sub(r'[^\d.,]', '', price_str)
+    if cleaned.count('.') > 1:
+        parts = cleaned.split('.')
+        cleaned = "".join(parts[:-1]) + "." + parts[-1]
+    return cleaned.strip().strip(',.')
+
+
+def legacy_is_valid(price_str):
+    try:
+        float(price_str.replace(',', ''))
+        return bool(price_str) and price_str != "N/A"
+    except ValueError:
+        return False
+
+
+def legacy_price_candidates(text):
+    candidates = []
+    for pattern in [r'(?:₹|Rs\.?|INR)\s*([\d,]+(?:\.\d{1,2})?)', r'([\d,]+(?:\.\d{1,2})?)\s*(?:₹|Rs\.?|INR)']:
+        for match in re.findall(pattern, text, flags=re.IGNORECASE):
+            cleaned = legacy_clean_price(match)
+            if legacy_is_valid(cleaned):
+                candidates.append(cleaned)
+    if not candidates:
+        cleaned = legacy_clean_price(text)
+        if legacy_is_valid(cleaned):
+            candidates.append(cleaned)
+    return candidates
+
+
+def legacy_original_price_candidates(content):
+    candidates = []
+    label = (
+        r'MRP|M\.R\.P\.?|List Price|Original Price|Regular Price|'
+        r'Maximum Retail Price|Retail Price|Was|Compare(?: At)? Price'
+    )
+    keys = r'mrp|MRP|maximumRetailPrice|retailPrice|originalPrice|strikeOffPrice|listPrice|regularPrice|compareAtPrice'
+    patterns = [
+        rf'(?:{label})[^₹\d]{{0,120}}(?:₹|Rs\.?|INR)?\s*([\d,]+(?:\.\d{{1,2}})?)',
+        rf'(?:₹|Rs\.?|INR)\s*([\d,]+(?:\.\d{{1,2}})?)[^<]{{0,120}}(?:{label})',
+        rf'"(?:{keys})"\s*:\s*"?(?:₹|Rs\.?|INR)?\s*([\d,]+(?:\.\d{{1,2}})?)',
+        rf"'(?:{keys})'\s*:\s*'?(?:₹|Rs\.?|INR)?\s*([\d,]+(?:\.\d{{1,2}})?)",
+    ]
+    for pattern in patterns:
+        for match in re.findall(pattern, content, flags=re.IGNORECASE):
+            cleaned = legacy_clean_price(match)
+            if legacy_is_valid(cleaned):
+                candidates.append(cleaned)
+    return candidates
+
+
+# ── Corpus ──
+
+ELEMENT_TEXTS = [
+    '₹1,299', '₹1,299₹2,49948% off', 'Rs. 499', 'MRP ₹1,29,999 (incl. of all taxes)', '₹ 499 – ₹ 999',
+    '₹49.90/100 ml', '1,299', 'Special price ₹5,682.00', '499/-', 'INR 12,499.50',
+]
+
+
+def synthetic_page(index: int) -> str:
+    price = 499 + index * 37
+    state = ','.join(
+        f'{{"sku":"S{i}","price":{price + i},"mrp":{price * 2 + i},"title":"Variant {i}","rating":4.{i % 10}}}'
+        for i in range(4000)
+    )
+    recos = ''.join(f'<div class="card"><span>₹{price + i:,}</span><s>MRP ₹{price * 2 + i:,}</s></div>'
+                    for i in range(300))
+    return (f'<html><head><script>window.__STATE__={{"variants":[{state}]}}</script></head><body>'
+            f'<h1>Product {index}</h1><div class="pdp-price">₹{price:,}</div>'
+            f'<div class="pdp-mrp">MRP ₹{price * 2:,}</div>{recos}</body></html>')
+
+
+def load_corpus(paths):
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, '*.html'))) if os.path.isdir(path) else [path])
+    return [(f, open(f, encoding='utf-8', errors='replace').read()) for f in files]
+
+
+def bench(label, fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return label, (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='*', help='saved HTML pages or directories of them (default: synthetic)')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.paths) or [(f'synthetic-{i}', synthetic_page(i)) for i in range(5)]
+    total_mb = sum(len(html) for _, html in corpus) / 1024 / 1024
+    print(f"{len(corpus)} pages, {total_mb:.1f} MB, {args.repeat} runs each\n")
+
+    rows = [
+        bench('MRP scan, legacy (4 passes)',
+              lambda: [legacy_original_price_candidates(html) for _, html in corpus], args.repeat),
+        bench('MRP scan, prices (1 pass)',
+              lambda: [prices.original_price_candidates(html) for _, html in corpus], args.repeat),
+        bench('element texts x1000, legacy',
+              lambda: [legacy_price_candidates(t) for _ in range(100) for t in ELEMENT_TEXTS], args.repeat),
+        bench('element texts x1000, prices',
+              lambda: [prices.price_candidates(t) for _ in range(100) for t in ELEMENT_TEXTS], args.repeat),
+    ]
+    for label, elapsed, _ in rows:
+        print(f"  {label:<32} {elapsed * 1000:9.2f} ms")
+
+    print("\nElement text parsing (legacy -> prices):")
+    for text in ELEMENT_TEXTS:
+        print(f"  {text!r:<40} {legacy_price_candidates(text)!s:<28} {prices.price_candidates(text)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: out-of-stock phrase scan, per-phrase substring loop vs PhraseMatcher.
+
+Usage:
+    python benchmarks/stock_matcher_bench.py [saved_page.html ...] [--site flipkart] [--repeat 20]
+
+Without page files a synthetic ~4 MB product page (large hydration/analytics
+scripts around a small product area) is generated. Save real pages with
+SAVE_SCRAPED_HTML=true (last_scraped_page.html) to benchmark those instead.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.scraper_factory import ScraperFactory  # noqa: E402
+
+
+def synthetic_page(size_mb: float = 4.0) -> str:
+    """Product page shaped like a modern SPA: mostly script payloads, little visible text."""
+    product = (
+        '<div id="product-details"><h1>Men Slim Fit Cotton Shirt</h1>'
+        '<div class="price">₹1,299</div><div class="mrp">MRP ₹2,499</div>'
+        '<button>Add to bag</button></div>'
+    )
+    chunk = ('{"sku":"A1","sizes":[{"label":"M","available":true},{"label":"XL","stock":"sold out"}],'
+             '"copy":"Notify me when this size is back. Currently unavailable sizes are hidden."}')
+    script = '<script>window.__STATE__=[' + ','.join([chunk] * int(size_mb * 1024 * 1024 / len(chunk))) + ']</script>'
+    filler = '<div class="reco"><a href="/p/1">Similar product</a><span>₹799</span></div>' * 2000
+    return f'<html><head>{script}</head><body>{product}{filler}</body></html>'
+
+
+def naive_scan(content: str, phrases) -> str:
+    """The previous check_stock_status loop: lowercase the page, one substring scan per phrase."""
+    content_lower = content.lower()
+    for phrase in phrases:
+        if phrase in content_lower:
+            return phrase
+    return None
+
+
+def bench(label: str, fn, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        found = fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<34} {elapsed * 1000:9.2f} ms   hit: {found!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pages', nargs='*', help='saved HTML pages (default: synthetic page)')
+    parser.add_argument('--site', default='flipkart', help='site whose out-of-stock phrases to use')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    plan = ScraperFactory.scraper_for_site(args.site).plan
+    pages = [(path, open(path, encoding='utf-8', errors='replace').read()) for path in args.pages] or \
+        [('synthetic', synthetic_page())]
+
+    print(f"{len(plan.stock_phrases)} {args.site} phrases, {args.repeat} runs each")
+    for name, content in pages:
+        print(f"\n{name} ({len(content) / 1024 / 1024:.1f} MB)")
+        bench('per-phrase loop (whole HTML)', lambda: naive_scan(content, plan.stock_phrases), args.repeat)
+        bench('matcher (whole HTML)', lambda: plan.stock_matcher.search(content), args.repeat)
+        bench('matcher (visible spans only)', lambda: plan.stock_matcher.search_visible(content), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
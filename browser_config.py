@@ -2,6 +2,10 @@
 Enhanced anti-bot configuration for Playwright and Selenium.
 Helps bypass Amazon, Flipkart, and other aggressive bot detection.
 """
+import os
+from typing import Dict, List, Optional, Tuple
+
+from scrapers.scraper_factory import ScraperFactory
 
 # Playwright browser arguments to mask automation
 PLAYWRIGHT_ARGS = [
@@ -26,6 +30,12 @@ SELENIUM_ARGS = [
     "--disable-web-security",
 ]
 
+# Selenium returns from driver.get() at DOMContentLoaded ("eager") and never
+# waits implicitly on element lookups; the scraper does one explicit
+# readiness wait per page instead (BaseScraper.wait_for_page_ready).
+SELENIUM_PAGE_LOAD_STRATEGY = os.getenv('SELENIUM_PAGE_LOAD_STRATEGY', 'eager')
+SELENIUM_IMPLICIT_WAIT = float(os.getenv('SELENIUM_IMPLICIT_WAIT', 0))
+
 # Playwright context options (realistic browser fingerprint)
 PLAYWRIGHT_CONTEXT_OPTIONS = {
     "locale": "en-IN",
@@ -69,3 +79,116 @@ Object.defineProperty(navigator, 'languages', {
     get: () => ['en-US', 'en', 'hi']
 });
 """
+
+GOOGLEBOT_UA = "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"
+
+# Default Playwright navigation timeout (ms)
+DEFAULT_NAVIGATION_TIMEOUT = 30000
+
+
+class BrowserProfile:
+    """
+    Launch args, context options, UA and stealth scripts for one kind of
+    Playwright session.
+
+    A profile is applied once when a context is created (stealth and init
+    scripts are registered on the context, so every page in it inherits
+    them) instead of per page on the hot path.
+    """
+
+    def __init__(self, name: str, launch_args: List[str] = None, context_options: Dict = None,
+                 user_agent: Optional[str] = None, init_scripts: List[str] = None,
+                 stealth: bool = True, navigation_timeout: int = DEFAULT_NAVIGATION_TIMEOUT,
+                 wait_until: str = 'domcontentloaded'):
+        """
+        Args:
+            name: Profile name, for logs
+            launch_args: Chromium command-line args
+            context_options: Extra ``browser.new_context()`` options
+            user_agent: Fixed UA; None rotates through the scraper's desktop UAs
+            init_scripts: Scripts added to the context before any page script runs
+            stealth: Apply playwright-stealth to the context
+            navigation_timeout: ``page.goto`` timeout in ms
+            wait_until: ``page.goto`` load state to wait for
+        """
+        self.name = name
+        self.launch_args = list(launch_args if launch_args is not None else PLAYWRIGHT_ARGS)
+        self.context_options = dict(context_options if context_options is not None else PLAYWRIGHT_CONTEXT_OPTIONS)
+        self.user_agent = user_agent
+        self.init_scripts = list(init_scripts if init_scripts is not None else [STEALTH_JS])
+        self.stealth = stealth
+        self.navigation_timeout = navigation_timeout
+        self.wait_until = wait_until
+
+    def launch_options(self, headless: bool) -> Dict:
+        return {'headless': headless, 'args': list(self.launch_args)}
+
+    def new_context_options(self, user_agent: Optional[str] = None) -> Dict:
+        """Options for ``browser.new_context()``; the profile's fixed UA wins over ``user_agent``."""
+        options = dict(self.context_options)
+        ua = self.user_agent or user_agent
+        if ua:
+            options['user_agent'] = ua
+        return options
+
+    def override(self, name: str = None, **changes) -> 'BrowserProfile':
+        """Return a copy with some fields replaced (``context_options`` are merged)."""
+        context_options = dict(self.context_options)
+        context_options.update(changes.pop('context_options', {}))
+        fields = {
+            'launch_args': self.launch_args,
+            'context_options': context_options,
+            'user_agent': self.user_agent,
+            'init_scripts': self.init_scripts,
+            'stealth': self.stealth,
+            'navigation_timeout': self.navigation_timeout,
+            'wait_until': self.wait_until,
+        }
+        fields.update(changes)
+        return BrowserProfile(name or self.name, **fields)
+
+
+DESKTOP_PROFILE = BrowserProfile(
+    'desktop',
+    context_options=dict(PLAYWRIGHT_CONTEXT_OPTIONS, viewport={'width': 1920, 'height': 1080}),
+)
+
+# UA profiles the engine router chooses between
+UA_PROFILES = {
+    'desktop': DESKTOP_PROFILE,
+    'googlebot': DESKTOP_PROFILE.override('googlebot', user_agent=GOOGLEBOT_UA),
+}
+
+# Memoised per selectors config version (a reload may change site navigation policy)
+_profiles: Dict[Tuple[str, str], BrowserProfile] = {}
+_profiles_version = None
+
+
+def site_profile_overrides(site: str) -> Dict:
+    """BrowserProfile overrides from the site's navigation policy (selectors.json "site.navigation")."""
+    config = ScraperFactory.site_config(site)
+    overrides = {}
+    if config.navigation_timeout is not None:
+        overrides['navigation_timeout'] = config.navigation_timeout
+    if config.wait_until != 'domcontentloaded':
+        overrides['wait_until'] = config.wait_until
+    if not config.javascript:
+        overrides['context_options'] = {'java_script_enabled': False}
+    return overrides
+
+
+def get_browser_profile(site: str, ua_profile: str = 'desktop') -> BrowserProfile:
+    """Return the (memoised) profile for a site and routing UA profile."""
+    global _profiles_version
+    version = ScraperFactory.config_version()
+    if version != _profiles_version:
+        _profiles.clear()
+        _profiles_version = version
+    key = (site, ua_profile)
+    profile = _profiles.get(key)
+    if profile is None:
+        base = UA_PROFILES.get(ua_profile, DESKTOP_PROFILE)
+        overrides = site_profile_overrides(site)
+        profile = base.override(f"{base.name}:{site}", **overrides) if overrides else base
+        _profiles[key] = profile
+    return profile
@@ -0,0 +1,201 @@
+"""
+Warm pool of Selenium/ChromeDriver sessions.
+
+Starting chromedriver + Chrome costs several seconds, and Myntra/Nykaa go
+straight to Selenium on every request. The pool keeps a few idle sessions
+alive, resets them between uses (cookies, storage, fresh window) and
+recycles a session after N uses or once its process tree grows past an RSS
+limit.
+
+The pool is shared by every Flask request thread (each runs its own event
+loop), so it is guarded by a threading lock rather than asyncio primitives.
+All WebDriver calls go through the bounded Selenium executor.
+"""
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, List, Optional
+
+from scrapers.browser_adapter import run_blocking
+
+try:
+    import psutil
+except ImportError:  # RSS-based recycling is skipped without psutil
+    psutil = None
+
+
+SELENIUM_POOL_SIZE = int(os.getenv('SELENIUM_POOL_SIZE', 2))
+SELENIUM_POOL_MAX_USES = int(os.getenv('SELENIUM_POOL_MAX_USES', 25))
+SELENIUM_POOL_MAX_RSS_MB = int(os.getenv('SELENIUM_POOL_MAX_RSS_MB', 1500))
+
+RESET_STORAGE_JS = "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+
+
+class PooledDriver:
+    """A WebDriver session plus the bookkeeping used to decide when to recycle it."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.monotonic()
+
+
+class DriverPool:
+    """Keeps up to ``size`` idle, pre-started WebDriver sessions ready for reuse."""
+
+    def __init__(self, factory: Callable, size: int = SELENIUM_POOL_SIZE,
+                 max_uses: int = SELENIUM_POOL_MAX_USES,
+                 max_rss_mb: int = SELENIUM_POOL_MAX_RSS_MB):
+        """
+        Args:
+            factory: Blocking callable that starts and returns a new WebDriver
+            size: Maximum number of idle sessions kept warm
+            max_uses: Recycle a session after this many scrapes
+            max_rss_mb: Recycle a session whose process tree exceeds this RSS
+        """
+        self._factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self._idle: List[PooledDriver] = []
+        self._lock = threading.Lock()
+        self.started = 0
+        self.reused = 0
+        self.recycled = 0
+
+    # ── Acquire / Release ──
+
+    async def acquire(self) -> PooledDriver:
+        """Take an idle session, or cold-start one if none is waiting."""
+        with self._lock:
+            pooled = self._idle.pop() if self._idle else None
+        if pooled:
+            self.reused += 1
+            return pooled
+
+        driver = await run_blocking(self._factory)
+        self.started += 1
+        return PooledDriver(driver)
+
+    async def release(self, pooled: PooledDriver, healthy: bool = True) -> None:
+        """Reset a session and return it to the pool, or quit it if it should be recycled."""
+        pooled.uses += 1
+        if healthy and not self._should_recycle(pooled):
+            try:
+                await run_blocking(self._reset, pooled.driver)
+                with self._lock:
+                    if len(self._idle) < self.size:
+                        self._idle.append(pooled)
+                        return
+            except Exception as e:
+                print(f"  Could not reset pooled Selenium session: {e}")
+
+        self.recycled += 1
+        await self._quit(pooled)
+
+    @asynccontextmanager
+    async def session(self):
+        """
+        Borrow a driver for one scrape.
+
+        The session goes back to the pool unless the block raised, in which
+        case it is assumed broken and quit.
+        """
+        pooled = await self.acquire()
+        healthy = False
+        try:
+            yield pooled.driver
+            healthy = True
+        finally:
+            await self.release(pooled, healthy=healthy)
+
+    # ── Lifecycle ──
+
+    async def warm(self) -> int:
+        """Pre-start sessions until the pool holds ``size`` idle drivers. Returns how many were started."""
+        started = 0
+        while True:
+            with self._lock:
+                if len(self._idle) >= self.size:
+                    return started
+            try:
+                driver = await run_blocking(self._factory)
+            except Exception as e:
+                print(f"  Could not pre-start Selenium session: {e}")
+                return started
+            self.started += 1
+            started += 1
+            with self._lock:
+                self._idle.append(PooledDriver(driver))
+
+    async def close(self) -> None:
+        """Quit every idle session."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            await self._quit(pooled)
+
+    def stats(self) -> dict:
+        with self._lock:
+            idle = len(self._idle)
+        return {
+            'idle': idle,
+            'size': self.size,
+            'started': self.started,
+            'reused': self.reused,
+            'recycled': self.recycled,
+        }
+
+    # ── Internals ──
+
+    def _should_recycle(self, pooled: PooledDriver) -> bool:
+        if pooled.uses >= self.max_uses:
+            return True
+        rss_mb = self._rss_mb(pooled.driver)
+        return rss_mb is not None and rss_mb > self.max_rss_mb
+
+    def _rss_mb(self, driver) -> Optional[float]:
+        """Resident memory of chromedriver and its Chrome children, in MB."""
+        if psutil is None:
+            return None
+        try:
+            root = psutil.Process(driver.service.process.pid)
+            processes = [root] + root.children(recursive=True)
+            total = 0
+            for proc in processes:
+                try:
+                    total += proc.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            return total / (1024 * 1024)
+        except Exception:
+            return None
+
+    def _reset(self, driver) -> None:
+        """Clear cookies and storage and leave a single fresh blank window (blocking)."""
+        try:
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            origin = driver.execute_script("return window.location.origin")
+            if origin and origin.startswith('http'):
+                driver.execute_cdp_cmd('Storage.clearDataForOrigin', {
+                    'origin': origin,
+                    'storageTypes': 'all'
+                })
+        except Exception:
+            driver.delete_all_cookies()
+        driver.execute_script(RESET_STORAGE_JS)
+
+        stale_handles = list(driver.window_handles)
+        driver.switch_to.new_window('tab')
+        fresh_handle = driver.current_window_handle
+        for handle in stale_handles:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(fresh_handle)
+
+    async def _quit(self, pooled: PooledDriver) -> None:
+        try:
+            await run_blocking(pooled.driver.quit)
+        except Exception as e:
+            print(f"  Could not quit Selenium driver: {e}")
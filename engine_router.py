@@ -0,0 +1,179 @@
+"""
+Adaptive engine routing.
+
+Records the outcome and latency of every scrape attempt per
+(site, method, UA profile) and starts each scrape with the strategy that has
+the lowest recent cost per successful price. A small exploration rate keeps
+trying the other strategies so routing adapts when a retailer changes its
+bot defences. Stats decay exponentially (recent attempts weigh more) and are
+persisted to a JSON file so they survive restarts.
+
+Until a site has enough history its registry entry (selectors.json
+"site.engine" / "site.ua_profile") is the prior: Myntra/Nykaa go straight to
+Selenium and Meesho/Ajio/Nykaa use the Googlebot UA on Playwright. Among
+untried strategies, the site's UA profile is preferred for Playwright.
+"""
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from scrapers.scraper_factory import ScraperFactory
+from state_dir import ensure_parent, state_path
+
+
+ENGINE_STATS_PATH = os.getenv('ENGINE_STATS_PATH', state_path('engine_stats.json'))
+ROUTER_EXPLORE_RATE = float(os.getenv('ROUTER_EXPLORE_RATE', 0.1))
+ROUTER_MIN_ATTEMPTS = float(os.getenv('ROUTER_MIN_ATTEMPTS', 3))
+ROUTER_DECAY = float(os.getenv('ROUTER_DECAY', 0.95))
+ROUTER_SAVE_INTERVAL = float(os.getenv('ROUTER_SAVE_INTERVAL', 30))
+
+# (method, UA profile) pairs the engine knows how to run. "undetected" is
+# Selenium on undetected-chromedriver (patched driver binary, no automation
+# flags), pooled like plain Selenium; it is only routed to when installed.
+STRATEGIES: List[Tuple[str, str]] = [
+    ('playwright', 'desktop'),
+    ('playwright', 'googlebot'),
+    ('selenium', 'desktop'),
+    ('undetected', 'desktop'),
+]
+
+# Assumed cost of a strategy that never succeeded (seconds per successful price)
+FAILURE_COST = 1e6
+
+
+def _key(site: str, method: str, ua_profile: str) -> str:
+    return f"{site}|{method}|{ua_profile}"
+
+
+class EngineRouter:
+    """Chooses the scrape strategy order per site from decayed outcome stats."""
+
+    def __init__(self, path: Optional[str] = ENGINE_STATS_PATH,
+                 explore_rate: float = ROUTER_EXPLORE_RATE,
+                 min_attempts: float = ROUTER_MIN_ATTEMPTS,
+                 decay: float = ROUTER_DECAY,
+                 save_interval: float = ROUTER_SAVE_INTERVAL,
+                 strategies: Optional[List[Tuple[str, str]]] = None):
+        """
+        Args:
+            path: JSON file the stats are loaded from and saved to (None disables persistence)
+            explore_rate: Probability of starting with a non-best strategy
+            min_attempts: Decayed attempt count needed before a strategy's stats are trusted
+            decay: Weight kept by older observations each time a new one is recorded
+            save_interval: Minimum seconds between automatic saves
+            strategies: Strategies available in this process (defaults to STRATEGIES)
+        """
+        self.path = path
+        self.explore_rate = explore_rate
+        self.min_attempts = min_attempts
+        self.decay = decay
+        self.save_interval = save_interval
+        self.strategies = list(strategies or STRATEGIES)
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        self._dirty = False
+        self._rng = random.Random()
+        self.load()
+
+    # ── Routing ──
+
+    def plan(self, site: str) -> List[Tuple[str, str]]:
+        """
+        Return the strategies to try for ``site``, in order.
+
+        The first entry is the best (or an exploration pick); the second is
+        the best strategy using the other engine, used as the fallback.
+        """
+        ranked = self.rank(site)
+        first = ranked[0]
+        if len(ranked) > 1 and self._rng.random() < self.explore_rate:
+            first = self._rng.choice(ranked[1:])
+
+        fallback = next((strategy for strategy in ranked if strategy[0] != first[0]), None)
+        return [first, fallback] if fallback else [first]
+
+    def rank(self, site: str) -> List[Tuple[str, str]]:
+        """All strategies for ``site`` ordered by cost per successful price (best first)."""
+        config = ScraperFactory.site_config(site)
+        prior = config.prior_strategy
+
+        def sort_key(strategy):
+            cost = self.cost(site, *strategy)
+            trusted = cost is not None
+            return (
+                0 if trusted else 1,
+                cost if trusted else 0,
+                0 if strategy == prior else 1 if strategy[1] == config.ua_profile else 2,
+                self.strategies.index(strategy),
+            )
+
+        return sorted(self.strategies, key=sort_key)
+
+    def cost(self, site: str, method: str, ua_profile: str) -> Optional[float]:
+        """Mean seconds per successful price, or None without enough attempts."""
+        with self._lock:
+            entry = self._stats.get(_key(site, method, ua_profile))
+            if not entry or entry['attempts'] < self.min_attempts:
+                return None
+            attempts, successes, seconds = entry['attempts'], entry['successes'], entry['seconds']
+        if successes <= 0:
+            return FAILURE_COST
+        return (seconds / attempts) / (successes / attempts)
+
+    # ── Recording ──
+
+    def record(self, site: str, method: str, ua_profile: str, success: bool, seconds: float) -> None:
+        """Record one attempt's outcome and latency."""
+        with self._lock:
+            entry = self._stats.setdefault(
+                _key(site, method, ua_profile),
+                {'attempts': 0.0, 'successes': 0.0, 'seconds': 0.0}
+            )
+            entry['attempts'] = entry['attempts'] * self.decay + 1
+            entry['successes'] = entry['successes'] * self.decay + (1 if success else 0)
+            entry['seconds'] = entry['seconds'] * self.decay + seconds
+            entry['updated_at'] = time.time()
+            self._dirty = True
+            due = time.monotonic() - self._last_save >= self.save_interval
+        if due:
+            self.save()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {key: dict(entry) for key, entry in self._stats.items()}
+
+    # ── Persistence ──
+
+    def load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock:
+                self._stats = data.get('stats', {})
+        except Exception as e:
+            print(f"Warning: Could not load engine stats from {self.path}: {e}")
+
+    def save(self) -> None:
+        """Write stats atomically (temp file + rename) if anything changed."""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {'version': 1, 'stats': {key: dict(entry) for key, entry in self._stats.items()}}
+            self._dirty = False
+            self._last_save = time.monotonic()
+        tmp_path = f"{self.path}.tmp"
+        try:
+            ensure_parent(self.path)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Warning: Could not save engine stats to {self.path}: {e}")
@@ -0,0 +1,53 @@
+"""
+Per-site latency history for scrape attempts.
+
+Hedged execution uses it to decide how long a Playwright attempt may run
+before a parallel Selenium attempt is started: once an attempt is slower
+than, say, the p80 of that site's recent successful attempts it is likely
+stuck behind a firewall or a 30s goto timeout.
+"""
+import os
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Optional, Tuple
+
+
+LATENCY_WINDOW = int(os.getenv('LATENCY_WINDOW', 50))
+HEDGE_MIN_SAMPLES = int(os.getenv('HEDGE_MIN_SAMPLES', 5))
+HEDGE_QUANTILE = float(os.getenv('HEDGE_QUANTILE', 0.8))
+HEDGE_DEFAULT_DELAY = float(os.getenv('HEDGE_DEFAULT_DELAY', 12))
+HEDGE_MIN_DELAY = float(os.getenv('HEDGE_MIN_DELAY', 2))
+
+
+class LatencyHistory:
+    """Rolling window of successful attempt durations per (site, method)."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples: Dict[Tuple[str, str], deque] = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def record(self, site: str, method: str, seconds: float) -> None:
+        with self._lock:
+            self._samples[(site, method)].append(seconds)
+
+    def count(self, site: str, method: str) -> int:
+        with self._lock:
+            return len(self._samples.get((site, method), ()))
+
+    def quantile(self, site: str, method: str, q: float,
+                 min_samples: int = HEDGE_MIN_SAMPLES) -> Optional[float]:
+        """Return the q-quantile (0..1) of recent durations, or None with too few samples."""
+        with self._lock:
+            samples = sorted(self._samples.get((site, method), ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        index = min(len(samples) - 1, max(0, int(round(q * (len(samples) - 1)))))
+        return samples[index]
+
+    def hedge_delay(self, site: str, method: str = 'playwright',
+                    q: float = HEDGE_QUANTILE) -> float:
+        """Seconds to wait for ``method`` before starting a hedge attempt."""
+        delay = self.quantile(site, method, q)
+        if delay is None:
+            return HEDGE_DEFAULT_DELAY
+        return max(HEDGE_MIN_DELAY, delay)
@@ -4,9 +4,7 @@ import sys
 import threading
 import time
 import random
-import requests
 from urllib.parse import urlparse
-from concurrent.futures import ThreadPoolExecutor
 
 # Browser automation
 from playwright.async_api import async_playwright, Page
@@ -15,14 +13,42 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 
+try:
+    import undetected_chromedriver as uc
+except ImportError:  # The "undetected" engine is left out of routing without it
+    uc = None
+
 # Internal modules
 from scrapers.scraper_factory import ScraperFactory
-from scrapers.browser_adapter import BrowserAdapter
+from scrapers.canonical import canonicalize_url, product_key
+from scrapers.api_capture import ApiResponseCapture
+from scrapers.confidence import SOURCE_CONFIDENCE
+from scrapers.browser_adapter import SELENIUM_BACKENDS, BrowserAdapter, run_blocking
 from playwright_stealth import stealth_async
-from browser_config import PLAYWRIGHT_ARGS, PLAYWRIGHT_CONTEXT_OPTIONS, STEALTH_JS, SELENIUM_ARGS
+from browser_config import (
+    SELENIUM_ARGS, SELENIUM_IMPLICIT_WAIT, SELENIUM_PAGE_LOAD_STRATEGY, BrowserProfile, get_browser_profile
+)
+from driver_pool import DriverPool
+from engine_stats import LatencyHistory
+from engine_router import STRATEGIES, EngineRouter
+from selector_stats import SelectorStats
+from url_resolver import ShortUrlResolver
+from session_store import SessionStore, looks_blocked
+from site_limits import SiteLimiter
+
+# Hedged Playwright/Selenium execution (see EcommerceScraper._hedged_scrape)
+HEDGE_ENABLED = os.getenv('HEDGE_ENABLED', 'false').lower() == 'true'
+HEDGE_SITES = [s.strip() for s in os.getenv('HEDGE_SITES', 'ajio,meesho,flipkart').split(',') if s.strip()]
+
+# Warm undetected-chromedriver sessions (the "undetected" engine)
+UNDETECTED_POOL_SIZE = int(os.getenv('UNDETECTED_POOL_SIZE', 1))
 
 
 class EcommerceScraper:
+    # ChromeDriver path is resolved once per process (walking ~/.wdm is slow)
+    _chromedriver_path = None
+    _chromedriver_lock = threading.Lock()
+
     def __init__(self):
         # List of realistic user agents to rotate
         self.user_agents = [
@@ -32,6 +58,28 @@ class EcommerceScraper:
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0",
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15",
         ]
+        # Warm Selenium sessions reused across fallbacks
+        self.driver_pool = DriverPool(self._start_chrome_driver)
+        # Warm undetected-chromedriver sessions, for sites that block plain ChromeDriver
+        self.undetected_pool = DriverPool(self._start_undetected_driver, size=UNDETECTED_POOL_SIZE)
+        self.driver_pools = {'selenium': self.driver_pool, 'undetected': self.undetected_pool}
+        # Successful attempt latencies, used to time hedge attempts
+        self.latency = LatencyHistory()
+        # Per-site strategy choice from persisted outcome stats
+        self.router = EngineRouter(strategies=[
+            strategy for strategy in STRATEGIES if strategy[0] != 'undetected' or uc is not None
+        ])
+        # Short links are expanded over HTTP (with a persistent cache), not by the browser
+        self.url_resolver = ShortUrlResolver()
+        # Cookies/storage from earlier successful sessions, per site
+        self.session_store = SessionStore()
+        # Per-site in-flight caps (selectors.json "site.max_concurrent")
+        self.site_limiter = SiteLimiter()
+        # Per-site selector hit rates; cascades are reordered by them
+        self.selector_stats = SelectorStats()
+        ScraperFactory.attach_selector_stats(self.selector_stats)
+        # Compile every site's extraction plan once, at startup
+        ScraperFactory.warm()
         
     def get_random_user_agent(self):
         return random.choice(self.user_agents)
@@ -52,11 +100,38 @@ class EcommerceScraper:
         result['stock'] = stock
         result['stock_status'] = stock
 
+    def _apply_extraction(self, result: dict, extraction: dict, method: str) -> bool:
+        """Copy a scraper.scrape_page() outcome into the result. Returns False if nothing was found."""
+        price = extraction['price']
+        original_price = extraction['original_price']
+        details = extraction['details']
+        if not (price or details.get('name')):
+            return False
+
+        result['price'] = price if price else None
+        result['original_price'] = original_price
+        result['success'] = bool(price)
+        result['status'] = 'success' if price else 'partial_success_no_price'
+        result['method'] = method
+        details['original_price'] = original_price
+        result['details'] = details
+        result['name'] = details.get('name')
+        result['image_url'] = details.get('image_url')
+        self._apply_stock_status(result, extraction['stock'])
+        result['field_sources'] = extraction.get('sources')
+        return True
+
     def _debug_html_enabled(self) -> bool:
         return os.getenv('SAVE_SCRAPED_HTML', 'false').lower() == 'true' or \
             os.getenv('DEBUG', 'false').lower() == 'true'
 
     def _get_chromedriver_path(self) -> str:
+        with EcommerceScraper._chromedriver_lock:
+            if EcommerceScraper._chromedriver_path is None:
+                EcommerceScraper._chromedriver_path = self._resolve_chromedriver_path()
+            return EcommerceScraper._chromedriver_path
+
+    def _resolve_chromedriver_path(self) -> str:
         configured = os.getenv('CHROMEDRIVER_PATH')
         if configured:
             if os.path.exists(configured):
@@ -124,48 +199,14 @@ class EcommerceScraper:
         except Exception as e:
             print(f"  Could not mark ChromeDriver executable: {e}")
         
-    def resolve_url(self, url: str) -> str:
+    async def resolve_url(self, url: str) -> str:
         """Resolve shortened URLs to their final destination"""
-        domain = urlparse(url).netloc.lower()
-        shorteners = ['bitli.in', 'extp.in', 'amzn.to', 'fkrt.cc', 't.co', 'goo.gl', 'bit.ly', 'msho.in']
-        
-        if any(s in domain for s in shorteners):
-            try:
-                print(f"  Resolving short URL: {url}")
-                # Try HEAD first
-                try:
-                    response = requests.head(url, allow_redirects=True, timeout=10)
-                    if response.status_code < 400:
-                         print(f"  Resolved (HEAD) to: {response.url}")
-                         return response.url
-                except:
-                    pass
-                
-                # Fallback to GET
-                response = requests.get(url, allow_redirects=True, timeout=10, stream=True)
-                print(f"  Resolved (GET) to: {response.url}")
-                return response.url
-            except Exception as e:
-                print(f"  Failed to resolve URL {url}: {e}")
-                return url
-        return url
+        return await self.url_resolver.resolve(url)
 
-
-    async def scrape_product_price(self, playwright, url: str, use_virtual_display: bool = False) -> dict:
-        """
-        Main entry point for scraping a product price.
-        
-        Two-phase site identification workflow:
-          Phase 1: Domain dict lookup on the raw input URL
-          Phase 2: If Phase 1 returned 'generic', open URL in browser,
-                   let redirects settle, then re-identify from the final URL.
-        
-        Tries Playwright first, falls back to Selenium.
-        """
-        original_url = url
-        
-        result = {
+    def _new_result(self, url: str) -> dict:
+        return {
             'url': url,
+            'product_key': product_key(url),
             'site': 'unknown',
             'price': 'N/A',
             'original_price': None,
@@ -184,58 +225,155 @@ class EcommerceScraper:
                 'review_count': None
             },
             'stock': self._default_stock_status(),
-            'stock_status': self._default_stock_status()
+            'stock_status': self._default_stock_status(),
+            'field_sources': None,
+            'config_version': None
         }
+
+    async def scrape_product_price(self, playwright, url: str, use_virtual_display: bool = False,
+                                   hedge: bool = None, fields: frozenset = None) -> dict:
+        """
+        Main entry point for scraping a product price.
+        
+        Two-phase site identification workflow:
+          Phase 1: Domain dict lookup on the raw input URL
+          Phase 2: If Phase 1 returned 'generic', open URL in browser,
+                   let redirects settle, then re-identify from the final URL.
         
+        The engine router picks the strategy order per site (method + UA
+        profile) from recent cost per successful price; the first strategy
+        that extracts anything wins. With ``hedge`` (default: HEDGE_ENABLED
+        env), a Playwright-first plan and a site listed in HEDGE_SITES, a
+        Selenium attempt is started alongside Playwright once Playwright runs
+        past the site's historical latency quantile. At most the site's
+        ``max_concurrent`` scrapes (site registry) run at once.
+
+        ``fields`` (see scrapers.base_scraper.parse_fields) limits which
+        extraction stages run; the default scrapes everything.
+        """
+        if hedge is None:
+            hedge = HEDGE_ENABLED
+
+        # Expand affiliate short links up front so the browser loads the product page directly
+        url = await self.resolve_url(url)
+
         # ── PHASE 1: Domain Dict Lookup ──
         site = self.identify_site(url)
         print(f"  Phase 1 identification: {site}")
-        
-        # ── PLAYWRIGHT ATTEMPT ──
+
+        plan = self.router.plan(site)
+        method, ua_profile = plan[0]
+        print(f"  Routing plan: {', '.join(f'{m}/{ua}' for m, ua in plan)}")
+
+        async with self.site_limiter.slot(site, ScraperFactory.site_config(site).max_concurrent):
+            if hedge and method == 'playwright' and site in HEDGE_SITES:
+                result = await self._hedged_scrape(playwright, url, site, use_virtual_display, ua_profile, fields)
+            else:
+                result = self._new_result(url)
+                for strategy in plan:
+                    if await self._timed_attempt(playwright, url, site, result, strategy,
+                                                 use_virtual_display, fields):
+                        break
+
+        # Stable product identity from the final browser URL (falls back to the resolved input URL)
+        result['product_key'] = product_key(result['url']) or product_key(url)
+        return result
+
+    async def _hedged_scrape(self, playwright, url: str, site: str, use_virtual_display: bool,
+                             ua_profile: str = 'desktop', fields: frozenset = None) -> dict:
+        """
+        Race Playwright against a delayed Selenium hedge.
+
+        Playwright starts immediately. If it has not produced a price within
+        the site's p-quantile of past Playwright latency, Selenium starts in
+        parallel; the first attempt with a valid price wins and the other is
+        cancelled.
+        """
+        pw_result = self._new_result(url)
+        se_result = self._new_result(url)
+        pw_task = asyncio.ensure_future(self._timed_attempt(
+            playwright, url, site, pw_result, ('playwright', ua_profile), use_virtual_display, fields
+        ))
+        results = {pw_task: pw_result}
+
+        delay = self.latency.hedge_delay(site, 'playwright')
+        done, _ = await asyncio.wait({pw_task}, timeout=delay)
+        if pw_task in done and not pw_task.cancelled() and pw_task.exception() is None \
+                and pw_result['success']:
+            return pw_result
+
+        if pw_task not in done:
+            print(f"  Playwright still running after {delay:.1f}s, hedging with Selenium...")
+        se_task = asyncio.ensure_future(self._timed_attempt(
+            playwright, url, site, se_result, ('selenium', 'desktop'), use_virtual_display, fields
+        ))
+        results[se_task] = se_result
+
+        pending = {task for task in results if not task.done()}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = next((task for task in done if results[task]['success']), None)
+            if winner:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                winner_result = results[winner]
+                winner_result['hedged'] = True
+                return winner_result
+
+        # Neither attempt found a price: prefer a partial Playwright result, else Selenium's
+        if pw_result['method'] == 'playwright':
+            return pw_result
+        if not se_result['error'] and pw_result['error']:
+            se_result['error'] = pw_result['error']
+        return se_result
+
+    async def _timed_attempt(self, playwright, url: str, site: str, result: dict,
+                             strategy: tuple, use_virtual_display: bool, fields: frozenset = None) -> bool:
+        """
+        Run one (method, UA profile) attempt and record its outcome with the
+        router (and its latency, when it found a price). Returns True if the
+        attempt extracted anything. Cancelled hedge attempts are not recorded.
+        """
+        method, ua_profile = strategy
+        started = time.monotonic()
+        if method in SELENIUM_BACKENDS:
+            await self._scrape_with_selenium(url, site, result, fields, method)
+            found = result['method'] == method
+        else:
+            found = await self._scrape_with_playwright(
+                playwright, url, site, result, use_virtual_display, ua_profile, fields
+            )
+        elapsed = time.monotonic() - started
+
+        self.router.record(site, method, ua_profile, result['success'], elapsed)
+        if result['success']:
+            self.latency.record(site, method, elapsed)
+        return found
+
+    async def _scrape_with_playwright(self, playwright, url: str, site: str, result: dict,
+                                      use_virtual_display: bool, ua_profile: str = 'desktop',
+                                      fields: frozenset = None) -> bool:
+        """Playwright attempt. Fills ``result`` and returns True if anything was extracted."""
         browser = None
         try:
-            # FAST-TRACK: Skip Playwright instantly for sites with heavy firewalls
-            if site in ['myntra','nykaa']:
-                raise Exception(f"{site.capitalize()} firewall detected. Fast-tracking to Selenium!")
-                
             print(f"  Launching Playwright browser...")
             
-            browser = await playwright.chromium.launch(
-                headless=not use_virtual_display,
-                args=['--disable-blink-features=AutomationControlled']
-            )
-            
-            # Bhavika's behavior: use Googlebot UA for strict firewalls, otherwise normal random UA.
-            googlebot_ua = "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"
-            current_ua = googlebot_ua if site in ['meesho', 'ajio','nykaa'] else self.get_random_user_agent()
-            
-            context = await browser.new_context(
-                user_agent=current_ua,
-                viewport={'width': 1920, 'height': 1080}
-            )
-            
+            # The router picks the UA profile (Googlebot for strict firewalls); sites may override it
+            profile = get_browser_profile(site, ua_profile)
+            browser = await playwright.chromium.launch(**profile.launch_options(headless=not use_virtual_display))
+            seeded_from = self.session_store.pick(site)
+            context = await self._new_playwright_context(browser, profile, storage_state=seeded_from)
             page = await context.new_page()
-            await stealth_async(page)
-            
-            # Apply Stealth plugin
-            try:
-                await stealth_async(page)
-            except Exception as e:
-                print(f"  Could not apply stealth plugin: {e}")
-            
-            # Inject additional stealth JavaScript
-            try:
-                await page.add_init_script(STEALTH_JS)
-            except Exception as e:
-                print(f"  Could not inject stealth JS: {e}")
+
+            # Listen for the site's pricing API before navigating so early XHRs are seen
+            api_capture = ApiResponseCapture.for_site(site)
+            if api_capture:
+                api_capture.attach(page)
 
             # Navigate and wait for redirects to settle
             try:
-                # SPEED HACK: Strict 15-second cutoff for Snapdeal/Amazon
-                if site in ['amazon', 'snapdeal']:
-                    await page.goto(url, timeout=15000, wait_until='domcontentloaded')
-                else:
-                    await page.goto(url, timeout=30000, wait_until='domcontentloaded')
+                await page.goto(url, timeout=profile.navigation_timeout, wait_until=profile.wait_until)
                 
                 # Check if a new tab/page was opened (some short links do this)
                 if len(context.pages) > 1:
@@ -249,7 +387,7 @@ class EcommerceScraper:
                 target_url = ScraperFactory.unwrap_destination_url(final_url)
                 if target_url != final_url:
                     print(f"  Embedded destination URL found: {target_url}")
-                    await page.goto(target_url, timeout=30000, wait_until='domcontentloaded')
+                    await page.goto(target_url, timeout=profile.navigation_timeout, wait_until=profile.wait_until)
                     final_url = page.url
                     print(f"  Browser navigated to embedded URL: {final_url}")
 
@@ -266,6 +404,7 @@ class EcommerceScraper:
                 
                 # Get the correct scraper for the identified site
                 scraper = ScraperFactory.get_scraper(final_url)
+                result['config_version'] = scraper.config_version
                 
                 # Flipkart-specific: Wait for price elements to load (they render via JS)
                 
@@ -278,29 +417,35 @@ class EcommerceScraper:
                     except Exception as e:
                         print(f"  Could not save HTML: {e}")
 
-                # Extract data using the scraper via unified adapter
+                # The DOM pipeline races the retailer's JSON API; the first result with a price wins
                 browser_adapter = BrowserAdapter(page, 'playwright')
-                price = await scraper.extract_price(browser_adapter)
-                original_price = await scraper.extract_original_price(browser_adapter, price)
-                details = await scraper.extract_product_details(browser_adapter)
-                stock = await scraper.check_stock_status(browser_adapter)
+                dom_extraction = scraper.scrape_page(browser_adapter, fields)
+                if api_capture:
+                    extraction, from_api = await api_capture.race(dom_extraction)
+                else:
+                    extraction, from_api = await dom_extraction, False
+                if from_api:
+                    result['price_source'] = 'api'
+                    if extraction['sources']['in_stock']['source'] == 'stock_default' and (not fields or 'stock' in fields):
+                        # The API carried no stock flag: look for the page's out-of-stock cues instead
+                        extraction['stock'] = await scraper.check_stock_status(browser_adapter)
+                        if not extraction['stock'].get('in_stock'):
+                            extraction['sources']['in_stock'] = {
+                                'source': 'stock_phrase', 'confidence': SOURCE_CONFIDENCE['stock_phrase']
+                            }
+                    self.selector_stats.record_sources(site, extraction['sources'])
                 
-                if price or details.get('name'):
-                    result['price'] = price if price else None
-                    result['original_price'] = original_price
-                    result['success'] = bool(price)
-                    result['status'] = 'success' if price else 'partial_success_no_price'
-                    result['method'] = 'playwright'
-                    details['original_price'] = original_price
-                    result['details'] = details
-                    result['name'] = details.get('name')
-                    result['image_url'] = details.get('image_url')
-                    self._apply_stock_status(result, stock)
+                found = self._apply_extraction(result, extraction, 'playwright')
+                await self._update_session_state(context, page, site, seeded_from, result['success'])
+                if found:
                     await browser.close()
                     browser = None
-                    return result
+                    return True
             except Exception as e:
                 print(f"  Playwright navigation/extraction error: {e}")
+                # A challenge page often surfaces as a navigation timeout or missing elements
+                if seeded_from:
+                    await self._discard_if_blocked(page, seeded_from)
             
             if browser:
                 await browser.close()
@@ -315,14 +460,53 @@ class EcommerceScraper:
                     await browser.close()
                 except Exception as e:
                     print(f"  Could not close Playwright browser: {e}")
-            
-        # ── SELENIUM FALLBACK ──
-        print(f"  Falling back to Selenium...")
-        
+
+        return False
+
+    async def _new_playwright_context(self, browser, profile: BrowserProfile, storage_state: str = None):
+        """Create a context from a browser profile; stealth and init scripts are applied once here."""
+        options = profile.new_context_options(self.get_random_user_agent())
+        if storage_state:
+            print(f"  Seeding context with saved session: {os.path.basename(storage_state)}")
+            options['storage_state'] = storage_state
+        context = await browser.new_context(**options)
+        if profile.stealth:
+            try:
+                # playwright-stealth only needs add_init_script, which contexts provide too
+                await stealth_async(context)
+            except Exception as e:
+                print(f"  Could not apply stealth plugin: {e}")
+        for script in profile.init_scripts:
+            try:
+                await context.add_init_script(script)
+            except Exception as e:
+                print(f"  Could not inject stealth JS: {e}")
+        return context
+
+    async def _update_session_state(self, context, page, site: str, seeded_from: str, success: bool) -> None:
+        """Keep session snapshots from successful scrapes; drop the seed if the session got blocked."""
+        if success:
+            if self.session_store.should_capture(site, seeded_from):
+                await self.session_store.capture(context, site)
+            return
+        await self._discard_if_blocked(page, seeded_from)
+
+    async def _discard_if_blocked(self, page, seeded_from: str) -> None:
+        """Drop the session snapshot a context was seeded from if the page is a block/captcha page."""
+        try:
+            title = await page.title()
+        except Exception:
+            return
+        if looks_blocked(title):
+            print(f"  Session blocked ({title[:60]}), discarding saved state")
+            self.session_store.discard(seeded_from)
+
+    def _build_chrome_options(self) -> Options:
         options = Options()
         for arg in SELENIUM_ARGS:
             options.add_argument(arg)
         options.add_argument(f"user-agent={self.get_random_user_agent()}")
+        options.page_load_strategy = SELENIUM_PAGE_LOAD_STRATEGY
         self._configure_chrome_binary(options)
         
         # --- THE MAGIC STEALTH FLAG ---
@@ -331,82 +515,101 @@ class EcommerceScraper:
         # Hide automation flags
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
         options.add_experimental_option('useAutomationExtension', False)
+        return options
+
+    def _start_chrome_driver(self):
+        """Start chromedriver + Chrome (blocking; run on the Selenium executor)."""
+        driver = webdriver.Chrome(
+            service=ChromeService(self._get_chromedriver_path()),
+            options=self._build_chrome_options()
+        )
+        # Missed selectors must return immediately, not after an implicit wait each
+        driver.implicitly_wait(SELENIUM_IMPLICIT_WAIT)
+        return driver
+
+    def _start_undetected_driver(self):
+        """
+        Start an undetected-chromedriver session (blocking; run on the Selenium
+        executor). uc patches its own chromedriver binary and sets the stealth
+        flags itself, so only the container-safe args are passed.
+        """
+        if uc is None:
+            raise RuntimeError('undetected-chromedriver is not installed')
+        options = uc.ChromeOptions()
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument(f"user-agent={self.get_random_user_agent()}")
+        options.page_load_strategy = SELENIUM_PAGE_LOAD_STRATEGY
+        self._configure_chrome_binary(options)
+        driver = uc.Chrome(options=options, version_main=None, use_subprocess=True)
+        driver.implicitly_wait(SELENIUM_IMPLICIT_WAIT)
+        return driver
+
+    def _navigate_selenium(self, driver, url: str) -> str:
+        """Load a URL and return where the browser ended up (blocking)."""
+        driver.get(url)
+        return driver.current_url
+
+    async def _scrape_with_selenium(self, url: str, site: str, result: dict, fields: frozenset = None,
+                                    method: str = 'selenium') -> dict:
+        """
+        Selenium fallback. Every WebDriver call runs on the bounded Selenium
+        executor so other scrapes on this event loop keep progressing, and the
+        driver is borrowed from the warm session pool instead of cold-started.
+        ``method`` 'undetected' runs the same path on an undetected-chromedriver
+        session from its own pool.
+        """
+        print(f"  Falling back to {'undetected Chrome' if method == 'undetected' else 'Selenium'}...")
         
-        driver = None
         try:
-            driver = webdriver.Chrome(
-                service=ChromeService(self._get_chromedriver_path()),
-                options=options
-            )
-            
-            driver.get(original_url)
-            driver.implicitly_wait(3) # Wait up to 3 seconds for elements
-            time.sleep(4 if site == 'myntra' else 1)
-            
-            final_url = driver.current_url
-            target_url = ScraperFactory.unwrap_destination_url(final_url)
-            if target_url != final_url:
-                print(f"  Embedded destination URL found: {target_url}")
-                driver.get(target_url)
-                driver.implicitly_wait(3)
-                time.sleep(4 if self.identify_site(target_url) in ['myntra', 'nykaa'] else 1)
-                final_url = driver.current_url
-                print(f"  Selenium navigated to embedded URL: {final_url}")
-
-            print(f"  Selenium resolved URL to: {final_url}")
-            result['url'] = final_url
-            
-            # Phase 2 for Selenium: re-identify from resolved URL if Phase 1 was generic
-            if site == 'generic':
-                site = self.identify_site(final_url)
-                print(f"  Selenium Phase 2 identification: {site}")
-            
-            result['site'] = site
-            scraper = ScraperFactory.get_scraper(final_url)
-            print(f"  Selenium identified site: {result['site']}")
-            
-            # Extract data via unified adapter
-            browser_adapter = BrowserAdapter(driver, 'selenium')
-            price = await scraper.extract_price(browser_adapter)
-            original_price = await scraper.extract_original_price(browser_adapter, price)
-            details = await scraper.extract_product_details(browser_adapter)
-            stock = await scraper.check_stock_status(browser_adapter)
-            
-            if price or details.get('name'):
-                result['price'] = price if price else None
-                result['original_price'] = original_price
-                result['success'] = bool(price)
-                result['status'] = 'success' if price else 'partial_success_no_price'
-                result['method'] = 'selenium'
-                details['original_price'] = original_price
-                result['details'] = details
-                result['name'] = details.get('name')
-                result['image_url'] = details.get('image_url')
-                self._apply_stock_status(result, stock)
-            else:
-                 result['status'] = 'failed_no_price'
+            async with self.driver_pools[method].session() as driver:
+                # Site readiness waits run inside scraper.scrape_page()
+                final_url = await run_blocking(self._navigate_selenium, driver, url)
+                target_url = ScraperFactory.unwrap_destination_url(final_url)
+                if target_url != final_url:
+                    print(f"  Embedded destination URL found: {target_url}")
+                    final_url = await run_blocking(self._navigate_selenium, driver, target_url)
+                    print(f"  Selenium navigated to embedded URL: {final_url}")
+
+                print(f"  Selenium resolved URL to: {final_url}")
+                result['url'] = final_url
+                
+                # Phase 2 for Selenium: re-identify from resolved URL if Phase 1 was generic
+                if site == 'generic':
+                    site = self.identify_site(final_url)
+                    print(f"  Selenium Phase 2 identification: {site}")
+                
+                result['site'] = site
+                scraper = ScraperFactory.get_scraper(final_url)
+                result['config_version'] = scraper.config_version
+                print(f"  Selenium identified site: {result['site']}")
+                
+                # Extract data via unified adapter
+                browser_adapter = BrowserAdapter(driver, method)
+                extraction = await scraper.scrape_page(browser_adapter, fields)
+                
+                if not self._apply_extraction(result, extraction, method):
+                     result['status'] = 'failed_no_price'
         
         except Exception as e:
             print(f"  Selenium failed: {e}")
             result['error'] = f"Playwright and Selenium failed: {e}"
-        finally:
-            if driver:
-                driver.quit()
                 
         return result
 
-    async def scrape_multiple_products(self, playwright, urls: list, max_concurrent: int = 5, use_virtual_display: bool = False) -> list:
-        """Scrape multiple products concurrently"""
-        results = []
+    async def scrape_multiple_products(self, playwright, urls: list, max_concurrent: int = 5,
+                                       use_virtual_display: bool = False, fields: frozenset = None) -> list:
+        """Scrape multiple products concurrently (URLs for the same product are scraped once)"""
         semaphore = asyncio.Semaphore(max_concurrent)
         
         async def scrape_bounded(url):
             async with semaphore:
                 try:
-                    return await self.scrape_product_price(playwright, url, use_virtual_display)
+                    return await self.scrape_product_price(playwright, url, use_virtual_display, fields=fields)
                 except Exception as e:
                     return {
                         'url': url,
+                        'product_key': product_key(url),
                         'site': self.identify_site(url),
                         'price': None,
                         'original_price': None,
@@ -418,5 +621,17 @@ class EcommerceScraper:
                         'stock_status': self._default_stock_status()
                     }
 
-        tasks = [scrape_bounded(url) for url in urls]
-        return await asyncio.gather(*tasks)
+        # Pre-resolve every short link concurrently so each scrape starts from a cache hit
+        resolved = await self.url_resolver.resolve_many(urls)
+
+        # Dedupe on product identity: amzn.to, /dp/ASIN?th=1 and search URLs of one product share a scrape
+        # (variants of one listing are priced separately, so they don't); URLs without a product id
+        # dedupe on their canonical form
+        identities = [product_key(target, variant=True) or canonicalize_url(target) for target in resolved]
+        unique = {}
+        for url, identity in zip(urls, identities):
+            unique.setdefault(identity, url)
+
+        scraped = await asyncio.gather(*(scrape_bounded(url) for url in unique.values()))
+        by_identity = dict(zip(unique.keys(), scraped))
+        return [dict(by_identity[identity]) for identity in identities]
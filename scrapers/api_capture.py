@@ -0,0 +1,156 @@
+"""
+Read prices straight from retailer JSON API responses.
+
+Flipkart, Myntra, Nykaa and Ajio render their price from XHR/fetch JSON
+payloads. Instead of waiting for that JSON to be rendered and scraping the DOM
+with fragile CSS classes, a response listener on the Playwright page matches
+the product/pricing API by URL pattern, parses price, MRP and stock out of the
+JSON and resolves as soon as the response arrives. The DOM pipeline runs
+alongside the wait (race()), so pages whose API call never comes (e.g. a
+server-rendered first load) do not pay the API timeout.
+
+Per-site config lives under ``"api"`` in selectors.json::
+
+    "api": {
+        "url_patterns": ["/gateway/v2/product/"],
+        "price_paths": ["style.price.discounted"],
+        "original_price_paths": ["style.price.mrp"],
+        "name_paths": ["style.name"],
+        "in_stock_paths": [],
+        "out_of_stock_paths": ["style.flags.outOfStock"],
+        "timeout": 4
+    }
+
+Paths use the json_paths syntax (``*`` and ``**`` wildcards).
+"""
+import asyncio
+import re
+from typing import Any, Awaitable, Dict, Optional, Tuple
+
+from .confidence import SOURCE_CONFIDENCE
+from .json_paths import first_value, format_price, truthy_flag
+from .scraper_factory import ScraperFactory
+
+
+DEFAULT_API_TIMEOUT = 3
+
+
+class ApiResponseCapture:
+    """Listens for a site's pricing API response on a Playwright page."""
+
+    def __init__(self, site: str, config: Dict):
+        self.site = site
+        self.config = config
+        self.url_patterns = [re.compile(p) for p in config.get('url_patterns', [])]
+        self.timeout = config.get('timeout', DEFAULT_API_TIMEOUT)
+        self._future: Optional[asyncio.Future] = None
+        self._page = None
+
+    @classmethod
+    def for_site(cls, site: str) -> Optional['ApiResponseCapture']:
+        """Capture for ``site`` if selectors.json configures one."""
+        config = ScraperFactory.load_selectors().get(site, {}).get('api')
+        if not config or not config.get('url_patterns'):
+            return None
+        return cls(site, config)
+
+    def matches(self, url: str) -> bool:
+        return any(pattern.search(url) for pattern in self.url_patterns)
+
+    def attach(self, page) -> None:
+        """Start listening; call before navigation so early XHRs are seen."""
+        self._future = asyncio.get_running_loop().create_future()
+        self._page = page
+        page.on('response', self._on_response)
+
+    def detach(self) -> None:
+        if self._page is not None:
+            try:
+                self._page.remove_listener('response', self._on_response)
+            except Exception:
+                pass
+            self._page = None
+
+    async def _on_response(self, response) -> None:
+        if self._future is None or self._future.done() or not self.matches(response.url):
+            return
+        try:
+            payload = await response.json()
+        except Exception:
+            return
+        extraction = self.parse(payload)
+        if extraction and not self._future.done():
+            print(f"  {self.site} price captured from API response: {response.url[:80]}")
+            self._future.set_result(extraction)
+
+    def parse(self, payload: Any) -> Optional[Dict]:
+        """Turn an API payload into a scrape_page()-shaped extraction, or None without a price."""
+        price = format_price(first_value(payload, self.config.get('price_paths', [])))
+        if not price:
+            return None
+
+        original_price = format_price(first_value(payload, self.config.get('original_price_paths', [])))
+        if original_price and float(original_price.replace(',', '')) <= float(price.replace(',', '')):
+            original_price = None
+
+        stock = {'in_stock': True, 'stock_status': 'in_stock', 'message': None}
+        out_flag = first_value(payload, self.config.get('out_of_stock_paths', []))
+        in_flag = first_value(payload, self.config.get('in_stock_paths', []))
+        if (out_flag is not None and truthy_flag(out_flag)) or (in_flag is not None and not truthy_flag(in_flag)):
+            stock = {'in_stock': False, 'stock_status': 'out_of_stock', 'message': 'Out of stock per product API'}
+
+        name = first_value(payload, self.config.get('name_paths', []))
+        image_url = first_value(payload, self.config.get('image_paths', []))
+        reported = {'source': 'api', 'confidence': SOURCE_CONFIDENCE['api']}
+        sources = {field: dict(reported) for field, value in (
+            ('price', price), ('original_price', original_price), ('name', name),
+            ('image_url', image_url), ('in_stock', out_flag is not None or in_flag is not None)) if value}
+        # Without a stock flag the API says nothing about stock: report the default
+        sources.setdefault('in_stock', {'source': 'stock_default', 'confidence': SOURCE_CONFIDENCE['stock_default']})
+        return {
+            'price': price,
+            'original_price': original_price,
+            'details': {
+                'name': str(name) if name else None,
+                'image_url': str(image_url) if image_url else None,
+                'rating': None,
+                'review_count': None,
+            },
+            'stock': stock,
+            'sources': sources,
+        }
+
+    async def wait(self, timeout: float = None) -> Optional[Dict]:
+        """Wait for a matching response, up to ``timeout`` seconds (default: config)."""
+        if self._future is None:
+            return None
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def race(self, extraction: Awaitable[Dict]) -> Tuple[Dict, bool]:
+        """
+        Run the DOM ``extraction`` (a scrape_page() coroutine) alongside the
+        API wait and return ``(result, from_api)``. Whichever finishes first
+        with a price wins and the other is cancelled; if the first one has
+        nothing, the other decides. Detaches the listener when done.
+        """
+        dom = asyncio.ensure_future(extraction)
+        api = asyncio.ensure_future(self.wait())
+        try:
+            done, _ = await asyncio.wait({dom, api}, return_when=asyncio.FIRST_COMPLETED)
+            if api in done and api.result():
+                return api.result(), True
+            if dom in done and dom.exception() is None and dom.result().get('price'):
+                return dom.result(), False
+            captured = await api
+            if captured:
+                return captured, True
+            return await dom, False
+        finally:
+            for task in (dom, api):
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(dom, api, return_exceptions=True)
+            self.detach()
@@ -1,24 +1,85 @@
 from typing import Dict, Optional, List, Tuple
+import asyncio
 import re
-import json
-import os
 from abc import ABC, abstractmethod
-from .browser_adapter import BrowserAdapter, BrowserElement
+from .browser_adapter import SELENIUM_BACKENDS, BrowserAdapter, BrowserElement
+from .page_state import ProductState, extract_page_state
+from .structured_data import extract_structured_data
+from .confidence import (
+    CONFIDENCE_THRESHOLD, INCONSISTENT_CONFIDENCE, NO_DISCOUNT_CONFIDENCE, FieldPicks, confidence_for,
+)
+from . import plans, prices
+from .page_analysis import analyse
+from .price_detector import DETECTOR_OPTIONS, DETECTOR_SCRIPT, DetectedPrice, score_detection
+
+
+# Ceiling (seconds) for a site's readiness wait when selectors.json does not set one
+DEFAULT_READY_TIMEOUT = 5
+
+# Fields a scrape can be limited to (scrape_page(fields=...)). The price is
+# always scraped: a result's success is defined by it.
+SCRAPE_FIELDS = ('price', 'original_price', 'name', 'image_url', 'stock')
+FIELD_ALIASES = {
+    'stock_status': ('stock',),
+    'in_stock': ('stock',),
+    'details': ('name', 'image_url'),
+}
+
+
+def parse_fields(value) -> Optional[frozenset]:
+    """
+    Normalise a ``fields`` request value (list or comma-separated string)
+    into a set of SCRAPE_FIELDS. Empty means all fields (None); unknown
+    names raise ValueError.
+    """
+    if value is None:
+        return None
+    items = value.split(',') if isinstance(value, str) else value
+    if not isinstance(items, (list, tuple, set, frozenset)):
+        raise ValueError('fields must be a list or a comma-separated string')
+
+    fields = set()
+    for item in items:
+        name = str(item).strip().lower()
+        if not name:
+            continue
+        if name in FIELD_ALIASES:
+            fields.update(FIELD_ALIASES[name])
+        elif name in SCRAPE_FIELDS:
+            fields.add(name)
+        else:
+            raise ValueError(f"Unknown field '{item}'. Valid fields: {', '.join(SCRAPE_FIELDS)}")
+    if not fields:
+        return None
+    fields.add('price')
+    return frozenset(fields)
 
 
 class BaseScraper(ABC):
     """Base class for all e-commerce scrapers"""
     
     def __init__(self, selectors: Dict = None):
-        if selectors:
+        if selectors is not None:
             self.selectors_data = {}
             self.site_selectors = selectors
         else:
             self.selectors_data = self.load_selectors()
             self.site_selectors = self.selectors_data.get(self.get_site_name(), {})
             
-        self.price_selectors = self.get_price_selectors()
         self.stock_indicators = self.get_stock_indicators()
+        # Compiled once per scraper; ScraperFactory keeps one scraper per site
+        self.plan = plans.compile_plan(
+            self.get_site_name(), self.site_selectors,
+            price_selectors=self.get_price_selectors(),
+            original_price_selectors=self.get_original_price_selectors(),
+            stock_indicators=self.stock_indicators,
+        )
+        self.price_selectors = list(self.plan.price_selectors)
+        # SelectorStats for hit-rate telemetry and cascade adjustments (see ScraperFactory)
+        self.selector_stats = None
+        # selectors.json version this scraper was compiled from (set by ScraperFactory)
+        self.config_version = None
+        self.confidence_threshold = self.site_selectors.get('confidence_threshold', CONFIDENCE_THRESHOLD)
         
     @property
     def site_name(self) -> str:
@@ -26,19 +87,8 @@ class BaseScraper(ABC):
         return self.get_site_name()
 
     def load_selectors(self) -> Dict:
-        """Load selectors from JSON file"""
-        try:
-            file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'selectors.json')
-            if not os.path.exists(file_path):
-                file_path = 'selectors.json'
-                
-            if os.path.exists(file_path):
-                with open(file_path, 'r') as f:
-                    return json.load(f)
-            return {}
-        except Exception as e:
-            print(f"Error loading selectors: {e}")
-            return {}
+        """selectors.json (shared, read from disk once per process)"""
+        return plans.load_selectors()
 
     @abstractmethod
     def get_site_name(self) -> str:
@@ -78,56 +128,23 @@ class BaseScraper(ABC):
 
     def clean_price(self, price_str: str) -> str:
         """Clean price string to extract numeric value"""
-        if not price_str:
-            return "N/A"
-        cleaned = re.sub(r'[^\d.,]', '', price_str)
-        if cleaned.count('.') > 1:
-            parts = cleaned.split('.')
-            cleaned = "".join(parts[:-1]) + "." + parts[-1]
-        return cleaned.strip().strip(',.')
+        return prices.clean_price(price_str)
 
     def is_valid_price(self, price_str: str) -> bool:
         """Check if cleaned price string is valid"""
         if not price_str or price_str == "N/A":
             return False
-        try:
-            float(price_str.replace(',', ''))
-            return True
-        except ValueError:
-            return False
+        return prices.parse_amount(price_str) is not None
 
     def price_to_float(self, price_str: str) -> Optional[float]:
         """Convert a cleaned price string to float if possible."""
         if not self.is_valid_price(price_str):
             return None
-        try:
-            return float(price_str.replace(',', ''))
-        except (TypeError, ValueError):
-            return None
+        return prices.parse_amount(price_str)
 
     def extract_price_candidates_from_text(self, text: str) -> List[str]:
-        """Extract individual price-like values from text."""
-        if not text:
-            return []
-
-        candidates = []
-        patterns = [
-            r'(?:₹|Rs\.?|INR)\s*([\d,]+(?:\.\d{1,2})?)',
-            r'([\d,]+(?:\.\d{1,2})?)\s*(?:₹|Rs\.?|INR)',
-        ]
-
-        for pattern in patterns:
-            for match in re.findall(pattern, text, flags=re.IGNORECASE):
-                cleaned = self.clean_price(match)
-                if self.is_valid_price(cleaned):
-                    candidates.append(cleaned)
-
-        if not candidates:
-            cleaned = self.clean_price(text)
-            if self.is_valid_price(cleaned):
-                candidates.append(cleaned)
-
-        return candidates
+        """Extract individual price-like values from text (ranges' upper bounds and per-unit prices excluded)."""
+        return prices.price_candidates(text)
 
     def pick_original_price(self, candidates: List[str], current_price: Optional[str] = None) -> Optional[str]:
         """Choose the most likely original/list price from candidate values."""
@@ -160,36 +177,7 @@ class BaseScraper(ABC):
 
     def extract_original_price_candidates_from_content(self, content: str) -> List[str]:
         """Extract original/list price candidates from full page HTML/JSON text."""
-        if not content:
-            return []
-
-        candidates = []
-        label = (
-            r'MRP|M\.R\.P\.?|List Price|Original Price|Regular Price|'
-            r'Maximum Retail Price|Retail Price|Was|Compare(?: At)? Price'
-        )
-        patterns = [
-            rf'(?:{label})[^₹\d]{{0,120}}(?:₹|Rs\.?|INR)?\s*([\d,]+(?:\.\d{{1,2}})?)',
-            rf'(?:₹|Rs\.?|INR)\s*([\d,]+(?:\.\d{{1,2}})?)[^<]{{0,120}}(?:{label})',
-            (
-                r'"(?:mrp|MRP|maximumRetailPrice|retailPrice|originalPrice|'
-                r'strikeOffPrice|listPrice|regularPrice|compareAtPrice)"\s*:\s*"?'
-                r'(?:₹|Rs\.?|INR)?\s*([\d,]+(?:\.\d{1,2})?)'
-            ),
-            (
-                r"'(?:mrp|MRP|maximumRetailPrice|retailPrice|originalPrice|"
-                r"strikeOffPrice|listPrice|regularPrice|compareAtPrice)'\s*:\s*'?"
-                r"(?:₹|Rs\.?|INR)?\s*([\d,]+(?:\.\d{1,2})?)"
-            ),
-        ]
-
-        for pattern in patterns:
-            for match in re.findall(pattern, content, flags=re.IGNORECASE):
-                cleaned = self.clean_price(match)
-                if self.is_valid_price(cleaned):
-                    candidates.append(cleaned)
-
-        return candidates
+        return prices.original_price_candidates(content)
 
     def clean_image_url(self, url: str) -> str:
         """Clean image URL to get the highest resolution version."""
@@ -211,19 +199,62 @@ class BaseScraper(ABC):
 
     # ── Unified Extraction Methods (use BrowserAdapter) ──
 
+    async def _selector_candidates(self, browser: BrowserAdapter, selector: str,
+                                   limit: int, attributes) -> List[str]:
+        """Price candidates from the first ``limit`` matches of a selector (text, then attributes)."""
+        candidates = []
+        for element in (await browser.query_selector_all(selector))[:limit]:
+            text = await browser.get_text(element)
+            candidates.extend(self.extract_price_candidates_from_text(text))
+            for attr in attributes:
+                attr_value = await browser.get_attribute(element, attr)
+                candidates.extend(self.extract_price_candidates_from_text(attr_value))
+        return candidates
+
+    def _pick_lowest_price(self, candidates: List[str]) -> Optional[str]:
+        """Lowest distinct candidate within the plan's price range."""
+        valid = {}
+        for candidate in candidates:
+            value = self.price_to_float(candidate)
+            if self.plan.accepts_price(value):
+                valid.setdefault(round(value, 2), candidate)
+        return valid[min(valid)] if valid else None
+
+    def _cascade_order(self, field: str, selectors) -> List[str]:
+        """Selector order for a cascade, as adjusted by the attached selector stats (if any)."""
+        if self.selector_stats:
+            return self.selector_stats.order(self.site_name, field, selectors)
+        return list(selectors)
+
+    def _record_cascade(self, field: str, tried: List[str], hit: Optional[str]) -> None:
+        if self.selector_stats:
+            self.selector_stats.record_cascade(self.site_name, field, tried, hit)
+
     async def extract_price(self, browser: BrowserAdapter) -> Optional[str]:
-        """Extract price using unified browser adapter"""
-        selectors = self.price_selectors
-        for selector in selectors:
+        """Run the plan's price cascade: the first selector that yields a valid price wins."""
+        plan = self.plan
+        tried = []
+        for selector in self._cascade_order('price', plan.price_selectors):
+            tried.append(selector)
             try:
+                if plan.price_pick == 'lowest':
+                    price = self._pick_lowest_price(await self._selector_candidates(
+                        browser, selector, plan.price_limit, plan.price_attributes))
+                    if price:
+                        self._record_cascade('price', tried, selector)
+                        return price
+                    continue
+
                 el = await browser.query_selector(selector)
                 if el:
                     text = await browser.get_text(el)
                     cleaned = self.clean_price(text)
-                    if self.is_valid_price(cleaned):
+                    if self.is_valid_price(cleaned) and self.plan.accepts_price(self.price_to_float(cleaned)):
+                        self._record_cascade('price', tried, selector)
                         return cleaned
             except:
                 continue
+        self._record_cascade('price', tried, None)
         return None
 
     async def extract_original_price(
@@ -231,27 +262,45 @@ class BaseScraper(ABC):
         browser: BrowserAdapter,
         current_price: Optional[str] = None
     ) -> Optional[str]:
-        """Extract original/list price using selector hints and generic fallbacks."""
+        """
+        Extract original/list price per the plan: either sweep every selector
+        plus the page source and pick once, or stop at the first selector
+        that yields an MRP above the current price.
+        """
+        plan = self.plan
         candidates = []
-        for selector in self.get_original_price_selectors():
+        # First selector each candidate came from, to credit the one whose MRP was picked
+        origin = {}
+        tried = []
+        for selector in self._cascade_order('original_price', plan.original_price_selectors):
+            tried.append(selector)
             try:
-                elements = await browser.query_selector_all(selector)
-                for element in elements[:10]:
-                    text = await browser.get_text(element)
-                    candidates.extend(self.extract_price_candidates_from_text(text))
-                    for attr in ('aria-label', 'title', 'data-price', 'content'):
-                        attr_value = await browser.get_attribute(element, attr)
-                        candidates.extend(self.extract_price_candidates_from_text(attr_value))
+                found = await self._selector_candidates(browser, selector, 10, plan.original_price_attributes)
             except:
                 continue
+            if plan.original_price_mode == 'per_selector':
+                original_price = self.pick_original_price(found, current_price)
+                if original_price:
+                    self._record_cascade('original_price', tried, selector)
+                    return original_price
+            else:
+                candidates.extend(found)
+                for candidate in found:
+                    origin.setdefault(candidate, selector)
+
+        if plan.original_price_mode == 'per_selector':
+            self._record_cascade('original_price', tried, None)
+            return None
 
         try:
             content = await browser.get_page_content()
-            candidates.extend(self.extract_original_price_candidates_from_content(content))
+            candidates.extend(await analyse(prices.original_price_candidates, content, default=[]))
         except:
             pass
 
-        return self.pick_original_price(candidates, current_price)
+        original_price = self.pick_original_price(candidates, current_price)
+        self._record_cascade('original_price', tried, origin.get(original_price))
+        return original_price
 
     async def extract_product_details(self, browser: BrowserAdapter) -> Dict:
         """Extract product details (name, image, rating) using unified browser adapter"""
@@ -263,8 +312,7 @@ class BaseScraper(ABC):
         }
         
         # Name
-        name_sels = self.site_selectors.get('name_selectors', [])
-        for sel in name_sels:
+        for sel in self.plan.name_selectors:
             try:
                 el = await browser.query_selector(sel)
                 if el:
@@ -276,8 +324,7 @@ class BaseScraper(ABC):
                 continue
 
         # Image
-        img_sels = self.site_selectors.get('image_selectors', [])
-        for sel in img_sels:
+        for sel in self.plan.image_selectors:
             try:
                 el = await browser.query_selector(sel)
                 if el:
@@ -290,6 +337,13 @@ class BaseScraper(ABC):
                  
         return details
 
+    def _in_stock_regions(self, selectors) -> List[str]:
+        """``selectors`` scoped to the plan's stock regions (unchanged without regions)."""
+        regions = self.plan.stock_regions
+        if not regions:
+            return list(selectors)
+        return [f"{region} {selector}" for region in regions for selector in selectors]
+
     async def check_stock_status(self, browser: BrowserAdapter) -> Dict:
         """Check if product is in stock using unified browser adapter"""
         status = {
@@ -298,24 +352,214 @@ class BaseScraper(ABC):
             'message': None
         }
         
-        indicators = self.get_stock_indicators()
+        plan = self.plan
+        matcher = plan.stock_matcher
+        if not matcher and not plan.stock_badges:
+            return status
+        
         try:
-            content = await browser.get_page_content()
-            content_lower = content.lower()
-            
-            phrases = indicators if isinstance(indicators, list) else indicators.get('out_of_stock', [])
+            # An exact sold-out badge settles it on its own
+            for badge in self._in_stock_regions(plan.stock_badges):
+                for element in await browser.query_selector_all(badge):
+                    if await browser.is_visible(element):
+                        status['in_stock'] = False
+                        status['stock_status'] = 'out_of_stock'
+                        status['message'] = f"Found out-of-stock badge: {badge}"
+                        return status
+            if not matcher:
+                return status
+
+            # Availability elements only count when their text says out of stock
+            phrase = None
+            for selector in self._in_stock_regions(plan.stock_selectors):
+                for element in await browser.query_selector_all(selector):
+                    if not phrase and await browser.is_visible(element):
+                        phrase = matcher.search(await browser.get_text(element))
+
+            if not phrase and plan.stock_regions:
+                # Only the configured regions' rendered text (never script bodies)
+                texts = []
+                for selector in plan.stock_regions:
+                    for element in await browser.query_selector_all(selector):
+                        texts.append(await browser.get_text(element))
+                phrase = matcher.search('\n'.join(texts))
+            elif not phrase:
+                phrase = await analyse(matcher.search_visible, await browser.get_page_content())
             
-            for phrase in phrases:
-                if phrase.lower() in content_lower:
-                    status['in_stock'] = False
-                    status['stock_status'] = 'out_of_stock'
-                    status['message'] = f"Found out-of-stock phrase: {phrase}"
-                    return status
+            if phrase:
+                status['in_stock'] = False
+                status['stock_status'] = 'out_of_stock'
+                status['message'] = f"Found out-of-stock phrase: {phrase}"
         except:
             pass
             
         return status
 
+    # ── Extraction Pipeline ──
+
+    async def wait_for_page_ready(self, browser: BrowserAdapter) -> None:
+        """Wait for the site's configured "price is rendered" condition, capped by its timeout."""
+        ready = self.plan.ready
+        if not ready and browser.backend_type in SELENIUM_BACKENDS:
+            # Eager Selenium loads return at DOMContentLoaded with no implicit
+            # waits, so wait once for a price element or JSON-LD instead
+            ready = {'selectors': list(self.plan.price_selectors[:5]), 'jsonld': True}
+        if not ready:
+            return None
+
+        timeout = ready.get('timeout', DEFAULT_READY_TIMEOUT)
+        is_ready = await browser.wait_until_ready(
+            selectors=ready.get('selectors', []),
+            jsonld=ready.get('jsonld', False),
+            script=ready.get('script'),
+            timeout=timeout
+        )
+        if not is_ready:
+            print(f"  {self.site_name} readiness not reached within {timeout}s, extracting anyway")
+
+    async def read_page_state(self, browser: BrowserAdapter) -> Optional[ProductState]:
+        """Parse the site's hydration blob (selectors.json "page_state") from the page, if configured."""
+        config = self.site_selectors.get('page_state')
+        if not config:
+            return None
+        try:
+            content = await browser.get_page_content()
+        except Exception:
+            return None
+        return await analyse(extract_page_state, content, config)
+
+    async def read_structured_data(self, browser: BrowserAdapter) -> Optional[ProductState]:
+        """JSON-LD Product/Offer, microdata and OpenGraph/product meta merged into one view."""
+        try:
+            content = await browser.get_page_content()
+        except Exception:
+            return None
+        return await analyse(extract_structured_data, content)
+
+    async def detect_price(self, browser: BrowserAdapter) -> Optional[DetectedPrice]:
+        """Best visible price on the page by layout heuristics (see price_detector.py)."""
+        try:
+            raw = await browser.evaluate_script(DETECTOR_SCRIPT, DETECTOR_OPTIONS)
+        except Exception:
+            return None
+        return score_detection(raw)
+
+    async def scrape_page(self, browser: BrowserAdapter, fields: Optional[frozenset] = None) -> Dict:
+        """
+        Run all extraction stages concurrently over one shared page snapshot.
+
+        The hydration blob and structured data (JSON-LD, microdata, meta
+        tags) are parsed first and every field they supply is scored with
+        its source's confidence (see confidence.py); with the
+        ``price_detector`` source, the heuristic price detector follows with
+        its own per-page confidence. A field that reaches
+        the site's confidence threshold skips its DOM strategy; otherwise
+        the DOM result competes with the parsed value and the more
+        confident one wins. Original price needs the current price to pick
+        a higher MRP, so it is chained after the price; details and stock
+        run alongside it. ``sources`` reports where each field came from.
+
+        ``fields`` (see parse_fields) limits the stages that run: fields left
+        out skip their DOM work and come back as None.
+        """
+        wanted = fields or frozenset(SCRAPE_FIELDS)
+        sources = self.plan.sources
+        await self.wait_for_page_ready(browser)
+
+        picks = FieldPicks(self.confidence_threshold)
+        browser.share_page_content()
+        try:
+            parsed = [s for s in (
+                await self.read_page_state(browser) if 'page_state' in sources else None,
+                await self.read_structured_data(browser) if 'structured_data' in sources else None,
+            ) if s]
+            # Without the "selectors" source only parsed data is used
+            dom = 'selectors' in sources
+            for state in parsed:
+                for field in ('price', 'original_price', 'name', 'image_url'):
+                    source = state.source_of(field)
+                    confidence = confidence_for(source)
+                    if not state.consistent:
+                        confidence = min(confidence, INCONSISTENT_CONFIDENCE)
+                    picks.offer(field, getattr(state, field), source, confidence)
+                stock = state.stock()
+                if stock:
+                    source = state.source_of('in_stock')
+                    confidence = confidence_for(source)
+                    if not state.consistent:
+                        confidence = min(confidence, INCONSISTENT_CONFIDENCE)
+                    picks.offer('in_stock', stock, source, confidence)
+                # A complete, consistent source without an MRP suggests there is no discount,
+                # but only weakly: the DOM MRP sweep still runs and overrides it
+                if state.consistent and state.is_complete() and not state.original_price:
+                    picks.offer('original_price', None, state.source_of('price'),
+                                NO_DISCOUNT_CONFIDENCE, allow_empty=True)
+
+            if 'price_detector' in sources and not picks.settled('price'):
+                detected = await self.detect_price(browser)
+                if detected:
+                    picks.offer('price', detected.price, 'price_detector', detected.confidence)
+                    picks.offer('original_price', detected.original_price, 'price_detector', detected.confidence)
+
+            async def price_stage():
+                if dom and not picks.settled('price'):
+                    picks.offer('price', await self.extract_price(browser), 'selector')
+                if dom and 'original_price' in wanted and not picks.settled('original_price'):
+                    picks.offer('original_price',
+                                await self.extract_original_price(browser, picks.value('price')), 'mrp_sweep')
+
+            async def details_stage():
+                if not dom or all(picks.settled(field) for field in ('name', 'image_url') if field in wanted):
+                    return {'rating': None, 'review_count': None}
+                details = await self.extract_product_details(browser)
+                picks.offer('name', details.get('name'), 'selector')
+                picks.offer('image_url', details.get('image_url'), 'selector')
+                return details
+
+            async def stock_stage():
+                if not dom or 'stock' not in wanted or picks.settled('in_stock'):
+                    return
+                stock = await self.check_stock_status(browser)
+                picks.offer('in_stock', stock, 'stock_default' if stock.get('in_stock') else 'stock_phrase')
+
+            outcomes = await asyncio.gather(
+                price_stage(),
+                details_stage(),
+                stock_stage(),
+                return_exceptions=True
+            )
+        finally:
+            browser.share_page_content(False)
+
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+
+        def value(field, key=None):
+            return picks.value(key or field) if field in wanted else None
+
+        price, original_price = picks.value('price'), value('original_price')
+        if price and original_price and \
+                (self.price_to_float(original_price) or 0) <= (self.price_to_float(price) or 0):
+            original_price = None
+        details = outcomes[1]
+        sources = {field: source for field, source in picks.report().items()
+                   if ('stock' if field == 'in_stock' else field) in wanted}
+        if self.selector_stats:
+            self.selector_stats.record_sources(self.site_name, sources)
+        return {
+            'price': price,
+            'original_price': original_price,
+            'details': {
+                'name': value('name'),
+                'image_url': value('image_url'),
+                'rating': details.get('rating'),
+                'review_count': details.get('review_count'),
+            },
+            'stock': value('stock', 'in_stock'),
+            'sources': sources,
+        }
+
     # ── Backward-Compat Wrappers (old _playwright/_selenium methods) ──
     # These create a BrowserAdapter internally so old call sites still work.
 
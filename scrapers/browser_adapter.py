@@ -8,14 +8,64 @@ Usage:
     # Playwright
     browser = BrowserAdapter(page, 'playwright')
     
-    # Selenium
+    # Selenium (or an undetected-chromedriver session, 'undetected')
     browser = BrowserAdapter(driver, 'selenium')
     
     # Then in scraper:
     el = await browser.query_selector('.price')
     text = await browser.get_text(el)
 """
-from typing import Optional, List, Any
+import asyncio
+import functools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Any, Callable
+
+
+JSONLD_SELECTOR = 'script[type="application/ld+json"]'
+
+# WebDriver-based backend types. undetected-chromedriver sessions are
+# Selenium WebDrivers, so they share every Selenium code path below.
+SELENIUM_BACKENDS = ('selenium', 'undetected')
+
+
+def build_ready_predicate(selectors: List[str] = None, jsonld: bool = False,
+                          script: str = None) -> str:
+    """
+    Build a JS predicate that is true once any readiness condition holds.
+
+    Each check is isolated in its own try/catch so one invalid selector
+    (e.g. Playwright-only ``:has-text``) cannot hide the others.
+    """
+    checks = [f"document.querySelector({json.dumps(sel)})" for sel in (selectors or [])]
+    if jsonld:
+        checks.append(f"document.querySelector({json.dumps(JSONLD_SELECTOR)})")
+    if script:
+        checks.append(f"({script})")
+    if not checks:
+        return "() => true"
+    guarded = [f"(() => {{ try {{ return !!{check}; }} catch (e) {{ return false; }} }})()" for check in checks]
+    return "() => " + " || ".join(guarded)
+
+
+# Bounded pool for blocking Selenium/WebDriver calls. Each call is an HTTP
+# round trip to chromedriver, so running them inline would freeze every other
+# coroutine on the event loop (the whole batch) while one URL falls back.
+SELENIUM_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv('SELENIUM_MAX_WORKERS', 8)),
+    thread_name_prefix='selenium'
+)
+
+
+async def run_blocking(fn: Callable, *args, executor: ThreadPoolExecutor = None, **kwargs) -> Any:
+    """Run a blocking call on the Selenium executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor or SELENIUM_EXECUTOR,
+        functools.partial(fn, *args, **kwargs)
+    )
 
 
 class BrowserElement:
@@ -35,18 +85,29 @@ class BrowserAdapter:
     """
     Unified async interface for both Playwright Page and Selenium WebDriver.
     
-    All methods are async. For Selenium (which is synchronous), the calls
-    simply return values directly — Python's async/await handles this fine.
+    All methods are async. Selenium is synchronous, so each WebDriver call is
+    offloaded to a bounded thread pool and serialised per driver (a WebDriver
+    session is not safe for concurrent commands).
     """
     
-    def __init__(self, backend, backend_type: str):
+    def __init__(self, backend, backend_type: str, executor: ThreadPoolExecutor = None):
         """
         Args:
             backend: Playwright Page or Selenium WebDriver instance
-            backend_type: 'playwright' or 'selenium'
+            backend_type: 'playwright', or a SELENIUM_BACKENDS type for a WebDriver
+            executor: Thread pool for blocking Selenium calls (defaults to SELENIUM_EXECUTOR)
         """
         self._backend = backend
         self._type = backend_type
+        self._executor = executor
+        self._driver_lock = asyncio.Lock()
+        self._share_content = False
+        self._content_snapshot = None
+
+    async def _blocking(self, fn: Callable, *args) -> Any:
+        """Run one blocking WebDriver call off the event loop, one at a time per driver."""
+        async with self._driver_lock:
+            return await run_blocking(fn, *args, executor=self._executor)
     
     @property
     def backend_type(self) -> str:
@@ -77,8 +138,9 @@ class BrowserAdapter:
                 return BrowserElement(el, self._type) if el else None
             else:
                 from selenium.webdriver.common.by import By
-                el = self._backend.find_element(By.CSS_SELECTOR, selector)
-                return BrowserElement(el, self._type) if el else None
+                # find_elements returns [] on a miss instead of raising after the implicit wait
+                elements = await self._blocking(self._backend.find_elements, By.CSS_SELECTOR, selector)
+                return BrowserElement(elements[0], self._type) if elements else None
         except Exception:
             return None
     
@@ -90,7 +152,7 @@ class BrowserAdapter:
                 return [BrowserElement(el, self._type) for el in elements]
             else:
                 from selenium.webdriver.common.by import By
-                elements = self._backend.find_elements(By.CSS_SELECTOR, selector)
+                elements = await self._blocking(self._backend.find_elements, By.CSS_SELECTOR, selector)
                 return [BrowserElement(el, self._type) for el in elements]
         except Exception:
             return []
@@ -103,8 +165,9 @@ class BrowserAdapter:
                 return BrowserElement(el, self._type) if el else None
             else:
                 from selenium.webdriver.common.by import By
-                el = self._backend.find_element(By.XPATH, xpath)
-                return BrowserElement(el, self._type) if el else None
+                # find_elements returns [] on a miss instead of raising after the implicit wait
+                elements = await self._blocking(self._backend.find_elements, By.XPATH, xpath)
+                return BrowserElement(elements[0], self._type) if elements else None
         except Exception:
             return None
 
@@ -116,7 +179,7 @@ class BrowserAdapter:
                 return [BrowserElement(el, self._type) for el in elements]
             else:
                 from selenium.webdriver.common.by import By
-                elements = self._backend.find_elements(By.XPATH, xpath)
+                elements = await self._blocking(self._backend.find_elements, By.XPATH, xpath)
                 return [BrowserElement(el, self._type) for el in elements]
         except Exception:
             return []
@@ -130,7 +193,7 @@ class BrowserAdapter:
                 text = await element.raw.text_content()
                 return (text or '').strip()
             else:
-                return (element.raw.text or '').strip()
+                return (await self._blocking(lambda: element.raw.text) or '').strip()
         except Exception:
             return ''
     
@@ -141,7 +204,7 @@ class BrowserAdapter:
                 text = await element.raw.inner_text()
                 return (text or '').strip()
             else:
-                return (element.raw.text or '').strip()
+                return (await self._blocking(lambda: element.raw.text) or '').strip()
         except Exception:
             return ''
     
@@ -151,19 +214,36 @@ class BrowserAdapter:
             if self._type == 'playwright':
                 return await element.raw.get_attribute(attr)
             else:
-                return element.raw.get_attribute(attr)
+                return await self._blocking(element.raw.get_attribute, attr)
         except Exception:
             return None
     
     # ── Page-level Operations ──
-    
+
+    def share_page_content(self, enabled: bool = True) -> None:
+        """
+        Serve get_page_content() from one shared snapshot while enabled.
+
+        Concurrent extraction stages all read the same HTML instead of each
+        serialising the DOM again. Disabling drops the snapshot.
+        """
+        self._share_content = enabled
+        self._content_snapshot = None
+
     async def get_page_content(self) -> str:
         """Get full page HTML content"""
+        if self._share_content:
+            if self._content_snapshot is None:
+                self._content_snapshot = asyncio.ensure_future(self._read_page_content())
+            return await self._content_snapshot
+        return await self._read_page_content()
+
+    async def _read_page_content(self) -> str:
         try:
             if self._type == 'playwright':
                 return await self._backend.content()
             else:
-                return self._backend.page_source
+                return await self._blocking(lambda: self._backend.page_source)
         except Exception:
             return ''
     
@@ -173,7 +253,7 @@ class BrowserAdapter:
             if self._type == 'playwright':
                 return await self._backend.title()
             else:
-                return self._backend.title
+                return await self._blocking(lambda: self._backend.title)
         except Exception:
             return ''
     
@@ -183,10 +263,37 @@ class BrowserAdapter:
             if self._type == 'playwright':
                 return self._backend.url
             else:
-                return self._backend.current_url
+                return await self._blocking(lambda: self._backend.current_url)
         except Exception:
             return ''
     
+    # ── Readiness ──
+
+    async def wait_until_ready(self, selectors: List[str] = None, jsonld: bool = False,
+                               script: str = None, timeout: float = 5.0,
+                               poll_interval: float = 0.1) -> bool:
+        """
+        Return as soon as the page satisfies any readiness condition.
+
+        Conditions are CSS selectors, a JSON-LD block, or a JS expression.
+        Returns False once ``timeout`` seconds pass without a match.
+        """
+        predicate = build_ready_predicate(selectors, jsonld, script)
+        try:
+            if self._type == 'playwright':
+                await self._backend.wait_for_function(predicate, timeout=timeout * 1000)
+                return True
+
+            deadline = time.monotonic() + timeout
+            while True:
+                if await self._blocking(self._backend.execute_script, f"return ({predicate})();"):
+                    return True
+                if time.monotonic() >= deadline:
+                    return False
+                await asyncio.sleep(poll_interval)
+        except Exception:
+            return False
+
     # ── Advanced Operations ──
     
     async def evaluate(self, element: BrowserElement, js_expression: str) -> Any:
@@ -200,6 +307,21 @@ class BrowserAdapter:
         except Exception:
             return None
     
+    async def evaluate_script(self, script: str, arg: Any = None) -> Any:
+        """
+        Run a page-level JS function (``(arg) => ...``) and return its JSON result.
+        Works on both backends; returns None on any error.
+        """
+        try:
+            if self._type == 'playwright':
+                return await self._backend.evaluate(script, arg)
+            else:
+                return await self._blocking(
+                    self._backend.execute_script, f"return ({script})(arguments[0]);", arg
+                )
+        except Exception:
+            return None
+
     async def evaluate_handle(self, element: BrowserElement, js_expression: str) -> Optional[BrowserElement]:
         """Execute JS and return element handle. Playwright-only; returns None for Selenium."""
         try:
@@ -218,7 +340,7 @@ class BrowserAdapter:
             if self._type == 'playwright':
                 return await element.raw.is_visible()
             else:
-                return element.raw.is_displayed()
+                return await self._blocking(element.raw.is_displayed)
         except Exception:
             return False
     
@@ -228,6 +350,6 @@ class BrowserAdapter:
             if self._type == 'playwright':
                 await element.raw.click()
             else:
-                element.raw.click()
+                await self._blocking(element.raw.click)
         except Exception:
             pass
@@ -0,0 +1,122 @@
+"""
+Canonical product identity for e-commerce URLs.
+
+The same product reaches the scraper as short links, variant URLs
+(``/dp/ASIN/?th=1``), search-result URLs full of ``ref=``/``sr=`` params and
+affiliate wrappers. ``product_key`` reduces all of them to a stable
+``<domain>:<id>`` key and ``canonicalize_url`` strips tracking params, so
+caches, dedupe and price history can key on product identity instead of raw
+URL strings. The key carries the registered domain rather than the site
+name: amazon.in and amazon.com (or flipkart.com and shopsy.in) share id
+formats but not products.
+"""
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from .scraper_factory import ScraperFactory
+
+
+# Query params that never change which product a URL points to
+TRACKING_PARAMS = {
+    'ref', 'ref_', 'tag', 'th', 'psc', 'sr', 'qid', 'keywords', 'crid', 'sprefix',
+    '_encoding', 'smid', 'linkcode', 'linkid', 'creative', 'creativeasin', 'ascsubtag',
+    'affid', 'affextparam1', 'affextparam2', 'lid', 'marketplace', 'store', 'srno',
+    'otracker', 'otracker1', 'ssid', 'fm', 'iid', 'ppt', 'ppn', 'spla', 'cmpid',
+    'gclid', 'fbclid', 'src', 'source', 'ptype', 'intcmp', 'pos',
+}
+TRACKING_PREFIXES = ('utm_', 'pf_rd_', 'pd_rd_', 'content-id', 'ref_')
+
+# Query params that identify the product (or variant) on a site
+IDENTITY_PARAMS = {
+    'flipkart': {'pid'},
+    'nykaa': {'productid', 'skuid'},
+}
+
+AMAZON_ASIN = re.compile(r'/(?:dp|gp/product|gp/aw/d|exec/obidos/asin|o/asin)/([A-Z0-9]{10})(?:[/?]|$)', re.I)
+FLIPKART_ITEM = re.compile(r'/p/(itm[a-z0-9]+)', re.I)
+MYNTRA_ID = re.compile(r'/(\d{5,})(?:/buy)?/?$')
+NYKAA_ID = re.compile(r'/p/(\d+)')
+AJIO_CODE = re.compile(r'/p/([a-z0-9_]+)', re.I)
+MEESHO_ID = re.compile(r'/([^/]+)/p/([a-z0-9]+)', re.I)
+SNAPDEAL_ID = re.compile(r'/product/[^/]+/(\d+)')
+
+
+def _is_tracking(param: str) -> bool:
+    name = param.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def product_key(url: str, variant: bool = False) -> Optional[str]:
+    """
+    Return a stable ``<domain>:<id>`` key for a product URL, or None if the
+    URL does not carry a recognisable product id (short links, search pages,
+    unsupported sites). With ``variant``, a variant id the URL selects is
+    appended as ``<domain>:<id>:<variant>`` (Flipkart's ``pid``, Nykaa's
+    ``skuId``).
+    """
+    if not url:
+        return None
+    url = ScraperFactory.unwrap_destination_url(url)
+    site = ScraperFactory.identify_site(url)
+    parsed = urlparse(url)
+    path = parsed.path
+    params = {k.lower(): v for k, v in parse_qsl(parsed.query)}
+
+    product_id = variant_id = None
+    if site == 'amazon':
+        match = AMAZON_ASIN.search(path)
+        product_id = match.group(1).upper() if match else None
+    elif site == 'flipkart':
+        # The itm id identifies the listing, pid the variant (only a fallback id without itm)
+        match = FLIPKART_ITEM.search(path)
+        product_id = match.group(1).lower() if match else params.get('pid')
+        variant_id = params.get('pid') if match else None
+    elif site == 'myntra':
+        match = MYNTRA_ID.search(path)
+        product_id = match.group(1) if match else None
+    elif site == 'nykaa':
+        match = NYKAA_ID.search(path)
+        product_id = match.group(1) if match else params.get('productid')
+        variant_id = params.get('skuid')
+    elif site == 'ajio':
+        match = AJIO_CODE.search(path)
+        product_id = match.group(1).lower() if match else None
+    elif site == 'meesho':
+        match = MEESHO_ID.search(path)
+        product_id = match.group(2).lower() if match else None
+    elif site == 'snapdeal':
+        match = SNAPDEAL_ID.search(path)
+        product_id = match.group(1) if match else None
+
+    domain = ScraperFactory.sites().domain(parsed.netloc)
+    if not product_id or not domain:
+        return None
+    if variant and variant_id:
+        return f"{domain}:{product_id}:{variant_id}"
+    return f"{domain}:{product_id}"
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalise a product URL: unwrap affiliate redirects, drop tracking params
+    and fragments, lower-case the host and (for Amazon) reduce to ``/dp/<ASIN>``.
+    """
+    if not url:
+        return url
+    url = ScraperFactory.unwrap_destination_url(url)
+    site = ScraperFactory.identify_site(url)
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+
+    key = product_key(url)
+    if site == 'amazon' and key:
+        return urlunparse(('https', host, f"/dp/{key.split(':', 1)[1]}", '', '', ''))
+
+    keep = IDENTITY_PARAMS.get(site, set())
+    query = [
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if k.lower() in keep or (not keep and not _is_tracking(k))
+    ]
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse((parsed.scheme or 'https', host, path, '', urlencode(query), ''))
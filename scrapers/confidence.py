@@ -0,0 +1,74 @@
+"""
+Confidence scores for extraction sources.
+
+Every field a scrape returns is tagged with the source that supplied it and
+that source's confidence. The extraction pipeline skips the remaining (more
+expensive) strategies for a field once a source at or above the threshold
+has answered it. The threshold comes from ``CONFIDENCE_THRESHOLD`` or a
+site's ``"confidence_threshold"`` in selectors.json.
+"""
+import os
+from typing import Dict, Optional
+
+
+CONFIDENCE_THRESHOLD = float(os.getenv('CONFIDENCE_THRESHOLD', 0.8))
+
+SOURCE_CONFIDENCE = {
+    'api': 0.95,            # retailer JSON API response
+    'page_state': 0.9,      # hydration blob (__PRELOADED_STATE__, __myx, __NEXT_DATA__, ...)
+    'json-ld': 0.9,
+    'microdata': 0.7,       # below the threshold: selectors confirm it
+    'selector': 0.75,       # site CSS selectors
+    'opengraph': 0.7,
+    'stock_phrase': 0.7,    # out-of-stock phrase found in the page
+    'price_detector': 0.6,  # in-page heuristic (its own per-page confidence is used when offered)
+    'mrp_sweep': 0.6,       # generic strike-through / page-source MRP sweep
+    'stock_default': 0.5,   # no out-of-stock phrase found
+}
+DEFAULT_CONFIDENCE = 0.5
+# Cap for values from sources that disagree with each other
+INCONSISTENT_CONFIDENCE = 0.4
+# "No MRP" inferred from a source that simply omits a list price (schema.org
+# Offers rarely carry one): below mrp_sweep, so a visible MRP still wins
+NO_DISCOUNT_CONFIDENCE = 0.5
+
+
+def confidence_for(source: Optional[str]) -> float:
+    if not source:
+        return 0.0
+    if source.startswith('__'):
+        return SOURCE_CONFIDENCE['page_state']
+    return SOURCE_CONFIDENCE.get(source, DEFAULT_CONFIDENCE)
+
+
+class FieldPicks:
+    """Best (value, source, confidence) seen so far per field."""
+
+    def __init__(self, threshold: float = CONFIDENCE_THRESHOLD):
+        self.threshold = threshold
+        self._picks: Dict[str, tuple] = {}
+
+    def offer(self, field: str, value, source: str, confidence: float = None, allow_empty: bool = False) -> None:
+        """Keep ``value`` if it is the most confident answer for ``field`` so far."""
+        if value in (None, '') and not allow_empty:
+            return
+        if confidence is None:
+            confidence = confidence_for(source)
+        current = self._picks.get(field)
+        if current is None or confidence > current[2]:
+            self._picks[field] = (value, source, confidence)
+
+    def value(self, field: str):
+        pick = self._picks.get(field)
+        return pick[0] if pick else None
+
+    def settled(self, field: str) -> bool:
+        pick = self._picks.get(field)
+        return pick is not None and pick[2] >= self.threshold
+
+    def report(self) -> Dict[str, Dict]:
+        """``{field: {'source': ..., 'confidence': ...}}`` for every answered field."""
+        return {
+            field: {'source': source, 'confidence': round(confidence, 2)}
+            for field, (_, source, confidence) in self._picks.items()
+        }
@@ -2,13 +2,41 @@
 Flipkart scraper (including Shopsy)
 """
 import re
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from .base_scraper import BaseScraper
 from .browser_adapter import BrowserAdapter
-import asyncio
+from .page_analysis import analyse
+from .prices import clean_price
 import html
 import json
 
+# Bounded windows between a pricing key and its MRP in Flipkart's page payload
+PAYLOAD_WINDOW = 1000
+LABEL_WINDOW = 300
+FLIPKART_MRP_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in (
+        rf'"ppd"\s*:\s*\{{[^{{}}]{{0,{PAYLOAD_WINDOW}}}?"mrp"\s*:\s*"?([\d,]+(?:\.\d{{1,2}})?)',
+        rf'"mrp"\s*:\s*"?([\d,]+(?:\.\d{{1,2}})?)"?[^{{}}]{{0,{PAYLOAD_WINDOW}}}?"(?:fsp|finalPrice)"',
+        rf'"text"\s*:\s*"₹\s*([\d,]+(?:\.\d{{1,2}})?)"[^{{}}]{{0,{LABEL_WINDOW}}}?"text"\s*:\s*"MRP',
+        rf'"text"\s*:\s*"MRP[^{{}}]{{0,{LABEL_WINDOW}}}?"text"\s*:\s*"₹\s*([\d,]+(?:\.\d{{1,2}})?)"',
+    )
+]
+
+
+def flipkart_mrp_candidates(content: str) -> List[str]:
+    """MRP candidates from Flipkart's product-pricing payload (runs on the page analysis pool)."""
+    if not content:
+        return []
+    unescaped = html.unescape(content)
+    candidates = []
+    for pattern in FLIPKART_MRP_PATTERNS:
+        for match in pattern.findall(unescaped):
+            cleaned = clean_price(match)
+            if cleaned != 'N/A':
+                candidates.append(cleaned)
+    return candidates
+
+
 class FlipkartScraper(BaseScraper):
     """Scraper for Flipkart.com and Shopsy.in"""
     
@@ -46,10 +74,7 @@ class FlipkartScraper(BaseScraper):
     async def extract_price(self, browser: BrowserAdapter) -> Optional[str]:
         """Extract price from Flipkart/Shopsy using JSON-LD first, then CSS selectors"""
         
-        # 1. Give Flipkart's JS exactly 3 seconds to render the price on the screen
-        await asyncio.sleep(3)
-        
-        # 2. Check for error page first
+        # Check for error page first
         try:
             page_content = await browser.get_page_content()
             if "Something went wrong" in page_content and "Please try again later" in page_content:
@@ -231,10 +256,8 @@ class FlipkartScraper(BaseScraper):
 
         try:
             content = await browser.get_page_content()
-            original_price = self._extract_original_price_from_flipkart_content(
-                content,
-                current_price
-            )
+            candidates = await analyse(flipkart_mrp_candidates, content, default=[])
+            original_price = self._pick_flipkart_original_price(candidates, current_price)
             if original_price:
                 print(f"  ✅ Found original price via Flipkart page source: {original_price}")
                 return original_price
@@ -243,30 +266,8 @@ class FlipkartScraper(BaseScraper):
 
         return None
 
-    def _extract_original_price_from_flipkart_content(
-        self,
-        content: str,
-        current_price: Optional[str] = None
-    ) -> Optional[str]:
-        """Extract main product MRP from Flipkart's product-pricing payload."""
-        if not content:
-            return None
-
-        candidates = []
-        unescaped = html.unescape(content)
-        patterns = [
-            r'"ppd"\s*:\s*\{[^{}]{0,1000}?"mrp"\s*:\s*"?([\d,]+(?:\.\d{1,2})?)',
-            r'"mrp"\s*:\s*"?([\d,]+(?:\.\d{1,2})?)"?[^{}]{0,1000}?"(?:fsp|finalPrice)"',
-            r'"text"\s*:\s*"₹\s*([\d,]+(?:\.\d{1,2})?)"[^{}]{0,300}?"text"\s*:\s*"MRP',
-            r'"text"\s*:\s*"MRP[^{}]{0,300}?"text"\s*:\s*"₹\s*([\d,]+(?:\.\d{1,2})?)"',
-        ]
-
-        for pattern in patterns:
-            for match in re.findall(pattern, unescaped, flags=re.IGNORECASE | re.DOTALL):
-                cleaned = self.clean_price(match)
-                if self.is_valid_price(cleaned):
-                    candidates.append(cleaned)
-
+    def _pick_flipkart_original_price(self, candidates: List[str], current_price: Optional[str]) -> Optional[str]:
+        """Main product MRP among payload candidates (ignores other listings' prices far above this one)."""
         current_value = self.price_to_float(current_price) if current_price else None
         if current_value:
             candidates = [
@@ -465,7 +466,7 @@ class FlipkartScraper(BaseScraper):
                 element = await browser.query_selector(selector)
                 if element:
                     text = await browser.get_text(element)
-                    if any(oos_text in text.lower() for oos_text in self.stock_indicators['out_of_stock']):
+                    if self.plan.stock_matcher.search(text):
                         stock_status['in_stock'] = False
                         stock_status['stock_status'] = 'out_of_stock'
                         stock_status['message'] = f'Product is out of stock (selector: {selector})'
@@ -504,13 +505,12 @@ class FlipkartScraper(BaseScraper):
         try:
             product_area = await browser.query_selector('[class*="product"], [class*="pdp"], [id*="product"]')
             if product_area:
-                product_text = (await browser.get_text(product_area)).lower()
-                for oos_text in self.stock_indicators['out_of_stock']:
-                    if oos_text in product_text:
-                        stock_status['in_stock'] = False
-                        stock_status['stock_status'] = 'out_of_stock'
-                        stock_status['message'] = f'Product appears to be out of stock (detected in product area: "{oos_text}")'
-                        return stock_status
+                oos_text = self.plan.stock_matcher.search(await browser.get_text(product_area))
+                if oos_text:
+                    stock_status['in_stock'] = False
+                    stock_status['stock_status'] = 'out_of_stock'
+                    stock_status['message'] = f'Product appears to be out of stock (detected in product area: "{oos_text}")'
+                    return stock_status
         except:
             pass
             
@@ -167,7 +167,7 @@ class HygulifeScraper(BaseScraper):
                 element = await browser.query_selector(selector)
                 if element:
                     text = await browser.get_text(element)
-                    if any(oos_text in text.lower() for oos_text in self.stock_indicators['out_of_stock']):
+                    if self.plan.stock_matcher.search(text):
                         stock_status['in_stock'] = False
                         stock_status['stock_status'] = 'out_of_stock'
                         stock_status['message'] = f'Product is out of stock (selector: {selector})'
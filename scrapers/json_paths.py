@@ -0,0 +1,76 @@
+"""
+Dotted-path lookups into parsed JSON (API payloads, hydration blobs).
+
+Paths are dotted keys; ``*`` matches any list item or dict value, ``**``
+matches any depth and numeric segments index lists.
+"""
+import re
+from typing import Any, Iterator, List, Optional
+
+
+OUT_OF_STOCK_VALUES = {'false', '0', 'no', 'outofstock', 'out_of_stock', 'soldout', 'sold_out', 'unavailable', ''}
+
+
+def iter_path(data: Any, path: str) -> Iterator[Any]:
+    """Yield every value in ``data`` matched by a dotted path (supports ``*`` and ``**``)."""
+    yield from _walk(data, path.split('.') if path else [])
+
+
+def _walk(node: Any, parts: List[str]) -> Iterator[Any]:
+    if not parts:
+        yield node
+        return
+    head, rest = parts[0], parts[1:]
+    if head == '**':
+        yield from _walk(node, rest)
+        for child in _children(node):
+            yield from _walk(child, parts)
+    elif head == '*':
+        for child in _children(node):
+            yield from _walk(child, rest)
+    elif isinstance(node, dict) and head in node:
+        yield from _walk(node[head], rest)
+    elif isinstance(node, list) and head.isdigit() and int(head) < len(node):
+        yield from _walk(node[int(head)], rest)
+
+
+def _children(node: Any) -> List[Any]:
+    if isinstance(node, dict):
+        return list(node.values())
+    if isinstance(node, list):
+        return node
+    return []
+
+
+def first_value(data: Any, paths: List[str]) -> Any:
+    """First non-empty scalar matched by any of ``paths`` (tried in order)."""
+    for path in paths:
+        for value in iter_path(data, path):
+            if value not in (None, '', [], {}) and not isinstance(value, (dict, list)):
+                return value
+    return None
+
+
+def format_price(value: Any) -> Optional[str]:
+    """Render an API price (number or string) like the DOM scrapers do, e.g. ``1,299``."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        match = re.search(r'\d[\d,]*(?:\.\d+)?', value)
+        if not match:
+            return None
+        value = match.group(0).replace(',', '')
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if number <= 0:
+        return None
+    return f"{number:,.0f}" if number.is_integer() else f"{number:,.2f}"
+
+
+def truthy_flag(value: Any) -> bool:
+    """Interpret a stock flag/status from JSON (``outOfStock`` strings count as False)."""
+    if isinstance(value, str):
+        return value.strip().lower().replace(' ', '') not in OUT_OF_STOCK_VALUES
+    return bool(value)
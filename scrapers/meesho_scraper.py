@@ -29,10 +29,6 @@ class MeeshoScraper(BaseScraper):
     
     async def extract_price(self, browser: BrowserAdapter) -> Optional[str]:
         """Extract price from Meesho with robust fallback"""
-        
-        # SMART WAIT: Give Meesho's SPA time to render the price
-        import asyncio
-        await asyncio.sleep(3)
 
         # Pull selectors dynamically from selectors.json
         selectors = self.price_selectors
@@ -44,13 +44,6 @@ class MyntraScraper(BaseScraper):
     
     async def extract_product_details(self, browser: BrowserAdapter) -> Dict:
         """Extract product details from Myntra"""
-        # SMART WAIT: Wait dynamically instead of sleeping blindly
-        try:
-            if browser.engine == 'playwright':
-                await browser.page.wait_for_selector('.pdp-name, .pdp-title', timeout=4000)
-        except:
-            pass
-            
         details = {
             'name': None,
             'image_url': None,
@@ -108,13 +101,6 @@ class MyntraScraper(BaseScraper):
 
     async def extract_price(self, browser: BrowserAdapter) -> Optional[str]:
         """Extract price from Myntra"""
-        # SMART WAIT: Wait dynamically for the price tag
-        try:
-            if browser.engine == 'playwright':
-                await browser.page.wait_for_selector('.pdp-price, .pdp-discounted-price', timeout=4000)
-        except:
-            pass
-            
         selectors = self.price_selectors
         
         for selector in selectors:
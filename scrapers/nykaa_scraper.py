@@ -2,9 +2,35 @@
 Nykaa scraper
 """
 import re
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from .base_scraper import BaseScraper
 from .browser_adapter import BrowserAdapter
+from .page_analysis import analyse
+from .prices import clean_price
+
+# Characters allowed between the MRP element's opening tag and its ₹ amount
+MRP_ELEMENT_WINDOW = 300
+NYKAA_PRODUCT_NULL_PATTERN = re.compile(r'"product"\s*:\s*null', re.IGNORECASE)
+NYKAA_MRP_PATTERNS = [
+    re.compile(r'"(?:mrp|marketPrice|originalPrice)"\s*:\s*"?([\d,]+(?:\.\d{1,2})?)"?', re.IGNORECASE),
+    re.compile(
+        rf'<[^>]*class="[^"]*css-u05rr[^"]*"[^>]*>[^₹]{{0,{MRP_ELEMENT_WINDOW}}}₹\s*([\d,]+(?:\.\d{{1,2}})?)',
+        re.IGNORECASE
+    ),
+]
+
+
+def nykaa_mrp_candidates(content: str) -> Optional[List[str]]:
+    """MRP candidates from Nykaa's page source, or None on a "product": null (not found) page."""
+    if not content or NYKAA_PRODUCT_NULL_PATTERN.search(content):
+        return None
+    candidates = []
+    for pattern in NYKAA_MRP_PATTERNS:
+        for match in pattern.findall(content):
+            cleaned = clean_price(match)
+            if cleaned != 'N/A':
+                candidates.append(cleaned)
+    return candidates
 
 
 class NykaaScraper(BaseScraper):
@@ -41,22 +67,7 @@ class NykaaScraper(BaseScraper):
     
     async def extract_price(self, browser: BrowserAdapter) -> Optional[str]:
         """Extract price from Nykaa with multi-strategy approach"""
-        
-        # SMART WAIT: Wait dynamically for the redirect and the product title (h1) to load
-        try:
-            if browser.engine == 'playwright':
-                # Wait up to 6 seconds for the main product title to render
-                await browser.page.wait_for_selector('h1', timeout=6000)
-                # Give React one extra second to inject the price after the title appears
-                import asyncio
-                await asyncio.sleep(1)
-            else:
-                import asyncio
-                await asyncio.sleep(4)
-        except Exception as e:
-            print(f"  Nykaa dynamic wait failed: {e}")
-            pass
-        
+
         # DEAD LINK PROTECTION: Stop if Nykaa shows the 404 text
         try:
             page_content = await browser.get_page_content()
@@ -183,17 +194,9 @@ class NykaaScraper(BaseScraper):
 
         try:
             content = await browser.get_page_content()
-            if '"product":null' in content.lower():
+            candidates = await analyse(nykaa_mrp_candidates, content)
+            if candidates is None:
                 return None
-            candidates = []
-            for pattern in [
-                r'"(?:mrp|marketPrice|originalPrice)"\s*:\s*"?([\d,]+(?:\.\d{1,2})?)"?',
-                r'<[^>]*class="[^"]*css-u05rr[^"]*"[^>]*>.*?₹\s*([\d,]+(?:\.\d{1,2})?)',
-            ]:
-                for match in re.findall(pattern, content, re.IGNORECASE | re.DOTALL):
-                    cleaned = self.clean_price(match)
-                    if self.is_valid_price(cleaned):
-                        candidates.append(cleaned)
             return self.pick_original_price(candidates, current_price)
         except Exception:
             return None
@@ -0,0 +1,183 @@
+"""
+Process pool for CPU-heavy page-source analysis.
+
+Regex scans, ``html.unescape`` and JSON parsing over a multi-MB page source
+take tens of milliseconds of pure CPU. Run on the event loop thread, that
+stalls every other scrape sharing the loop (the whole batch), and threads do
+not help because of the GIL. Large pages are therefore analysed in a small
+process pool; small pages stay inline, where pickling the page to a worker
+would cost more than the scan.
+
+Limits:
+  - pages are truncated to PAGE_ANALYSIS_MAX_CHARS before any scan
+  - at most ``workers * 4`` analyses are queued; past that, work runs inline
+    (back-pressure rather than unbounded queues of page copies)
+  - an analysis that exceeds PAGE_ANALYSIS_TIMEOUT (counted from when a
+    worker takes it, not from when it was queued) gets the caller its
+    default, and the pool is torn down with its worker processes
+    terminated: a hung scan would otherwise keep its worker busy and every
+    later page would queue behind it. The next call starts a fresh pool.
+
+Tasks and their arguments must be picklable (module-level functions, or
+methods of picklable objects such as a PhraseMatcher). Per-task call counts
+and timings are kept for the /health endpoint.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict
+
+
+PAGE_ANALYSIS_WORKERS = int(os.getenv('PAGE_ANALYSIS_WORKERS', 2))  # 0 = always inline
+PAGE_ANALYSIS_MIN_CHARS = int(os.getenv('PAGE_ANALYSIS_MIN_CHARS', 200_000))
+PAGE_ANALYSIS_MAX_CHARS = int(os.getenv('PAGE_ANALYSIS_MAX_CHARS', 5_000_000))
+PAGE_ANALYSIS_TIMEOUT = float(os.getenv('PAGE_ANALYSIS_TIMEOUT', 5))
+# How often a queued analysis checks whether a worker has taken it
+QUEUE_POLL_INTERVAL = 0.01
+
+
+def _pool_context():
+    """forkserver where available (no fork of a threaded server, no re-import of __main__), else spawn."""
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        # Workers fork from a server that has already imported the scrapers package
+        context.set_forkserver_preload(['scrapers.page_analysis'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+class PageAnalyzer:
+    """Runs page-source analysis tasks inline or on a bounded process pool."""
+
+    def __init__(self, workers: int = PAGE_ANALYSIS_WORKERS,
+                 min_chars: int = PAGE_ANALYSIS_MIN_CHARS,
+                 max_chars: int = PAGE_ANALYSIS_MAX_CHARS,
+                 timeout: float = PAGE_ANALYSIS_TIMEOUT):
+        """
+        Args:
+            workers: Worker processes; 0 analyses every page inline
+            min_chars: Pages shorter than this are analysed inline
+            max_chars: Pages are truncated to this many characters
+            timeout: Seconds before a pooled analysis is abandoned
+        """
+        self.workers = workers
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.max_pending = workers * 4
+        self._pool = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        # task name -> {'calls', 'offloaded', 'timeouts', 'total_ms', 'max_ms'}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _acquire_pool(self):
+        """The pool plus a queue slot, or None when disabled or saturated (caller runs inline)."""
+        with self._lock:
+            if not self.workers or self._pending >= self.max_pending:
+                return None
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=_pool_context())
+            self._pending += 1
+            return self._pool
+
+    def _release_pool(self, pool, discard: bool = False) -> None:
+        """Free a queue slot; ``discard`` tears the pool down so the next call gets a fresh one."""
+        with self._lock:
+            self._pending -= 1
+            if discard and self._pool is pool:
+                self._pool = None
+        if discard:
+            _terminate(pool)
+
+    def _record(self, name: str, elapsed: float, offloaded: bool, timed_out: bool = False) -> None:
+        with self._lock:
+            entry = self._stats.setdefault(
+                name, {'calls': 0, 'offloaded': 0, 'timeouts': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+            )
+            entry['calls'] += 1
+            entry['offloaded'] += offloaded
+            entry['timeouts'] += timed_out
+            entry['total_ms'] += elapsed * 1000
+            entry['max_ms'] = max(entry['max_ms'], elapsed * 1000)
+
+    async def run(self, task: Callable, content: str, *args, default: Any = None) -> Any:
+        """
+        ``task(content, *args)`` with ``content`` truncated to max_chars, off the
+        event loop for large pages. Returns ``default`` on timeout; exceptions
+        raised by the task propagate.
+        """
+        if not content:
+            return task(content, *args)
+        content = content[:self.max_chars]
+        name = getattr(task, '__qualname__', repr(task))
+        pool = self._acquire_pool() if len(content) >= self.min_chars else None
+        started = time.perf_counter()
+
+        if pool is None:
+            try:
+                return task(content, *args)
+            finally:
+                self._record(name, time.perf_counter() - started, offloaded=False)
+
+        broken = timed_out = False
+        try:
+            submitted = pool.submit(task, content, *args)
+            future = asyncio.wrap_future(submitted)
+            # The timeout runs from when a worker takes the task, not from when it was queued
+            while not submitted.running() and not submitted.done():
+                await asyncio.wait({future}, timeout=QUEUE_POLL_INTERVAL)
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            print(f"  ⚠️ Page analysis {name} exceeded {self.timeout:g}s on {len(content):,} chars, "
+                  f"skipped and restarting the pool")
+            return default
+        except BrokenProcessPool:
+            broken = True
+            print(f"  ⚠️ Page analysis pool broke during {name}, running it inline")
+            return task(content, *args)
+        finally:
+            self._release_pool(pool, discard=broken or timed_out)
+            self._record(name, time.perf_counter() - started, offloaded=not broken, timed_out=timed_out)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            tasks = {
+                name: {
+                    'calls': entry['calls'],
+                    'offloaded': entry['offloaded'],
+                    'timeouts': entry['timeouts'],
+                    'avg_ms': round(entry['total_ms'] / entry['calls'], 2),
+                    'max_ms': round(entry['max_ms'], 2),
+                }
+                for name, entry in self._stats.items()
+            }
+            return {'workers': self.workers, 'pending': self._pending, 'tasks': tasks}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _terminate(pool: ProcessPoolExecutor) -> None:
+    """Shut a pool down without waiting and kill its workers (a hung scan never returns on its own)."""
+    processes = list((getattr(pool, '_processes', None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
+PAGE_ANALYZER = PageAnalyzer()
+
+
+async def analyse(task: Callable, content: str, *args, default: Any = None) -> Any:
+    """Run a page-source analysis task on the shared PageAnalyzer."""
+    return await PAGE_ANALYZER.run(task, content, *args, default=default)
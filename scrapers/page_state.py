@@ -0,0 +1,148 @@
+"""
+Embedded page-state (hydration blob) extractor.
+
+Nykaa (``window.__PRELOADED_STATE__``), Myntra (``window.__myx``) and
+Next.js sites (``<script id="__NEXT_DATA__">``) ship the full product state
+as JSON inside an inline script. Parsing that once per page replaces dozens
+of selector probes. Blobs are located in the page HTML, decoded with a
+single ``raw_decode`` and skipped when larger than ``PAGE_STATE_MAX_BYTES``.
+
+Per-site paths live under ``"page_state"`` in selectors.json (json_paths
+syntax, as in the ``"api"`` block)::
+
+    "page_state": {
+        "blobs": ["__PRELOADED_STATE__"],
+        "price_paths": ["productPage.product.offerPrice"],
+        "original_price_paths": ["productPage.product.mrp"],
+        "name_paths": ["productPage.product.name"],
+        "image_paths": ["productPage.product.imageUrl"],
+        "in_stock_paths": ["productPage.product.inStock"]
+    }
+"""
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from .json_paths import first_value, format_price, truthy_flag
+
+
+PAGE_STATE_MAX_BYTES = int(os.getenv('PAGE_STATE_MAX_BYTES', 3 * 1024 * 1024))
+
+# Blob name -> regex locating the start of its JSON
+BLOB_PATTERNS = {
+    '__NEXT_DATA__': re.compile(r'<script[^>]*id=["\']__NEXT_DATA__["\'][^>]*>\s*'),
+    '__PRELOADED_STATE__': re.compile(r'window\.__PRELOADED_STATE__\s*=\s*'),
+    '__INITIAL_STATE__': re.compile(r'window\.__INITIAL_STATE__\s*=\s*'),
+    '__myx': re.compile(r'window\.__myx\s*=\s*'),
+}
+
+# Used when a site config lists a blob but no paths
+DEFAULT_PATHS = {
+    'price_paths': ['**.offerPrice', '**.offer_price', '**.discountedPrice', '**.sellingPrice', '**.finalPrice'],
+    'original_price_paths': ['**.mrp', '**.marketPrice', '**.originalPrice'],
+}
+
+
+class ProductState:
+    """Typed view of the product fields found in a page's hydration blob or structured data."""
+
+    def __init__(self, source: str, price: Optional[str] = None, original_price: Optional[str] = None,
+                 in_stock: Optional[bool] = None, name: Optional[str] = None, image_url: Optional[str] = None):
+        self.source = source
+        self.price = price
+        self.original_price = original_price
+        self.in_stock = in_stock
+        self.name = name
+        self.image_url = image_url
+        # False when the sources behind this view disagree (see structured_data.py)
+        self.consistent = True
+        # Per-field origin when this view merges several sources
+        self.field_sources: Dict[str, str] = {}
+
+    def source_of(self, field: str) -> str:
+        return self.field_sources.get(field, self.source)
+
+    def is_complete(self) -> bool:
+        """Price, name, image and availability are all known."""
+        return bool(self.price and self.name and self.image_url) and self.in_stock is not None
+
+    def stock(self) -> Optional[Dict]:
+        """Stock dict in check_stock_status() shape, or None if the blob says nothing."""
+        if self.in_stock is None:
+            return None
+        return {
+            'in_stock': self.in_stock,
+            'stock_status': 'in_stock' if self.in_stock else 'out_of_stock',
+            'message': None if self.in_stock else f"Out of stock per {self.source}",
+        }
+
+    def __repr__(self):
+        return (f"ProductState(source={self.source!r}, price={self.price!r}, "
+                f"original_price={self.original_price!r}, in_stock={self.in_stock!r})")
+
+
+def find_blob(html: str, name: str, max_bytes: int = PAGE_STATE_MAX_BYTES) -> Optional[Any]:
+    """Locate and decode one named blob, or None if absent, oversized or malformed."""
+    pattern = BLOB_PATTERNS.get(name)
+    if not html or pattern is None:
+        return None
+    match = pattern.search(html)
+    if not match:
+        return None
+
+    start = match.end()
+    end = html.find('</script>', start)
+    if end == -1:
+        end = len(html)
+    if end - start > max_bytes:
+        print(f"  Skipping {name} blob ({end - start} bytes > {max_bytes})")
+        return None
+    try:
+        data, _ = json.JSONDecoder().raw_decode(html[start:end])
+        return data
+    except ValueError:
+        return None
+
+
+def extract_page_state(html: str, config: Optional[Dict],
+                       max_bytes: int = PAGE_STATE_MAX_BYTES) -> Optional[ProductState]:
+    """Parse the site's configured blob(s) into a ProductState (None if nothing was found)."""
+    if not config:
+        return None
+
+    for name in config.get('blobs', []):
+        data = find_blob(html, name, max_bytes)
+        if data is None:
+            continue
+
+        def paths(key: str) -> List[str]:
+            return config.get(key) or DEFAULT_PATHS.get(key, [])
+
+        price = format_price(first_value(data, paths('price_paths')))
+        original_price = format_price(first_value(data, paths('original_price_paths')))
+        if original_price and price and \
+                float(original_price.replace(',', '')) <= float(price.replace(',', '')):
+            original_price = None
+
+        in_stock = None
+        in_flag = first_value(data, paths('in_stock_paths'))
+        out_flag = first_value(data, paths('out_of_stock_paths'))
+        if in_flag is not None:
+            in_stock = truthy_flag(in_flag)
+        elif out_flag is not None:
+            in_stock = not truthy_flag(out_flag)
+
+        name_value = first_value(data, paths('name_paths'))
+        image_value = first_value(data, paths('image_paths'))
+        state = ProductState(
+            source=name,
+            price=price,
+            original_price=original_price,
+            in_stock=in_stock,
+            name=str(name_value).strip() if name_value else None,
+            image_url=str(image_value) if image_value else None,
+        )
+        if state.price or state.name:
+            return state
+    return None
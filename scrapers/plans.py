@@ -0,0 +1,230 @@
+"""
+Declarative extraction plans compiled from selectors.json.
+
+Each site's selectors.json block is compiled once into a read-only
+ExtractionPlan that BaseScraper's shared extraction methods execute (price
+cascade, original-price sweep, details, stock phrase scan). Site subclasses
+only override those methods for logic that cannot be expressed here.
+
+Besides the existing selector lists, ``ready`` wait and ``out_of_stock``
+phrases, a site may set (all optional)::
+
+    "extraction": {
+        "sources": ["page_state", "structured_data", "selectors"],
+        "price": {"pick": "lowest", "limit": 5,
+                  "attributes": ["value", "content"], "range": [50, null]},
+        "original_price": {"mode": "per_selector", "attributes": ["content"]},
+        "stock": {"selectors": ["#availability"], "badges": [".pdp-sold-out"],
+                  "regions": ["#product-details"]}
+    }
+
+``pick`` is ``first`` (first valid element text, the default) or ``lowest``
+(lowest price among the first ``limit`` elements of a selector, text and
+attributes). ``range`` bounds accepted prices. Original-price ``mode`` is
+``sweep`` (every selector plus the page source, the default) or
+``per_selector`` (first selector that yields an MRP; no page-source scan).
+Adding ``price_detector`` to ``sources`` scores every visible price on the
+page in one script (see price_detector.py); sites without reliable
+selectors use it.
+Out-of-stock phrases are compiled into one PhraseMatcher; stock ``regions``
+limit the phrase scan to those elements' text instead of the whole page.
+Stock ``selectors`` are availability elements: they only mark a product
+out of stock when their text matches an out-of-stock phrase. ``badges`` are
+exact sold-out badge selectors whose visible presence (inside the stock
+``regions``, when set) is proof on its own.
+
+The loaded file is identified by a content hash (``selectors_version()``);
+ScraperFactory.reload() validates a new file by compiling every site's plan
+and only then swaps it in with install_selectors().
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from .stock_matcher import PhraseMatcher
+
+
+# price_detector (see price_detector.py) is opt-in: the default sources leave it out
+SOURCES = ('page_state', 'structured_data', 'selectors', 'price_detector')
+DEFAULT_SOURCES = ('page_state', 'structured_data', 'selectors')
+PRICE_PICKS = ('first', 'lowest')
+ORIGINAL_PRICE_MODES = ('sweep', 'per_selector')
+DEFAULT_ATTRIBUTES = ('aria-label', 'title', 'data-price', 'content')
+
+_selectors = None
+_selectors_version = None
+_selectors_lock = threading.Lock()
+
+
+def selectors_path() -> str:
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'selectors.json')
+
+
+def config_version(data: Dict) -> str:
+    """Short content hash of a selectors config (key order does not matter)."""
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:12]
+
+
+def read_selectors(path: str = None) -> Dict:
+    """Parse selectors.json from disk. Raises ValueError if it is not a JSON object of site blocks."""
+    path = path or selectors_path()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except OSError as e:
+        raise ValueError(f"Could not read {path}: {e}")
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON in {path}: {e}")
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} must contain a JSON object of site blocks")
+    for site, block in data.items():
+        if not isinstance(block, dict):
+            raise ValueError(f"{path}: the {site!r} block must be a JSON object")
+    return data
+
+
+def load_selectors() -> Dict:
+    """selectors.json, read from disk once per process (until install_selectors() swaps it)."""
+    global _selectors, _selectors_version
+    if _selectors is None:
+        with _selectors_lock:
+            if _selectors is None:
+                try:
+                    data = read_selectors()
+                except ValueError as e:
+                    print(f"Warning: Could not load selectors.json: {e}")
+                    data = {}
+                _selectors_version = config_version(data)
+                _selectors = data
+    return _selectors
+
+
+def selectors_version() -> str:
+    """Content hash of the selectors config currently in use."""
+    load_selectors()
+    return _selectors_version
+
+
+def install_selectors(data: Dict, version: str = None) -> str:
+    """Swap in an already validated selectors config. Returns its version."""
+    global _selectors, _selectors_version
+    version = version or config_version(data)
+    with _selectors_lock:
+        _selectors_version = version
+        _selectors = data
+    return version
+
+
+class ExtractionPlan:
+    """Compiled, read-only extraction plan for one site."""
+
+    def __init__(self, site: str, sources: Iterable[str], ready: Optional[Dict],
+                 price_selectors: Iterable[str], price_pick: str, price_limit: int,
+                 price_attributes: Iterable[str], price_range: tuple,
+                 original_price_selectors: Iterable[str], original_price_mode: str,
+                 original_price_attributes: Iterable[str],
+                 name_selectors: Iterable[str], image_selectors: Iterable[str],
+                 stock_phrases: Iterable[str], stock_selectors: Iterable[str],
+                 stock_regions: Iterable[str] = (), stock_badges: Iterable[str] = ()):
+        self.site = site
+        self.sources = tuple(sources)
+        self.ready = dict(ready) if ready else None
+        self.price_selectors = tuple(price_selectors)
+        self.price_pick = price_pick
+        self.price_limit = price_limit
+        self.price_attributes = tuple(price_attributes)
+        self.price_range = price_range
+        self.original_price_selectors = tuple(original_price_selectors)
+        self.original_price_mode = original_price_mode
+        self.original_price_attributes = tuple(original_price_attributes)
+        self.name_selectors = tuple(name_selectors)
+        self.image_selectors = tuple(image_selectors)
+        self.stock_phrases = tuple(phrase.lower() for phrase in stock_phrases)
+        self.stock_selectors = tuple(stock_selectors)
+        self.stock_regions = tuple(stock_regions)
+        self.stock_badges = tuple(stock_badges)
+        self.stock_matcher = PhraseMatcher(self.stock_phrases)
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError(f"ExtractionPlan for {self.site} is read-only")
+        object.__setattr__(self, name, value)
+
+    def accepts_price(self, value: Optional[float]) -> bool:
+        """Price validator: within the site's ``range`` bounds."""
+        if value is None:
+            return False
+        low, high = self.price_range
+        return (low is None or value >= low) and (high is None or value <= high)
+
+    def __repr__(self):
+        return (f"ExtractionPlan(site={self.site!r}, sources={self.sources!r}, "
+                f"price={len(self.price_selectors)}x{self.price_pick}, "
+                f"original_price={len(self.original_price_selectors)}x{self.original_price_mode})")
+
+
+def _choice(value, allowed: tuple, key: str, site: str) -> str:
+    if value not in allowed:
+        raise ValueError(f"{site}: {key} must be one of {', '.join(allowed)}, got {value!r}")
+    return value
+
+
+def _price_range(value, site: str) -> tuple:
+    if value is None:
+        return (None, None)
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise ValueError(f"{site}: extraction.price.range must be [min, max]")
+    return tuple(None if bound is None else float(bound) for bound in value)
+
+
+def _stock_phrases(indicators) -> List[str]:
+    if isinstance(indicators, dict):
+        return indicators.get('out_of_stock', [])
+    return indicators or []
+
+
+def compile_plan(site: str, config: Dict, price_selectors: List[str] = None,
+                 original_price_selectors: List[str] = None, stock_indicators=None) -> ExtractionPlan:
+    """
+    Compile one site's selectors.json block. The optional lists are the
+    scraper's hook results (get_price_selectors() etc.) and take precedence
+    over the raw config. Raises ValueError on an invalid plan.
+    """
+    config = config or {}
+    extraction = config.get('extraction', {})
+    price = extraction.get('price', {})
+    original = extraction.get('original_price', {})
+    stock = extraction.get('stock', {})
+    if stock_indicators is None:
+        stock_indicators = config.get('out_of_stock', [])
+
+    sources = extraction.get('sources', DEFAULT_SOURCES)
+    for source in sources:
+        _choice(source, SOURCES, 'extraction.sources', site)
+
+    return ExtractionPlan(
+        site=site,
+        sources=sources,
+        ready=config.get('ready'),
+        price_selectors=price_selectors if price_selectors is not None else config.get('price_selectors', []),
+        price_pick=_choice(price.get('pick', 'first'), PRICE_PICKS, 'extraction.price.pick', site),
+        price_limit=int(price.get('limit', 1)),
+        price_attributes=price.get('attributes', []),
+        price_range=_price_range(price.get('range'), site),
+        original_price_selectors=original_price_selectors if original_price_selectors is not None
+        else config.get('original_price_selectors', []),
+        original_price_mode=_choice(original.get('mode', 'sweep'), ORIGINAL_PRICE_MODES,
+                                    'extraction.original_price.mode', site),
+        original_price_attributes=original.get('attributes', DEFAULT_ATTRIBUTES),
+        name_selectors=config.get('name_selectors', []),
+        image_selectors=config.get('image_selectors', []),
+        stock_phrases=_stock_phrases(stock_indicators),
+        stock_selectors=stock.get('selectors') or
+        (stock_indicators.get('selectors', []) if isinstance(stock_indicators, dict) else []),
+        stock_regions=stock.get('regions', []),
+        stock_badges=stock.get('badges', []),
+    )
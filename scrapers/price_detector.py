@@ -0,0 +1,245 @@
+"""
+Site-agnostic price detection for pages without site selectors.
+
+One in-page script (DETECTOR_SCRIPT) collects every short, visible element
+whose text carries a currency-marked amount, along with the signals that
+tell the selling price apart from the rest of the page: font size and
+weight, position relative to the fold, strike-through, distance to the
+add-to-cart / buy-now button, price-like class names, and the prices
+declared in structured data (itemprop, product meta tags, JSON-LD offers).
+score_detection() weighs those signals in Python and returns the best
+candidate with a confidence, so the result competes with the other
+extraction sources in BaseScraper.scrape_page().
+
+Struck-through or MRP-labelled amounts never win the price; the closest
+one above the winner is reported as the original price. A "regular" label
+alone is not an MRP (Shopify themes render the selling price of items that
+are not on sale as ``price-item--regular``); it only counts when a lower
+sale-labelled amount sits beside it.
+
+Enabled per site with the ``price_detector`` extraction source
+(selectors.json ``extraction.sources``); the generic scraper has it on.
+"""
+from typing import Dict, List, Optional
+import re
+
+from . import prices
+
+
+# Share of the score each signal contributes (sums to 1)
+SIGNAL_WEIGHTS = {
+    'font': 0.3,        # font size relative to the largest candidate
+    'cart': 0.2,        # close to the add-to-cart / buy-now button
+    'structured': 0.2,  # equals a price declared in structured data
+    'fold': 0.15,       # in the first viewport
+    'label': 0.1,       # price-like itemprop / class / id
+    'bold': 0.05,
+}
+# Beyond this distance (px) the add-to-cart signal scores 0
+CART_RADIUS = 600
+# Largest vertical gap (px) between a price and its struck-through MRP
+ORIGINAL_PRICE_RADIUS = 400
+# Score lead over the best different amount that counts as unambiguous
+CLEAR_MARGIN = 0.2
+# Kept below parsed structured data: the detector is a heuristic
+MAX_CONFIDENCE = 0.85
+
+PRICE_LABEL_PATTERN = re.compile(r'price|amount|offer|sale|selling', re.IGNORECASE)
+# Word starts only: "was" must not hit "canvas"
+ORIGINAL_LABEL_PATTERN = re.compile(r'mrp|strike|(?<![a-z])(?:was|old-?price|compare-?at)', re.IGNORECASE)
+REGULAR_LABEL_PATTERN = re.compile(r'(?<![a-z])regular', re.IGNORECASE)
+SALE_LABEL_PATTERN = re.compile(r'(?<![a-z])sale', re.IGNORECASE)
+
+DETECTOR_OPTIONS = {'maxChars': 60, 'maxCandidates': 150, 'maxTextNodes': 20000}
+
+DETECTOR_SCRIPT = r"""
+(options) => {
+  const currency = /₹|\brs\.?\s*\d|\binr\s*\d|\d\s*\/-/i;
+  const cartLabel = /add\s+to\s+(cart|bag|basket)|buy\s+now/i;
+  const skipped = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'TEXTAREA']);
+  const scrollY = window.scrollY || 0;
+  const center = (rect) => [rect.left + rect.width / 2, rect.top + scrollY + rect.height / 2];
+
+  const carts = [];
+  for (const el of document.querySelectorAll('button, input[type="submit"], input[type="button"], a, [role="button"]')) {
+    const label = (el.textContent || el.value || '').replace(/\s+/g, ' ').trim();
+    if (!label || label.length > 40 || !cartLabel.test(label)) continue;
+    const rect = el.getBoundingClientRect();
+    if (rect.width && rect.height) carts.push(center(rect));
+    if (carts.length >= 20) break;
+  }
+
+  const candidates = [];
+  const seen = new Set();
+  const root = document.body || document.documentElement;
+  const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+  let scanned = 0;
+  while (walker.nextNode() && scanned++ < options.maxTextNodes && candidates.length < options.maxCandidates) {
+    const node = walker.currentNode;
+    if (!/\d/.test(node.nodeValue) || !node.parentElement || skipped.has(node.parentElement.tagName)) continue;
+    // "₹" and "1,299" are often sibling spans: climb to the smallest element holding both
+    let el = node.parentElement;
+    for (let depth = 0; el && depth < 3 && !currency.test(el.textContent); depth++) el = el.parentElement;
+    if (!el || seen.has(el)) continue;
+    seen.add(el);
+    const text = el.textContent.replace(/\s+/g, ' ').trim();
+    if (text.length > options.maxChars || !currency.test(text)) continue;
+    const rect = el.getBoundingClientRect();
+    if (!rect.width || !rect.height) continue;
+    const style = getComputedStyle(el);
+    if (style.visibility === 'hidden' || parseFloat(style.opacity) === 0) continue;
+
+    let struck = !!el.closest('del, s, strike');
+    for (let a = el, depth = 0; a && !struck && depth < 4; a = a.parentElement, depth++) {
+      struck = (getComputedStyle(a).textDecorationLine || '').includes('line-through');
+    }
+    const [x, y] = center(rect);
+    let cartDistance = null;
+    for (const [cx, cy] of carts) {
+      const distance = Math.hypot(cx - x, cy - y);
+      if (cartDistance === null || distance < cartDistance) cartDistance = distance;
+    }
+    const labels = [];
+    for (let a = el, depth = 0; a && depth < 2; a = a.parentElement, depth++) {
+      labels.push(a.getAttribute('itemprop') || '', a.getAttribute('class') || '', a.id || '');
+    }
+    candidates.push({
+      text,
+      fontSize: parseFloat(style.fontSize) || 0,
+      fontWeight: parseInt(style.fontWeight, 10) || 400,
+      top: rect.top + scrollY,
+      struck,
+      cartDistance,
+      label: labels.join(' ').slice(0, 200),
+    });
+  }
+
+  const structured = [];
+  for (const el of document.querySelectorAll(
+      '[itemprop="price"], meta[property="product:price:amount"], meta[property="og:price:amount"]')) {
+    const value = el.getAttribute('content') || el.textContent;
+    if (value && value.trim()) structured.push(value.trim().slice(0, 40));
+  }
+  const collect = (data, depth) => {
+    if (!data || typeof data !== 'object' || depth > 6) return;
+    if (Array.isArray(data)) { data.forEach((item) => collect(item, depth + 1)); return; }
+    for (const key of ['price', 'lowPrice']) {
+      if (typeof data[key] === 'string' || typeof data[key] === 'number') structured.push(String(data[key]));
+    }
+    Object.values(data).forEach((value) => collect(value, depth + 1));
+  };
+  for (const script of document.querySelectorAll('script[type="application/ld+json"]')) {
+    try { collect(JSON.parse(script.textContent), 0); } catch (e) {}
+  }
+
+  return {candidates, structured: structured.slice(0, 20), viewportHeight: window.innerHeight || 800};
+}
+"""
+
+
+class PriceCandidate:
+    """One currency-marked amount the detector script reported, with its signal scores."""
+
+    __slots__ = ('text', 'price', 'value', 'top', 'label', 'original', 'signals', 'score')
+
+    def __init__(self, text: str, price: str, value: float, top: float, label: str, original: bool):
+        self.text = text
+        self.price = price
+        self.value = value
+        self.top = top
+        self.label = label
+        # Struck through or labelled MRP / was / old price / compare-at
+        self.original = original
+        self.signals: Dict[str, float] = {}
+        self.score = 0.0
+
+    def __repr__(self):
+        return f"PriceCandidate({self.price!r}, score={self.score:.2f}{', original' if self.original else ''})"
+
+
+class DetectedPrice:
+    """Outcome of score_detection(): the winning price, its confidence and the MRP beside it."""
+
+    def __init__(self, price: str, confidence: float, original_price: Optional[str] = None,
+                 signals: Dict[str, float] = None, candidates: int = 0):
+        self.price = price
+        self.confidence = confidence
+        self.original_price = original_price
+        # Per-signal scores of the winner (0..1 each), for debugging
+        self.signals = signals or {}
+        self.candidates = candidates
+
+    def __repr__(self):
+        return (f"DetectedPrice(price={self.price!r}, confidence={self.confidence}, "
+                f"original_price={self.original_price!r})")
+
+
+def _candidate(raw: Dict) -> Optional[PriceCandidate]:
+    text = raw.get('text') or ''
+    found = prices.price_candidates(text)
+    value = prices.parse_amount(found[0]) if found else None
+    if not value:
+        return None
+    label = raw.get('label') or ''
+    original = bool(raw.get('struck')) or bool(ORIGINAL_LABEL_PATTERN.search(label))
+    return PriceCandidate(text, found[0], value, float(raw.get('top') or 0), label, original)
+
+
+def _mark_regular_prices(candidates: List[PriceCandidate]) -> None:
+    """A "regular"-labelled amount is the MRP only when a lower sale-labelled amount sits beside it."""
+    sales = [c for c in candidates if SALE_LABEL_PATTERN.search(c.label)]
+    for candidate in candidates:
+        if candidate.original or not REGULAR_LABEL_PATTERN.search(candidate.label):
+            continue
+        candidate.original = any(sale.value < candidate.value and abs(sale.top - candidate.top) <= ORIGINAL_PRICE_RADIUS
+                                 for sale in sales)
+
+
+def score_detection(raw: Optional[Dict]) -> Optional[DetectedPrice]:
+    """Weigh the detector script's output into the most likely selling price, or None."""
+    if not raw or not raw.get('candidates'):
+        return None
+    viewport = float(raw.get('viewportHeight') or 800)
+    structured = {value for value in (prices.parse_amount(prices.clean_price(text))
+                                      for text in raw.get('structured') or []) if value}
+
+    candidates: List[PriceCandidate] = []
+    for item in raw['candidates']:
+        candidate = _candidate(item)
+        if candidate is None:
+            continue
+        candidates.append(candidate)
+        distance = item.get('cartDistance')
+        top = candidate.top
+        candidate.signals = {
+            'font': float(item.get('fontSize') or 0),
+            'cart': 1 - min(distance, CART_RADIUS) / CART_RADIUS if distance is not None else 0.0,
+            'structured': 1.0 if any(abs(candidate.value - value) < 0.5 for value in structured) else 0.0,
+            'fold': 1.0 if top < viewport else max(0.0, 1 - (top - viewport) / (2 * viewport)),
+            'label': 1.0 if PRICE_LABEL_PATTERN.search(item.get('label') or '') else 0.0,
+            'bold': 1.0 if (item.get('fontWeight') or 400) >= 600 else 0.0,
+        }
+
+    _mark_regular_prices(candidates)
+    selling = [c for c in candidates if not c.original]
+    if not selling:
+        return None
+    largest_font = max(c.signals['font'] for c in selling) or 1.0
+    for candidate in candidates:
+        candidate.signals['font'] = min(1.0, candidate.signals['font'] / largest_font)
+        candidate.score = sum(SIGNAL_WEIGHTS[name] * score for name, score in candidate.signals.items())
+
+    best = max(selling, key=lambda c: c.score)
+    runner_up = max((c.score for c in selling if c.value != best.value), default=0.0)
+    clarity = min(1.0, (best.score - runner_up) / CLEAR_MARGIN)
+    confidence = round(min(MAX_CONFIDENCE, best.score * (0.5 + 0.5 * clarity)), 2)
+
+    originals = [c for c in candidates if c.original and c.value > best.value
+                 and abs(c.top - best.top) <= ORIGINAL_PRICE_RADIUS]
+    original = min(originals, key=lambda c: abs(c.top - best.top), default=None)
+    return DetectedPrice(
+        best.price, confidence,
+        original_price=original.price if original else None,
+        signals={name: round(score, 2) for name, score in best.signals.items()},
+        candidates=len(candidates),
+    )
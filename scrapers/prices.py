@@ -0,0 +1,177 @@
+"""
+Price parsing: precompiled patterns, one pass per text.
+
+Amounts are read with Indian digit grouping ("1,29,999"), Western grouping
+("129,999") or none, with up to two decimals. A currency marker (₹, Rs.,
+INR, or a trailing "/-") makes a number a price; ``find_prices`` returns
+every such amount in a single scan with its position, and flags the ones
+that are the upper bound of a range ("₹ 499 – ₹ 999") or a per-unit price
+("₹49.90/100 ml") so callers can leave them out of price candidates.
+
+``original_price_candidates`` finds labelled MRP / list prices ("MRP
+₹1,499", "₹1,499 M.R.P.") and the usual JSON keys ("maximumRetailPrice":
+2499) in a whole page source: one fast literal scan of the lowercased page
+for anchors, then the full patterns only at those positions.
+"""
+import re
+from typing import List, Optional
+
+
+CURRENCY = r'(?:₹|\brs(?![a-z])\.?|\binr(?![a-z]))'
+# Indian grouping first; the trailing lookahead forces "1,299,999" onto the Western branch
+NUMBER = r'(?:\d{1,3}(?:,\d{2})*,\d{3}|\d{1,3}(?:,\d{3})+|\d+)(?!,?\d)(?:\.\d{1,2}(?!\d))?'
+UNIT = (
+    r'ml|l|ltr|litre|liter|g|gm|gms|gram|grams|kg|mg|oz|m|cm|mm|sq\.?\s*ft|unit|units|'
+    r'pc|pcs|piece|pieces|count|ct|tablet|tablets|capsule|capsules|sheet|sheets|pack|wash|use'
+)
+
+PRICE_PATTERN = re.compile(
+    rf'{CURRENCY}\s*(?P<before>{NUMBER})|(?<![\d.,])(?P<after>{NUMBER})\s*(?:{CURRENCY}|/-)',
+    re.IGNORECASE,
+)
+NUMBER_PATTERN = re.compile(rf'(?<![\d.,]){NUMBER}')
+PER_UNIT_PATTERN = re.compile(rf'\s*(?:/|per\b)\s*(?P<unit>(?:\d+(?:\.\d+)?\s*)?(?:{UNIT}))\b', re.IGNORECASE)
+RANGE_GAP_PATTERN = re.compile(r'\s*(?:-|–|—|to)\s*', re.IGNORECASE)
+CURRENCY_PATTERN = re.compile(CURRENCY, re.IGNORECASE)
+
+ORIGINAL_PRICE_LABEL = (
+    r'MRP|M\.R\.P\.?|List Price|Original Price|Regular Price|'
+    r'Maximum Retail Price|Retail Price|Was|Compare(?: At)? Price'
+)
+ORIGINAL_PRICE_KEYS = (
+    r'mrp|maximumRetailPrice|retailPrice|originalPrice|'
+    r'strikeOffPrice|listPrice|regularPrice|compareAtPrice'
+)
+# Full patterns, each tried only where ORIGINAL_PRICE_ANCHOR_PATTERN finds a possible start
+LABELLED_PRICE_PATTERN = re.compile(
+    # "MRP: ₹1,499"
+    rf'(?<!\w)(?:{ORIGINAL_PRICE_LABEL})(?![a-z])[^₹\d]{{0,120}}{CURRENCY}?\s*({NUMBER})', re.IGNORECASE
+)
+TRAILING_LABEL_PATTERN = re.compile(
+    # "₹1,499 (MRP)"
+    rf'{CURRENCY}\s*({NUMBER})(?=[^<]{{0,120}}?(?<!\w)(?:{ORIGINAL_PRICE_LABEL})(?![a-z]))', re.IGNORECASE
+)
+KEYED_PRICE_PATTERN = re.compile(
+    # "maximumRetailPrice":"2,499" / 'mrp': 2499
+    rf'(["\'])(?:{ORIGINAL_PRICE_KEYS})\1\s*:\s*["\']?{CURRENCY}?\s*({NUMBER})', re.IGNORECASE
+)
+ORIGINAL_PRICE_ANCHORS = (
+    'maximum retail price', 'maximumretailprice', 'original price', 'originalprice', 'regular price',
+    'regularprice', 'compareatprice', 'strikeoffprice', 'retail price', 'retailprice', 'list price',
+    'listprice', 'compare', 'm.r.p', 'mrp', 'was', 'inr', 'rs', '₹',
+)
+CURRENCY_ANCHORS = frozenset(('inr', 'rs', '₹'))
+# Plain literals (no IGNORECASE, no groups) keep re's fast scan; run over the lowercased page
+ORIGINAL_PRICE_ANCHOR_PATTERN = re.compile('|'.join(re.escape(anchor) for anchor in ORIGINAL_PRICE_ANCHORS))
+
+CONTEXT_CHARS = 40
+
+
+class PriceMatch:
+    """One amount found in a text."""
+
+    __slots__ = ('text', 'value', 'start', 'end', 'per_unit', 'range_high', '_source')
+
+    def __init__(self, text: str, start: int, end: int, source: str, per_unit: Optional[str] = None):
+        self.text = text
+        self.value = parse_amount(text)
+        self.start = start
+        self.end = end
+        # "100 ml" for "₹49.90/100 ml"
+        self.per_unit = per_unit
+        # Upper bound of a "₹499 – ₹999" range
+        self.range_high = False
+        self._source = source
+
+    @property
+    def context(self) -> str:
+        """The text around the amount (for debugging and labels)."""
+        return self._source[max(0, self.start - CONTEXT_CHARS):self.end + CONTEXT_CHARS]
+
+    def __repr__(self):
+        flags = ''.join([f' per {self.per_unit}' if self.per_unit else '', ' range-high' if self.range_high else ''])
+        return f"PriceMatch({self.text!r} at {self.start}{flags})"
+
+
+def parse_amount(text: str) -> Optional[float]:
+    """Numeric value of an amount token such as ``1,29,999.50``."""
+    try:
+        return float(text.replace(',', ''))
+    except (AttributeError, ValueError):
+        return None
+
+
+def find_prices(text: str) -> List[PriceMatch]:
+    """Every currency-marked amount in ``text``, in order, with range and per-unit flags."""
+    if not text:
+        return []
+    matches = []
+    for match in PRICE_PATTERN.finditer(text):
+        group = 'before' if match.group('before') else 'after'
+        unit = PER_UNIT_PATTERN.match(text, match.end())
+        price = PriceMatch(match.group(group), match.start(group), match.end(group), text,
+                           per_unit=' '.join(unit.group('unit').split()) if unit else None)
+        # "₹499 – ₹999" / "499/- to 999/-": only a dash or "to" (and currency markers) in between
+        if matches and match.start() - matches[-1].end <= 16:
+            gap = CURRENCY_PATTERN.sub('', text[matches[-1].end:match.start()]).replace('/-', '')
+            price.range_high = bool(RANGE_GAP_PATTERN.fullmatch(gap))
+        matches.append(price)
+    return matches
+
+
+def price_candidates(text: str) -> List[str]:
+    """
+    Price strings in ``text``: currency-marked amounts that are neither a
+    range's upper bound nor per-unit prices. Without any currency marker,
+    the first bare number (element texts are often just "1,299").
+    """
+    if not text:
+        return []
+    matches = find_prices(text)
+    if matches:
+        return [m.text for m in matches if not m.per_unit and not m.range_high and m.value]
+    match = NUMBER_PATTERN.search(text)
+    return [match.group(0)] if match else []
+
+
+def clean_price(text: str) -> str:
+    """
+    The price in a short text, or ``N/A``: the first currency-marked amount
+    that is not a per-unit price; without any currency marker, the first number.
+    """
+    if not text:
+        return 'N/A'
+    matches = find_prices(text)
+    if matches:
+        return next((m.text for m in matches if not m.per_unit), 'N/A')
+    match = NUMBER_PATTERN.search(text)
+    return match.group(0) if match else 'N/A'
+
+
+def original_price_candidates(content: str) -> List[str]:
+    """
+    Labelled MRP / list price amounts in a page source (HTML or JSON), in
+    page order. One scan for anchors (labels, currency markers, JSON keys),
+    then the full patterns only at those positions.
+    """
+    if not content:
+        return []
+    lowered = content.lower()
+    if len(lowered) == len(content):
+        anchors = ORIGINAL_PRICE_ANCHOR_PATTERN.finditer(lowered)
+    else:
+        # Lowercasing changed the offsets (rare non-ASCII case mappings)
+        anchors = re.finditer(ORIGINAL_PRICE_ANCHOR_PATTERN.pattern, content, re.IGNORECASE)
+
+    found = {}
+    for anchor in anchors:
+        start = anchor.start()
+        if anchor.group(0) in CURRENCY_ANCHORS:
+            match = TRAILING_LABEL_PATTERN.match(content, start)
+        elif start and content[start - 1] in '"\'':
+            match = KEYED_PRICE_PATTERN.match(content, start - 1)
+        else:
+            match = LABELLED_PRICE_PATTERN.match(content, start)
+        if match:
+            found.setdefault(match.start(match.lastindex), match.group(match.lastindex))
+    return [found[position] for position in sorted(found)]
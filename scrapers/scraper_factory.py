@@ -1,8 +1,8 @@
 """
 Factory class to get the appropriate scraper for a given URL
 """
-import json
 import os
+import threading
 from urllib.parse import parse_qs, unquote, urlparse
 from .amazon_scraper import AmazonScraper
 from .flipkart_scraper import FlipkartScraper
@@ -14,91 +14,158 @@ from .shopclues_scraper import ShopcluesScraper
 from .hygulife_scraper import HygulifeScraper
 from .meesho_scraper import MeeshoScraper
 from .generic_scraper import GenericScraper
+from . import plans
+from .sites import SiteConfig, SiteRegistry, compile_sites
+
+
+SCRAPER_CLASSES = {
+    'amazon': AmazonScraper,
+    'flipkart': FlipkartScraper,
+    'myntra': MyntraScraper,
+    'ajio': AjioScraper,
+    'nykaa': NykaaScraper,
+    'snapdeal': SnapdealScraper,
+    'shopclues': ShopcluesScraper,
+    'hygulife': HygulifeScraper,
+    'meesho': MeeshoScraper,
+    'generic': GenericScraper,
+}
+
 
 class ScraperFactory:
     """Factory to create scraper instances based on URL"""
     
-    _selectors = None
+    # One scraper (and compiled extraction plan) per site; scrapers hold no per-page state.
+    # reload() replaces the whole dict, so scrapes already holding a scraper finish on the old config.
+    _scrapers = {}
+    # Host -> site index and navigation policy (selectors.json "site" blocks), swapped with the scrapers
+    _sites = None
+    _selector_stats = None
+    _reload_lock = threading.Lock()
+    _loaded_mtime = None
     
     @classmethod
     def load_selectors(cls):
         """Load selectors from JSON file once"""
-        if cls._selectors is None:
-            try:
-                base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                json_path = os.path.join(base_path, 'selectors.json')
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    cls._selectors = json.load(f)
-            except Exception as e:
-                print(f"Warning: Could not load selectors.json: {e}")
-                cls._selectors = {}
-        return cls._selectors
+        return plans.load_selectors()
+    
+    @classmethod
+    def config_version(cls) -> str:
+        """Version (content hash) of the selectors config new scrapes use"""
+        return plans.selectors_version()
+    
+    @classmethod
+    def sites(cls) -> SiteRegistry:
+        """Site registry of the current selectors config"""
+        registry = cls._sites
+        if registry is None:
+            registry = cls._sites = compile_sites(cls.load_selectors())
+        return registry
+    
+    @classmethod
+    def site_config(cls, site: str) -> SiteConfig:
+        """Navigation policy for a site name (generic defaults for unknown sites)"""
+        return cls.sites().get(site)
     
     @staticmethod
     def is_known_site(url: str) -> bool:
         """Check if URL maps to a known (non-generic) scraper"""
         return ScraperFactory.identify_site(url) != 'generic'
     
-    @staticmethod
-    def get_scraper(url: str):
+    @classmethod
+    def scraper_for_site(cls, site: str):
+        """Shared scraper for a site name, built with its selectors on first use"""
+        scrapers = cls._scrapers
+        scraper = scrapers.get(site)
+        if scraper is None:
+            scraper = cls._build_scraper(site, cls.load_selectors(), cls.config_version())
+            scrapers[site] = scraper
+        return scraper
+    
+    @classmethod
+    def _build_scraper(cls, site: str, selectors: dict, version: str):
+        scraper_class = SCRAPER_CLASSES.get(site, GenericScraper)
+        scraper = scraper_class(selectors=selectors.get(site, {}))
+        scraper.selector_stats = cls._selector_stats
+        scraper.config_version = version
+        return scraper
+    
+    @classmethod
+    def get_scraper(cls, url: str):
         """Identify site and return appropriate scraper with injected selectors"""
-        site = ScraperFactory.identify_site(url)
-        selectors = ScraperFactory.load_selectors().get(site, {})
+        return cls.scraper_for_site(cls.identify_site(url))
+    
+    @classmethod
+    def attach_selector_stats(cls, stats) -> None:
+        """Record selector hit rates into ``stats`` (a SelectorStats) and order cascades by them"""
+        cls._selector_stats = stats
+        for scraper in cls._scrapers.values():
+            scraper.selector_stats = stats
+    
+    @classmethod
+    def warm(cls) -> None:
+        """Compile every site's extraction plan up front (raises ValueError on an invalid plan)"""
+        for site in SCRAPER_CLASSES:
+            cls.scraper_for_site(site)
+    
+    @classmethod
+    def reload(cls, path: str = None) -> dict:
+        """
+        Re-read selectors.json and swap in freshly compiled scrapers for every site.
         
-        if site == 'amazon':
-            return AmazonScraper(selectors=selectors)
-        elif site == 'flipkart':
-            return FlipkartScraper(selectors=selectors)
-        elif site == 'myntra':
-            return MyntraScraper(selectors=selectors)
-        elif site == 'ajio':
-            return AjioScraper(selectors=selectors)
-        elif site == 'nykaa':
-            return NykaaScraper(selectors=selectors)
-        elif site == 'snapdeal':
-            return SnapdealScraper(selectors=selectors)
-        elif site == 'shopclues':
-            return ShopcluesScraper(selectors=selectors)
-        elif site == 'hygulife':
-            return HygulifeScraper(selectors=selectors)
-        elif site == 'meesho':
-            return MeeshoScraper(selectors=selectors)
-        else:
-            return GenericScraper(selectors=selectors)
-            
+        The new file is validated by compiling all plans first; on any error a
+        ValueError is raised and the running config stays in place. In-flight
+        scrapes keep the scraper (and plan) they already hold.
+        """
+        with cls._reload_lock:
+            mtime = cls._file_mtime(path)
+            selectors = plans.read_selectors(path)
+            version = plans.config_version(selectors)
+            previous = cls.config_version()
+            scrapers = {site: cls._build_scraper(site, selectors, version) for site in SCRAPER_CLASSES}
+            sites = compile_sites(selectors)
+            plans.install_selectors(selectors, version)
+            cls._scrapers = scrapers
+            cls._sites = sites
+            cls._loaded_mtime = mtime
+        if version != previous:
+            print(f"  Selectors config reloaded: {previous} -> {version}")
+        return {
+            'version': version,
+            'previous_version': previous,
+            'changed': version != previous,
+            'sites': sorted(scrapers),
+        }
+    
+    @classmethod
+    def reload_if_changed(cls, path: str = None):
+        """reload() when the file's mtime moved since the last (re)load; None if unchanged"""
+        mtime = cls._file_mtime(path)
+        if cls._loaded_mtime is None:
+            cls._loaded_mtime = mtime
+            return None
+        if mtime == cls._loaded_mtime:
+            return None
+        try:
+            return cls.reload(path)
+        except ValueError as e:
+            # Remember the bad file so it is not re-validated every poll
+            cls._loaded_mtime = mtime
+            print(f"Warning: Keeping the current selectors config, {e}")
+            return None
+    
     @staticmethod
-    def identify_site(url: str) -> str:
-        """Identify the e-commerce site from URL"""
-        url = ScraperFactory.unwrap_destination_url(url)
-        domain = urlparse(url).netloc.lower()
-        
-        # Handle short URLs and redirect domains
-        if 'amzn.to' in domain or 'amzn' in domain:
-            return 'amazon'
-        elif 'amazon' in domain:
-            return 'amazon'
-        elif 'flipkart' in domain or 'shopsy' in domain or 'fkrt.cc' in domain:
-            return 'flipkart'
-        elif 'myntra' in domain or 'myntr.it' in domain:
-            return 'myntra'
-        elif 'nykaa' in domain:
-            return 'nykaa'
-        elif 'snapdeal' in domain:
-            return 'snapdeal'
-        elif 'ajio' in domain or 'ajiio.in' in domain:
-            return 'ajio'
-        elif 'meesho' in domain or 'msho.in' in domain:
-            return 'meesho'
-        elif 'shopclues' in domain:
-            return 'shopclues'
-        elif 'hygulife' in domain or 'hyugalife' in domain:
-            return 'hygulife'
-        elif 'bitli.in' in domain:
-            return 'generic'  # Can't determine from domain alone, needs browser
-        elif 'extp.in' in domain:
-            return 'generic'  # Short-link domain, needs browser resolution
-        else:
-            return 'generic'
+    def _file_mtime(path: str = None):
+        try:
+            return os.path.getmtime(path or plans.selectors_path())
+        except OSError:
+            return None
+            
+    @classmethod
+    def identify_site(cls, url: str) -> str:
+        """Identify the e-commerce site from URL (host suffix lookup in the site registry)"""
+        url = cls.unwrap_destination_url(url)
+        return cls.sites().identify(urlparse(url).netloc)
 
     @staticmethod
     def unwrap_destination_url(url: str) -> str:
@@ -0,0 +1,157 @@
+"""
+Site registry compiled from selectors.json.
+
+Each site's block may carry a ``"site"`` entry with the hosts that identify
+it and how it is navigated (all optional)::
+
+    "site": {
+        "domains": ["amazon.in", "amazon.com"],
+        "shorteners": ["amzn.to", "amzn.in"],
+        "navigation": {"timeout": 15000, "wait_until": "domcontentloaded", "javascript": true},
+        "engine": "playwright",
+        "ua_profile": "desktop",
+        "max_concurrent": 4
+    }
+
+A URL's host is matched against ``domains`` and ``shorteners`` through a
+suffix index ("www.amazon.in" -> "amazon.in"): one dict lookup per label,
+not a scan over every site. Shortener hosts are also what the short-URL
+resolver expands over HTTP; the generic site lists the ones that are not
+tied to a retailer. ``engine`` and ``ua_profile`` are the engine router's
+prior until a site has outcome stats; ``ua_profile`` is also preferred for
+Playwright fallbacks. ``max_concurrent`` caps simultaneous scrapes of the
+site (unset = no cap).
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+
+GENERIC_SITE = 'generic'
+ENGINES = ('playwright', 'selenium', 'undetected')
+UA_PROFILES = ('desktop', 'googlebot')
+WAIT_UNTIL = ('commit', 'domcontentloaded', 'load', 'networkidle')
+
+
+def normalise_host(host: str) -> str:
+    """Lowercase host without port, credentials or trailing dot."""
+    host = (host or '').strip().lower().rsplit('@', 1)[-1]
+    if host.startswith('['):
+        return host
+    return host.split(':', 1)[0].rstrip('.')
+
+
+class SiteConfig:
+    """One site's hosts and navigation policy. Read-only once compiled."""
+
+    def __init__(self, name: str, domains: Iterable[str] = (), shorteners: Iterable[str] = (),
+                 navigation_timeout: Optional[int] = None, wait_until: str = 'domcontentloaded',
+                 javascript: bool = True, engine: str = 'playwright', ua_profile: str = 'desktop',
+                 max_concurrent: Optional[int] = None):
+        self.name = name
+        self.domains = tuple(domains)
+        self.shorteners = tuple(shorteners)
+        # Playwright page.goto timeout in ms (None = the browser profile default)
+        self.navigation_timeout = navigation_timeout
+        self.wait_until = wait_until
+        self.javascript = javascript
+        self.engine = engine
+        self.ua_profile = ua_profile
+        self.max_concurrent = max_concurrent
+
+    @property
+    def prior_strategy(self) -> Tuple[str, str]:
+        """(method, UA profile) the router starts with before it has stats."""
+        return (self.engine, self.ua_profile if self.engine == 'playwright' else 'desktop')
+
+    def __repr__(self):
+        return (f"SiteConfig(name={self.name!r}, domains={self.domains!r}, engine={self.engine!r}, "
+                f"ua_profile={self.ua_profile!r})")
+
+
+class SiteRegistry:
+    """Sites by name plus a host-suffix index over their domains and shorteners."""
+
+    def __init__(self, sites: Iterable[SiteConfig]):
+        self._sites: Dict[str, SiteConfig] = {}
+        self._suffixes: Dict[str, str] = {}
+        self._shorteners = set()
+        for site in sites:
+            self._sites[site.name] = site
+            for host in site.domains + site.shorteners:
+                owner = self._suffixes.setdefault(host, site.name)
+                if owner != site.name:
+                    raise ValueError(f"{site.name}: host {host!r} is already registered for {owner}")
+            self._shorteners.update(site.shorteners)
+        self._sites.setdefault(GENERIC_SITE, SiteConfig(GENERIC_SITE))
+
+    def _lookup(self, host: str) -> Optional[str]:
+        """Longest registered suffix of ``host``, or None."""
+        labels = normalise_host(host).split('.')
+        # Never match a bare TLD
+        for start in range(len(labels) - 1):
+            suffix = '.'.join(labels[start:])
+            if suffix in self._suffixes:
+                return suffix
+        return None
+
+    def identify(self, host: str) -> str:
+        """Site name for a host ('generic' when unknown)."""
+        suffix = self._lookup(host)
+        return self._suffixes[suffix] if suffix else GENERIC_SITE
+
+    def domain(self, host: str) -> Optional[str]:
+        """Registered domain or shortener a host matched ("www.amazon.co.uk" -> "amazon.co.uk"), or None."""
+        return self._lookup(host)
+
+    def is_shortener(self, host: str) -> bool:
+        suffix = self._lookup(host)
+        return suffix in self._shorteners
+
+    def get(self, site: str) -> SiteConfig:
+        """A site's config (the generic defaults for unknown names)."""
+        return self._sites.get(site) or self._sites[GENERIC_SITE]
+
+    def __iter__(self):
+        return iter(self._sites.values())
+
+    def __repr__(self):
+        return f"SiteRegistry({len(self._sites)} sites, {len(self._suffixes)} hosts)"
+
+
+def _hosts(value, key: str, site: str) -> Tuple[str, ...]:
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"{site}: site.{key} must be a list of hosts")
+    return tuple(normalise_host(host) for host in value if normalise_host(host))
+
+
+def _choice(value, allowed, key: str, site: str):
+    if value not in allowed:
+        raise ValueError(f"{site}: {key} must be one of {', '.join(allowed)}, got {value!r}")
+    return value
+
+
+def compile_site(name: str, config: Dict) -> SiteConfig:
+    """Compile one site's ``"site"`` block. Raises ValueError on an invalid entry."""
+    site = (config or {}).get('site', {})
+    navigation = site.get('navigation', {})
+    timeout = navigation.get('timeout')
+    max_concurrent = site.get('max_concurrent')
+    if max_concurrent is not None and (not isinstance(max_concurrent, int) or max_concurrent < 1):
+        raise ValueError(f"{name}: site.max_concurrent must be a positive integer")
+    return SiteConfig(
+        name,
+        domains=_hosts(site.get('domains', []), 'domains', name),
+        shorteners=_hosts(site.get('shorteners', []), 'shorteners', name),
+        navigation_timeout=int(timeout) if timeout is not None else None,
+        wait_until=_choice(navigation.get('wait_until', 'domcontentloaded'), WAIT_UNTIL,
+                           'site.navigation.wait_until', name),
+        javascript=bool(navigation.get('javascript', True)),
+        engine=_choice(site.get('engine', 'playwright'), ENGINES, 'site.engine', name),
+        ua_profile=_choice(site.get('ua_profile', 'desktop'), UA_PROFILES, 'site.ua_profile', name),
+        max_concurrent=max_concurrent,
+    )
+
+
+def compile_sites(selectors: Dict) -> SiteRegistry:
+    """Registry for every site block in a selectors config."""
+    return SiteRegistry(compile_site(name, config) for name, config in selectors.items()
+                        if isinstance(config, dict))
@@ -0,0 +1,103 @@
+"""
+Single-pass out-of-stock phrase matching.
+
+Each site's out-of-stock phrases are compiled once (per ExtractionPlan) into
+one alternation, longest phrase first, matched against lowercased text, so a
+page is scanned once instead of once per phrase. Words inside a phrase match
+any whitespace run, and phrases only match on word boundaries ("unavailable"
+does not hit "unavailableSizes").
+
+Page scans skip script, style, noscript, template and svg bodies and
+comments (search_visible() only scans the spans between them), so hydration
+JSON or analytics code mentioning "sold out" does not mark a product
+unavailable. Sites can narrow the scan further to DOM regions (selectors.json
+``extraction.stock.regions``).
+"""
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+INVISIBLE_OPEN_PATTERN = re.compile(r'<(script|style|noscript|template|svg)\b|<!--', re.IGNORECASE)
+INVISIBLE_CLOSE_PATTERNS = {
+    name: re.compile(rf'</{name}\s*>', re.IGNORECASE)
+    for name in ('script', 'style', 'noscript', 'template', 'svg')
+}
+COMMENT_CLOSE_PATTERN = re.compile(r'-->')
+
+
+def visible_spans(html: str) -> List[Tuple[int, int]]:
+    """(start, end) ranges of ``html`` outside script/style/noscript/template/svg bodies and comments."""
+    spans = []
+    position = 0
+    length = len(html or '')
+    while position < length:
+        opening = INVISIBLE_OPEN_PATTERN.search(html, position)
+        if not opening:
+            break
+        if opening.start() > position:
+            spans.append((position, opening.start()))
+        name = opening.group(1)
+        closer = INVISIBLE_CLOSE_PATTERNS[name.lower()] if name else COMMENT_CLOSE_PATTERN
+        closing = closer.search(html, opening.end())
+        # An unclosed block hides the rest of the page, as a browser would
+        position = closing.end() if closing else length
+    if position < length:
+        spans.append((position, length))
+    return spans
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class PhraseMatcher:
+    """Compiled matcher for a fixed set of phrases."""
+
+    def __init__(self, phrases: Iterable[str]):
+        # Normalised (lowercase, single-spaced), deduped; longest first so "out of stock!" beats "out of stock"
+        unique = {' '.join(phrase.lower().split()) for phrase in phrases}
+        unique.discard('')
+        self.phrases = tuple(sorted(unique, key=lambda phrase: (-len(phrase), phrase)))
+        self._pattern = None
+        if self.phrases:
+            # No capture groups and no IGNORECASE: that keeps re's fast literal-prefix scan;
+            # text is lowercased per span and word boundaries are checked per hit instead
+            self._pattern = re.compile('|'.join(
+                r'\s+'.join(re.escape(word) for word in phrase.split()) for phrase in self.phrases
+            ))
+
+    def __bool__(self):
+        return bool(self.phrases)
+
+    def _hits(self, text: str, offset: int = 0) -> Iterator[Tuple[str, int]]:
+        text = text.lower()
+        for match in self._pattern.finditer(text):
+            start, end = match.span()
+            if (start and _is_word(text[start - 1])) or (end < len(text) and _is_word(text[end])):
+                continue
+            yield ' '.join(match.group(0).split()), offset + start
+
+    def search(self, text: str) -> Optional[str]:
+        """First phrase found in ``text`` (in text order), or None."""
+        if not self._pattern or not text:
+            return None
+        return next((phrase for phrase, _ in self._hits(text)), None)
+
+    def search_visible(self, html: str) -> Optional[str]:
+        """First phrase in the visible parts of ``html``; script bodies etc. are skipped, not scanned."""
+        if not self._pattern or not html:
+            return None
+        for start, end in visible_spans(html):
+            phrase = next((phrase for phrase, _ in self._hits(html[start:end])), None)
+            if phrase:
+                return phrase
+        return None
+
+    def find_all(self, text: str) -> List[Tuple[str, int]]:
+        """Every (phrase, position) hit in ``text``, in one pass."""
+        if not self._pattern or not text:
+            return []
+        return list(self._hits(text))
+
+    def __repr__(self):
+        return f"PhraseMatcher({len(self.phrases)} phrases)"
@@ -0,0 +1,250 @@
+"""
+Structured-data first pass: JSON-LD, OpenGraph/product meta tags and microdata.
+
+Runs once per page over the shared HTML snapshot and merges the three
+sources into one ProductState (JSON-LD wins, then microdata, then meta
+tags). The state is marked inconsistent when the sources disagree on the
+price, so callers fall back to the selector cascade instead of trusting it;
+an MRP that is not above the price is dropped.
+
+Microdata is read from the ``itemtype=".../Product"`` itemscope that owns
+the page's main name (its <h1>, else og:title / <title>): carousels and
+"similar products" tiles carry Product scopes and prices of their own.
+"""
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional
+
+from .json_paths import format_price
+from .page_state import ProductState
+
+
+JSONLD_PATTERN = re.compile(
+    r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL
+)
+META_TAG_PATTERN = re.compile(r'<meta\s[^>]*>', re.IGNORECASE)
+ITEMPROP_PATTERN = re.compile(
+    r'<(\w+)\s[^>]*itemprop=["\'](price|availability|name|image|lowPrice)["\'][^>]*>([^<]{0,200})', re.IGNORECASE
+)
+PRODUCT_SCOPE_PATTERN = re.compile(
+    r'<\w+\s[^>]*itemtype=["\'][^"\']*schema\.org/Product["\'][^>]*>', re.IGNORECASE
+)
+MAIN_NAME_PATTERNS = [
+    re.compile(r'<h1[^>]*>(.*?)</h1>', re.IGNORECASE | re.DOTALL),
+    re.compile(r'<meta\s[^>]*property=["\']og:title["\'][^>]*content=["\']([^"\']*)["\']', re.IGNORECASE),
+    re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL),
+]
+TAG_PATTERN = re.compile(r'<[^>]+>')
+ATTR_PATTERN = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+PRICE_META = ['product:price:amount', 'og:price:amount', 'product:sale_price:amount']
+ORIGINAL_PRICE_META = ['product:original_price:amount', 'og:original_price:amount', 'product:retail_price:amount']
+AVAILABILITY_META = ['product:availability', 'og:availability']
+
+IN_STOCK_VALUES = ('instock', 'in stock', 'limitedavailability', 'preorder', 'presale', 'onlineonly')
+OUT_OF_STOCK_VALUES = ('outofstock', 'out of stock', 'oos', 'soldout', 'sold out', 'discontinued')
+
+# Prices from different sources within this ratio are considered the same
+PRICE_TOLERANCE = 0.01
+
+
+def _attrs(tag: str) -> Dict[str, str]:
+    return {m.group(1).lower(): m.group(2) if m.group(2) is not None else m.group(3)
+            for m in ATTR_PATTERN.finditer(tag)}
+
+
+def parse_availability(value: Any) -> Optional[bool]:
+    """Map schema.org / OpenGraph availability values to in_stock."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    token = value.strip().lower().rsplit('/', 1)[-1].replace('_', '').replace('-', '')
+    if any(token == v.replace(' ', '') for v in OUT_OF_STOCK_VALUES):
+        return False
+    if any(token == v.replace(' ', '') for v in IN_STOCK_VALUES):
+        return True
+    return None
+
+
+def _as_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _is_type(node: Dict, name: str) -> bool:
+    return any(str(t).rsplit('/', 1)[-1] == name for t in _as_list(node.get('@type')))
+
+
+def _jsonld_nodes(data: Any) -> Iterator[Dict]:
+    for item in _as_list(data):
+        if isinstance(item, dict):
+            yield item
+            yield from _jsonld_nodes(item.get('@graph'))
+
+
+def _image_url(value: Any) -> Optional[str]:
+    for item in _as_list(value):
+        if isinstance(item, str) and item:
+            return item
+        if isinstance(item, dict) and item.get('url'):
+            return item['url']
+    return None
+
+
+def parse_jsonld(html: str) -> Optional[ProductState]:
+    """First JSON-LD Product node with an offer, as a ProductState."""
+    for match in JSONLD_PATTERN.finditer(html or ''):
+        try:
+            data = json.loads(match.group(1).strip())
+        except ValueError:
+            continue
+        for node in _jsonld_nodes(data):
+            if not _is_type(node, 'Product'):
+                continue
+            offers = [o for o in _as_list(node.get('offers')) if isinstance(o, dict)]
+            price = original_price = in_stock = None
+            for offer in offers:
+                price = price or format_price(offer.get('price') or offer.get('lowPrice'))
+                for spec in _as_list(offer.get('priceSpecification')):
+                    if not isinstance(spec, dict):
+                        continue
+                    if 'ListPrice' in str(spec.get('priceType', '')):
+                        original_price = original_price or format_price(spec.get('price'))
+                    else:
+                        price = price or format_price(spec.get('price'))
+                if in_stock is None:
+                    in_stock = parse_availability(offer.get('availability'))
+            state = ProductState(
+                source='json-ld',
+                price=price,
+                original_price=original_price,
+                in_stock=in_stock,
+                name=str(node['name']).strip() if node.get('name') else None,
+                image_url=_image_url(node.get('image')),
+            )
+            if state.price or state.name:
+                return state
+    return None
+
+
+def parse_meta_tags(html: str) -> Optional[ProductState]:
+    """OpenGraph / product:* meta tags as a ProductState."""
+    meta = {}
+    for tag in META_TAG_PATTERN.findall(html or ''):
+        attrs = _attrs(tag)
+        key = (attrs.get('property') or attrs.get('name') or '').lower()
+        if key and 'content' in attrs and key not in meta:
+            meta[key] = attrs['content']
+
+    def first(keys):
+        return next((meta[k] for k in keys if meta.get(k)), None)
+
+    state = ProductState(
+        source='opengraph',
+        price=format_price(first(PRICE_META)),
+        original_price=format_price(first(ORIGINAL_PRICE_META)),
+        in_stock=parse_availability(first(AVAILABILITY_META)),
+        name=(first(['og:title']) or '').strip() or None,
+        image_url=first(['og:image', 'og:image:secure_url']),
+    )
+    return state if (state.price or state.in_stock is not None) else None
+
+
+def _normalise_name(text: str) -> str:
+    return ' '.join(TAG_PATTERN.sub(' ', text or '').split()).lower()
+
+
+def _main_name(html: str) -> Optional[str]:
+    for pattern in MAIN_NAME_PATTERNS:
+        match = pattern.search(html)
+        if match and _normalise_name(match.group(1)):
+            return _normalise_name(match.group(1))
+    return None
+
+
+def _itemprops(html: str) -> Dict[str, str]:
+    """First value per itemprop (content/href/src attribute, else element text)."""
+    values = {}
+    for match in ITEMPROP_PATTERN.finditer(html):
+        prop = match.group(2).lower()
+        if prop in values:
+            continue
+        attrs = _attrs(match.group(0))
+        values[prop] = attrs.get('content') or attrs.get('href') or attrs.get('src') or match.group(3).strip()
+    return values
+
+
+def _main_product_scope(html: str) -> Optional[str]:
+    """
+    HTML of the Product itemscope whose name matches the page's main name,
+    or None. The whole page counts when it has no Product scopes, and a lone
+    scope without a comparable name is taken as is. A scope runs until the
+    next Product scope starts.
+    """
+    starts = [m.start() for m in PRODUCT_SCOPE_PATTERN.finditer(html)]
+    if not starts:
+        return html
+    scopes = [html[start:end] for start, end in zip(starts, starts[1:] + [len(html)])]
+    main_name = _main_name(html)
+    names = [_normalise_name(_itemprops(scope).get('name', '')) for scope in scopes]
+    for scope, name in zip(scopes, names):
+        if main_name and name and (name in main_name or main_name in name):
+            return scope
+    if len(scopes) == 1 and not (main_name and names[0]):
+        return scopes[0]
+    return None
+
+
+def parse_microdata(html: str) -> Optional[ProductState]:
+    """schema.org microdata itemprops of the page's main Product."""
+    scope = _main_product_scope(html or '')
+    if scope is None:
+        return None
+    values = _itemprops(scope)
+
+    state = ProductState(
+        source='microdata',
+        price=format_price(values.get('price') or values.get('lowprice')),
+        in_stock=parse_availability(values.get('availability')),
+        name=values.get('name') or None,
+        image_url=values.get('image') or None,
+    )
+    return state if state.price else None
+
+
+def _price_value(price: Optional[str]) -> Optional[float]:
+    return float(price.replace(',', '')) if price else None
+
+
+def extract_structured_data(html: str) -> Optional[ProductState]:
+    """Merge JSON-LD, microdata and meta tags into one ProductState, flagging inconsistency."""
+    sources = [s for s in (parse_jsonld(html), parse_microdata(html), parse_meta_tags(html)) if s]
+    if not sources:
+        return None
+
+    field_sources = {}
+
+    def first(field):
+        for s in sources:
+            if getattr(s, field) not in (None, ''):
+                field_sources[field] = s.source
+                return getattr(s, field)
+        return None
+
+    merged = ProductState(
+        source='+'.join(s.source for s in sources),
+        price=first('price'),
+        original_price=first('original_price'),
+        in_stock=first('in_stock'),
+        name=first('name'),
+        image_url=first('image_url'),
+    )
+    merged.field_sources = field_sources
+
+    prices = [_price_value(s.price) for s in sources if s.price]
+    if prices and (max(prices) - min(prices)) > PRICE_TOLERANCE * max(prices):
+        merged.consistent = False
+    if merged.price and merged.original_price and \
+            _price_value(merged.original_price) <= _price_value(merged.price):
+        merged.original_price = None
+    return merged
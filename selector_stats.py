@@ -0,0 +1,223 @@
+"""
+Selector hit-rate telemetry and adaptive cascade ordering.
+
+Every price / original-price cascade run by the shared plan executor
+(BaseScraper) reports which selectors it tried and which one produced the
+accepted value; scrape_page() also reports which source (API, hydration
+blob, JSON-LD, selectors, ...) supplied each field. Counts decay
+exponentially, so hit rates follow recent pages and are persisted to a JSON
+file across restarts.
+
+Cascades keep the selectors.json order by default. A cascade stops at its
+first hit, so a fallback is only tried on pages where the preferred
+selector missed and its hit rate overstates it (a broad '[class*="price"]'
+fallback would overtake '.f_price'); SELECTOR_ADAPTIVE_ORDER=true reorders
+by smoothed hit rate anyway (file order breaks ties and holds until a
+selector has SELECTOR_MIN_ATTEMPTS samples). With SELECTOR_DROP_AFTER set, selectors on a miss streak that long are skipped
+except for occasional re-probes. A selector that used to hit and has missed
+SELECTOR_BROKEN_STREAK times in a row is reported as broken, which usually
+means the retailer changed its markup.
+"""
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+from state_dir import ensure_parent, state_path
+
+
+SELECTOR_STATS_PATH = os.getenv('SELECTOR_STATS_PATH', state_path('selector_stats.json'))
+SELECTOR_ADAPTIVE_ORDER = os.getenv('SELECTOR_ADAPTIVE_ORDER', 'false').lower() == 'true'
+SELECTOR_MIN_ATTEMPTS = float(os.getenv('SELECTOR_MIN_ATTEMPTS', 5))
+SELECTOR_DECAY = float(os.getenv('SELECTOR_DECAY', 0.98))
+# 0 keeps every selector in the cascade
+SELECTOR_DROP_AFTER = int(os.getenv('SELECTOR_DROP_AFTER', 0))
+SELECTOR_REPROBE_RATE = float(os.getenv('SELECTOR_REPROBE_RATE', 0.05))
+SELECTOR_BROKEN_STREAK = int(os.getenv('SELECTOR_BROKEN_STREAK', 20))
+SELECTOR_SAVE_INTERVAL = float(os.getenv('SELECTOR_SAVE_INTERVAL', 60))
+
+
+class SelectorStats:
+    """Decayed per-(site, field, selector) hit counts and per-field source counts."""
+
+    def __init__(self, path: Optional[str] = SELECTOR_STATS_PATH,
+                 adaptive: bool = SELECTOR_ADAPTIVE_ORDER,
+                 min_attempts: float = SELECTOR_MIN_ATTEMPTS,
+                 decay: float = SELECTOR_DECAY,
+                 drop_after: int = SELECTOR_DROP_AFTER,
+                 reprobe_rate: float = SELECTOR_REPROBE_RATE,
+                 broken_streak: int = SELECTOR_BROKEN_STREAK,
+                 save_interval: float = SELECTOR_SAVE_INTERVAL):
+        self.path = path
+        self.adaptive = adaptive
+        self.min_attempts = min_attempts
+        self.decay = decay
+        self.drop_after = drop_after
+        self.reprobe_rate = reprobe_rate
+        self.broken_streak = broken_streak
+        self.save_interval = save_interval
+        # site -> field -> selector -> {'hits', 'attempts', 'streak', 'ever_hit', 'updated_at'}
+        self._selectors: Dict[str, Dict[str, Dict[str, Dict]]] = {}
+        # site -> field -> source -> decayed count
+        self._sources: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self.load()
+
+    # ── Recording ──
+
+    def record(self, site: str, field: str, selector: str, hit: bool) -> None:
+        with self._lock:
+            self._record(site, field, selector, hit)
+        self._maybe_save()
+
+    def record_cascade(self, site: str, field: str, tried: List[str], hit: Optional[str]) -> None:
+        """One cascade run: ``hit`` produced the accepted value, every other tried selector missed."""
+        with self._lock:
+            for selector in tried:
+                self._record(site, field, selector, selector == hit)
+        self._maybe_save()
+
+    def record_sources(self, site: str, report: Dict[str, Dict]) -> None:
+        """scrape_page() ``sources`` report: which source supplied each accepted field."""
+        with self._lock:
+            fields = self._sources.setdefault(site, {})
+            for field, info in report.items():
+                counts = fields.setdefault(field, {})
+                for source in counts:
+                    counts[source] *= self.decay
+                counts[info['source']] = counts.get(info['source'], 0.0) + 1
+            self._dirty = True
+        self._maybe_save()
+
+    def _record(self, site: str, field: str, selector: str, hit: bool) -> None:
+        entry = self._selectors.setdefault(site, {}).setdefault(field, {}).setdefault(
+            selector, {'hits': 0.0, 'attempts': 0.0, 'streak': 0, 'ever_hit': False}
+        )
+        entry['attempts'] = entry['attempts'] * self.decay + 1
+        entry['hits'] = entry['hits'] * self.decay + (1 if hit else 0)
+        entry['updated_at'] = time.time()
+        if hit:
+            entry['streak'] = 0
+            entry['ever_hit'] = True
+        else:
+            entry['streak'] += 1
+            if entry['ever_hit'] and entry['streak'] == self.broken_streak:
+                print(f"  ⚠️ {site} {field} selector {selector!r} missed {entry['streak']} times in a row "
+                      f"after working before - the page layout may have changed")
+        self._dirty = True
+
+    # ── Queries ──
+
+    def hit_rate(self, site: str, field: str, selector: str) -> Optional[float]:
+        with self._lock:
+            entry = self._selectors.get(site, {}).get(field, {}).get(selector)
+            if not entry or not entry['attempts']:
+                return None
+            return entry['hits'] / entry['attempts']
+
+    def order(self, site: str, field: str, selectors) -> List[str]:
+        """Cascade order for ``selectors``: file order (hit rate if adaptive), dead selectors dropped if enabled."""
+        selectors = list(selectors)
+        if not self.adaptive and not self.drop_after:
+            return selectors
+        with self._lock:
+            entries = self._selectors.get(site, {}).get(field, {})
+
+            def score(selector):
+                entry = entries.get(selector)
+                if not entry or entry['attempts'] < self.min_attempts:
+                    return 0.5
+                # Laplace smoothing keeps a single lucky hit from outranking a proven selector
+                return (entry['hits'] + 1) / (entry['attempts'] + 2)
+
+            def dead(selector):
+                entry = entries.get(selector)
+                return bool(self.drop_after) and entry is not None and entry['streak'] >= self.drop_after
+
+            if self.adaptive:
+                ranked = sorted(selectors, key=lambda s: (-score(s), selectors.index(s)))
+            else:
+                ranked = selectors
+        alive = [s for s in ranked if not dead(s)]
+        if not alive or random.random() < self.reprobe_rate:
+            return ranked
+        return alive
+
+    def broken(self, site: str = None) -> List[Dict]:
+        """Selectors that used to hit and are now on a miss streak of at least SELECTOR_BROKEN_STREAK."""
+        with self._lock:
+            return [
+                {'site': s, 'field': field, 'selector': selector, 'streak': entry['streak']}
+                for s, fields in self._selectors.items() if site in (None, s)
+                for field, entries in fields.items()
+                for selector, entry in entries.items()
+                if entry['ever_hit'] and entry['streak'] >= self.broken_streak
+            ]
+
+    def snapshot(self, site: str = None) -> Dict:
+        """Hit rates per selector and source shares per field (for the stats endpoint)."""
+        with self._lock:
+            selectors = {
+                s: {
+                    field: {
+                        selector: {
+                            'hit_rate': round(entry['hits'] / entry['attempts'], 3) if entry['attempts'] else None,
+                            'attempts': round(entry['attempts'], 2),
+                            'miss_streak': entry['streak'],
+                        }
+                        for selector, entry in entries.items()
+                    }
+                    for field, entries in fields.items()
+                }
+                for s, fields in self._selectors.items() if site in (None, s)
+            }
+            sources = {
+                s: {
+                    field: {source: round(count / (sum(counts.values()) or 1), 3) for source, count in counts.items()}
+                    for field, counts in fields.items()
+                }
+                for s, fields in self._sources.items() if site in (None, s)
+            }
+        return {'selectors': selectors, 'sources': sources, 'broken': self.broken(site)}
+
+    # ── Persistence ──
+
+    def _maybe_save(self) -> None:
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock:
+                self._selectors = data.get('selectors', {})
+                self._sources = data.get('sources', {})
+        except Exception as e:
+            print(f"Warning: Could not load selector stats from {self.path}: {e}")
+
+    def save(self) -> None:
+        """Write stats atomically (temp file + rename) if anything changed."""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {'version': 1, 'selectors': self._selectors, 'sources': self._sources}
+            data = json.dumps(payload, indent=2, sort_keys=True)
+            self._dirty = False
+            self._last_save = time.monotonic()
+        tmp_path = f"{self.path}.tmp"
+        try:
+            ensure_parent(self.path)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Warning: Could not save selector stats to {self.path}: {e}")
@@ -0,0 +1,132 @@
+"""
+Per-site browser session state (cookies + localStorage) reused across scrapes.
+
+Every scrape used to start from an empty Playwright context, so each page
+load hit location toasters, consent banners and fresh bot scoring as a
+first-time visitor. The store keeps a few ``storage_state`` snapshots per
+site captured from successful sessions and seeds new contexts from them,
+rotating between snapshots, expiring old ones and dropping any snapshot
+whose session got blocked or captcha'd.
+"""
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from state_dir import state_path
+
+
+SESSION_STATE_DIR = os.getenv('SESSION_STATE_DIR', state_path('sessions'))
+SESSION_STATE_TTL = float(os.getenv('SESSION_STATE_TTL', 24 * 3600))
+SESSION_STATE_MAX_PER_SITE = int(os.getenv('SESSION_STATE_MAX_PER_SITE', 3))
+SESSION_STATE_ENABLED = os.getenv('SESSION_STATE_ENABLED', 'true').lower() == 'true'
+
+# Page titles that mean the session was blocked or challenged
+BLOCK_MARKERS = [
+    'robot check', 'captcha', 'access denied', 'are you a human', 'pardon our interruption',
+    'request blocked', 'attention required', 'just a moment', 'verify you are human',
+]
+
+
+def looks_blocked(title: str) -> bool:
+    title = (title or '').lower()
+    return any(marker in title for marker in BLOCK_MARKERS)
+
+
+class SessionStore:
+    """Rotating, expiring ``storage_state`` snapshots on disk, per site."""
+
+    def __init__(self, root: str = SESSION_STATE_DIR, ttl: float = SESSION_STATE_TTL,
+                 max_per_site: int = SESSION_STATE_MAX_PER_SITE, enabled: bool = SESSION_STATE_ENABLED):
+        """
+        Args:
+            root: Directory holding one sub-directory of snapshots per site
+            ttl: Seconds after which a snapshot is expired
+            max_per_site: Snapshots kept per site (oldest dropped first)
+            enabled: Disable to always start from an empty context
+        """
+        self.root = root
+        self.ttl = ttl
+        self.max_per_site = max_per_site
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._cursor: Dict[str, int] = {}
+
+    def _site_dir(self, site: str) -> str:
+        return os.path.join(self.root, site)
+
+    def _snapshots(self, site: str) -> List[str]:
+        """Live snapshots for a site, newest first; expired ones are deleted."""
+        site_dir = self._site_dir(site)
+        if not os.path.isdir(site_dir):
+            return []
+        now = time.time()
+        live = []
+        for name in os.listdir(site_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(site_dir, name)
+            try:
+                if now - os.path.getmtime(path) > self.ttl:
+                    os.remove(path)
+                else:
+                    live.append(path)
+            except OSError:
+                continue
+        return sorted(live, key=os.path.getmtime, reverse=True)
+
+    def pick(self, site: str) -> Optional[str]:
+        """Return a snapshot path to seed a new context with (round-robin), or None."""
+        if not self.enabled or site in ('generic', 'unknown'):
+            return None
+        with self._lock:
+            snapshots = self._snapshots(site)
+            if not snapshots:
+                return None
+            index = self._cursor.get(site, 0) % len(snapshots)
+            self._cursor[site] = index + 1
+            return snapshots[index]
+
+    def should_capture(self, site: str, seeded_from: Optional[str]) -> bool:
+        """Capture a fresh snapshot unless the store is full and the seed is still young."""
+        if not self.enabled or site in ('generic', 'unknown'):
+            return False
+        with self._lock:
+            snapshots = self._snapshots(site)
+        if len(snapshots) < self.max_per_site or not seeded_from:
+            return True
+        try:
+            return time.time() - os.path.getmtime(seeded_from) > self.ttl / 2
+        except OSError:
+            return True
+
+    async def capture(self, context, site: str) -> Optional[str]:
+        """Save the context's storage state as a new snapshot and prune old ones."""
+        site_dir = self._site_dir(site)
+        path = os.path.join(site_dir, f"{int(time.time())}-{uuid.uuid4().hex[:8]}.json")
+        try:
+            os.makedirs(site_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            await context.storage_state(path=tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"  Could not save {site} session state: {e}")
+            return None
+
+        with self._lock:
+            for stale in self._snapshots(site)[self.max_per_site:]:
+                self._remove(stale)
+        return path
+
+    def discard(self, path: Optional[str]) -> None:
+        """Drop a snapshot whose session was blocked or challenged."""
+        if path:
+            with self._lock:
+                self._remove(path)
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,69 @@
+"""
+Per-site concurrency caps.
+
+Sites with a ``max_concurrent`` in their registry entry (selectors.json
+"site.max_concurrent") get at most that many scrapes in flight at once,
+across every Flask request thread and batch. Each request thread runs its
+own event loop, so the counters are guarded by a threading lock and a
+waiting scrape polls for a free slot with ``asyncio.sleep`` instead of
+blocking its loop (other scrapes of a batch keep running meanwhile).
+"""
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+
+SITE_SLOT_POLL_INTERVAL = 0.05
+
+
+class SiteLimiter:
+    """Counts in-flight scrapes per site and makes callers wait for a free slot."""
+
+    def __init__(self, poll_interval: float = SITE_SLOT_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._active: Dict[str, int] = {}
+        self._waiting: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, site: str, limit: int) -> bool:
+        with self._lock:
+            if self._active.get(site, 0) >= limit:
+                return False
+            self._active[site] = self._active.get(site, 0) + 1
+            return True
+
+    def _release(self, site: str) -> None:
+        with self._lock:
+            self._active[site] -= 1
+
+    def _wait_count(self, site: str, delta: int) -> None:
+        with self._lock:
+            self._waiting[site] = self._waiting.get(site, 0) + delta
+
+    @asynccontextmanager
+    async def slot(self, site: str, limit: Optional[int]):
+        """Hold one of ``limit`` slots for ``site`` (no cap when ``limit`` is None)."""
+        if not limit:
+            yield
+            return
+        if not self._try_acquire(site, limit):
+            self._wait_count(site, 1)
+            try:
+                while not self._try_acquire(site, limit):
+                    await asyncio.sleep(self.poll_interval)
+            finally:
+                self._wait_count(site, -1)
+        try:
+            yield
+        finally:
+            self._release(site)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            sites = set(self._active) | set(self._waiting)
+            return {
+                site: {'active': self._active.get(site, 0), 'waiting': self._waiting.get(site, 0)}
+                for site in sorted(sites)
+                if self._active.get(site) or self._waiting.get(site)
+            }
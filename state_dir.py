@@ -0,0 +1,25 @@
+"""
+Where the scraper keeps its runtime state.
+
+Engine routing stats, selector hit rates, the short-link redirect cache and
+saved browser sessions (retailer cookies) all default to files under one
+directory, STATE_DIR (default: .state, which is gitignored), so none of it
+lands in the working tree. Each file's own *_PATH / *_DIR variable still
+overrides its location.
+"""
+import os
+
+
+STATE_DIR = os.getenv('STATE_DIR', '.state')
+
+
+def state_path(name: str) -> str:
+    """Default location of a state file or directory under STATE_DIR."""
+    return os.path.join(STATE_DIR, name)
+
+
+def ensure_parent(path: str) -> None:
+    """Create the directory a state file is written to."""
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
@@ -1,7 +1,13 @@
+import asyncio
+import json
+import os
+import re
+import tempfile
+import threading
 import unittest
-from unittest.mock import AsyncMock, patch
 
-from scrapers.base_scraper import BaseScraper
+from scrapers.base_scraper import BaseScraper, parse_fields
+from scrapers.browser_adapter import BrowserAdapter, build_ready_predicate
 from scrapers.amazon_scraper import AmazonScraper
 from scrapers.ajio_scraper import AjioScraper
 from scrapers.flipkart_scraper import FlipkartScraper
@@ -10,6 +16,19 @@ from scrapers.nykaa_scraper import NykaaScraper
 from scrapers.snapdeal_scraper import SnapdealScraper
 from scrapers.shopclues_scraper import ShopcluesScraper
 from scrapers.scraper_factory import ScraperFactory
+from scrapers.canonical import canonicalize_url, product_key
+from scrapers.confidence import CONFIDENCE_THRESHOLD, FieldPicks, confidence_for
+from scrapers.api_capture import ApiResponseCapture
+from scrapers.json_paths import first_value, format_price
+from scrapers.plans import compile_plan, load_selectors
+from selector_stats import SelectorStats
+from scrapers.page_state import extract_page_state, find_blob
+from scrapers.structured_data import extract_structured_data, parse_availability, parse_microdata
+from scrapers.sites import SiteRegistry, compile_site, compile_sites
+from scrapers.stock_matcher import PhraseMatcher
+from scrapers.page_analysis import PageAnalyzer
+from scrapers.price_detector import score_detection
+from scrapers.prices import clean_price, find_prices, original_price_candidates, price_candidates
 
 
 class DemoScraper(BaseScraper):
@@ -18,15 +37,24 @@ class DemoScraper(BaseScraper):
 
 
 class FakeElement:
-    def __init__(self, text='', attrs=None):
+    def __init__(self, text='', attrs=None, visible=True):
         self.text = text
         self.attrs = attrs or {}
+        self.visible = visible
 
 
 class FakeBrowser:
+    backend_type = 'playwright'
+
     def __init__(self, elements, content=''):
         self.elements = elements
         self.content = content
+        self.queried = []
+
+    async def query_selector(self, selector):
+        self.queried.append(selector)
+        elements = self.elements.get(selector, [])
+        return elements[0] if elements else None
 
     async def query_selector_all(self, selector):
         return self.elements.get(selector, [])
@@ -40,12 +68,18 @@ class FakeBrowser:
     async def get_attribute(self, element, attr):
         return element.attrs.get(attr)
 
+    async def is_visible(self, element):
+        return element.visible
+
     async def evaluate_handle(self, element, js_expression):
         return None
 
     async def get_page_content(self):
         return self.content
 
+    def share_page_content(self, enabled=True):
+        pass
+
 
 class ScraperCoreTests(unittest.IsolatedAsyncioTestCase):
     def test_hygulife_selectors_are_injected(self):
@@ -157,8 +191,7 @@ class ScraperCoreTests(unittest.IsolatedAsyncioTestCase):
             ],
         })
 
-        with patch('scrapers.flipkart_scraper.asyncio.sleep', AsyncMock()):
-            self.assertEqual(await scraper.extract_price(browser), '130')
+        self.assertEqual(await scraper.extract_price(browser), '130')
 
     async def test_flipkart_page_source_jsonld_beats_plain_css_numbers(self):
         scraper = FlipkartScraper({
@@ -177,8 +210,7 @@ class ScraperCoreTests(unittest.IsolatedAsyncioTestCase):
             ],
         }, content=content)
 
-        with patch('scrapers.flipkart_scraper.asyncio.sleep', AsyncMock()):
-            self.assertEqual(await scraper.extract_price(browser), '130')
+        self.assertEqual(await scraper.extract_price(browser), '130')
 
     async def test_flipkart_original_price_from_product_pricing_payload(self):
         scraper = FlipkartScraper({
@@ -256,8 +288,7 @@ class ScraperCoreTests(unittest.IsolatedAsyncioTestCase):
             ],
         })
 
-        with patch('scrapers.ajio_scraper.asyncio.sleep', AsyncMock()):
-            price = await scraper.extract_price(browser)
+        price = await scraper.extract_price(browser)
         original_price = await scraper.extract_original_price(browser, price)
 
         self.assertEqual(price, '499')
@@ -277,8 +308,7 @@ class ScraperCoreTests(unittest.IsolatedAsyncioTestCase):
             ],
         })
 
-        with patch('scrapers.snapdeal_scraper.asyncio.sleep', AsyncMock()):
-            price = await scraper.extract_price(browser)
+        price = await scraper.extract_price(browser)
         original_price = await scraper.extract_original_price(browser, price)
 
         self.assertEqual(price, '299')
@@ -294,8 +324,7 @@ class ScraperCoreTests(unittest.IsolatedAsyncioTestCase):
             ],
         }, content='<script>var encoded = "-1990404162";</script>')
 
-        with patch('scrapers.snapdeal_scraper.asyncio.sleep', AsyncMock()):
-            self.assertEqual(await scraper.extract_price(browser), '391')
+        self.assertEqual(await scraper.extract_price(browser), '391')
 
     async def test_shopclues_price_and_original_price_selectors(self):
         scraper = ShopcluesScraper({
@@ -321,5 +350,810 @@ class ScraperCoreTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(original_price, '899')
 
 
+class ExtractionPipelineTests(unittest.IsolatedAsyncioTestCase):
+    async def test_scrape_page_chains_original_price_after_price(self):
+        scraper = DemoScraper({
+            'price_selectors': ['.price'],
+            'original_price_selectors': ['.mrp'],
+            'name_selectors': ['h1'],
+        })
+        browser = FakeBrowser({
+            '.price': [FakeElement('₹499')],
+            '.mrp': [FakeElement('MRP ₹999')],
+            'h1': [FakeElement('Demo Product')],
+        }, content='<p>In stock</p>')
+
+        extraction = await scraper.scrape_page(browser)
+
+        self.assertEqual(extraction['price'], '499')
+        self.assertEqual(extraction['original_price'], '999')
+        self.assertEqual(extraction['details']['name'], 'Demo Product')
+        self.assertTrue(extraction['stock']['in_stock'])
+
+    async def test_shared_page_content_is_read_once(self):
+        class FakePage:
+            calls = 0
+
+            async def content(self):
+                FakePage.calls += 1
+                await asyncio.sleep(0)
+                return '<html></html>'
+
+        adapter = BrowserAdapter(FakePage(), 'playwright')
+        adapter.share_page_content()
+        contents = await asyncio.gather(*[adapter.get_page_content() for _ in range(3)])
+        adapter.share_page_content(False)
+        await adapter.get_page_content()
+
+        self.assertEqual(contents, ['<html></html>'] * 3)
+        self.assertEqual(FakePage.calls, 2)
+
+
+class ReadinessWaitTests(unittest.IsolatedAsyncioTestCase):
+    def test_ready_predicate_guards_each_condition(self):
+        predicate = build_ready_predicate(['.price'], jsonld=True, script='window.ready')
+
+        self.assertIn('document.querySelector(".price")', predicate)
+        self.assertIn('application/ld+json', predicate)
+        self.assertIn('(window.ready)', predicate)
+        self.assertEqual(predicate.count('catch (e)'), 3)
+
+    async def test_selenium_wait_returns_as_soon_as_condition_holds(self):
+        class FakeDriver:
+            polls = 0
+
+            def execute_script(self, script):
+                FakeDriver.polls += 1
+                return FakeDriver.polls >= 3
+
+        adapter = BrowserAdapter(FakeDriver(), 'selenium')
+
+        self.assertTrue(await adapter.wait_until_ready(['.price'], timeout=5, poll_interval=0))
+        self.assertEqual(FakeDriver.polls, 3)
+
+    async def test_selenium_wait_gives_up_at_ceiling(self):
+        class NeverReadyDriver:
+            def execute_script(self, script):
+                return False
+
+        adapter = BrowserAdapter(NeverReadyDriver(), 'selenium')
+
+        self.assertFalse(await adapter.wait_until_ready(['.price'], timeout=0, poll_interval=0))
+
+    async def test_selenium_waits_once_for_price_when_site_has_no_ready_config(self):
+        class FakeDriver:
+            scripts = []
+
+            def execute_script(self, script):
+                FakeDriver.scripts.append(script)
+                return True
+
+        scraper = DemoScraper({'price_selectors': ['.price']})
+        await scraper.wait_for_page_ready(BrowserAdapter(FakeDriver(), 'selenium'))
+
+        self.assertEqual(len(FakeDriver.scripts), 1)
+        self.assertIn('document.querySelector(".price")', FakeDriver.scripts[0])
+        self.assertIn('application/ld+json', FakeDriver.scripts[0])
+
+
+class SeleniumOffloadTests(unittest.IsolatedAsyncioTestCase):
+    async def test_selenium_calls_run_off_the_event_loop_thread(self):
+        loop_thread = threading.current_thread().name
+
+        class FakeDriver:
+            @property
+            def page_source(self):
+                self.thread = threading.current_thread().name
+                return '<html>ok</html>'
+
+        driver = FakeDriver()
+        adapter = BrowserAdapter(driver, 'selenium')
+
+        self.assertEqual(await adapter.get_page_content(), '<html>ok</html>')
+        self.assertNotEqual(driver.thread, loop_thread)
+        self.assertTrue(driver.thread.startswith('selenium'))
+
+    async def test_undetected_sessions_share_the_webdriver_path(self):
+        class FakeDriver:
+            @property
+            def title(self):
+                self.thread = threading.current_thread().name
+                return 'Demo Product'
+
+        driver = FakeDriver()
+        adapter = BrowserAdapter(driver, 'undetected')
+
+        self.assertEqual(await adapter.get_title(), 'Demo Product')
+        self.assertTrue(driver.thread.startswith('selenium'))
+
+
+class CanonicalIdentityTests(unittest.TestCase):
+    def test_amazon_variants_share_asin_key(self):
+        urls = [
+            'https://www.amazon.in/dp/B0CHX1W1XY/?th=1',
+            'https://www.amazon.in/Apple-iPhone-15/dp/B0CHX1W1XY/ref=sr_1_2_sspa?keywords=iphone&qid=1700000000&sr=8-2-spons&psc=1',
+            'https://www.amazon.in/gp/product/B0CHX1W1XY?tag=deals-21',
+        ]
+
+        self.assertEqual({product_key(url) for url in urls}, {'amazon.in:B0CHX1W1XY'})
+        self.assertEqual(canonicalize_url(urls[1]), 'https://www.amazon.in/dp/B0CHX1W1XY')
+
+    def test_site_specific_product_ids(self):
+        cases = {
+            'https://www.flipkart.com/some-phone/p/itm6ac6485515ae4?pid=MOBGTAGPTB3VS24W&lid=LSTMOB&otracker=search':
+                'flipkart.com:itm6ac6485515ae4',
+            'https://www.flipkart.com/some-phone/p/itm6ac6485515ae4': 'flipkart.com:itm6ac6485515ae4',
+            'https://www.myntra.com/tshirts/roadster/roadster-men-black-tshirt/1234567/buy': 'myntra.com:1234567',
+            'https://www.nykaa.com/lakme-kajal/p/123456?skuId=789&ptype=product': 'nykaa.com:123456',
+            'https://www.ajio.com/dnmx-jeans/p/469581234_blue': 'ajio.com:469581234_blue',
+            'https://www.meesho.com/stylish-kurti/p/3zxy9a': 'meesho.com:3zxy9a',
+            'https://www.snapdeal.com/product/bag/638123456789': 'snapdeal.com:638123456789',
+        }
+        for url, key in cases.items():
+            self.assertEqual(product_key(url), key, url)
+
+    def test_flipkart_listing_key_ignores_the_variant(self):
+        with_pid = 'https://www.flipkart.com/x/p/itmabc123?pid=MOBG123'
+        without_pid = 'https://www.flipkart.com/x/p/itmabc123'
+
+        self.assertEqual(product_key(with_pid), product_key(without_pid))
+        self.assertEqual(product_key(with_pid, variant=True), 'flipkart.com:itmabc123:MOBG123')
+        self.assertEqual(product_key(without_pid, variant=True), 'flipkart.com:itmabc123')
+        self.assertEqual(product_key('https://www.flipkart.com/x?pid=MOBG123'), 'flipkart.com:MOBG123')
+
+    def test_keys_carry_the_marketplace_and_nykaa_variant(self):
+        self.assertEqual(product_key('https://www.amazon.com/dp/B0CHX1W1XY'), 'amazon.com:B0CHX1W1XY')
+        self.assertNotEqual(product_key('https://www.amazon.in/dp/B0CHX1W1XY'),
+                            product_key('https://www.amazon.com/dp/B0CHX1W1XY'))
+        self.assertEqual(product_key('https://www.shopsy.in/x/p/itmabc?pid=P1', variant=True), 'shopsy.in:itmabc:P1')
+        self.assertEqual(product_key('https://www.nykaa.com/kajal/p/12345?skuId=111', variant=True), 'nykaa.com:12345:111')
+        self.assertEqual(product_key('https://www.nykaa.com/kajal/p/12345?skuId=222'), 'nykaa.com:12345')
+        self.assertEqual(canonicalize_url('https://www.nykaa.com/kajal/p/12345?skuId=222&ptype=product'),
+                         'https://www.nykaa.com/kajal/p/12345?skuId=222')
+
+    def test_affiliate_wrappers_and_tracking_params(self):
+        wrapped = 'https://track.example/click?dl=https%3A%2F%2Fwww.myntra.com%2Fshirts%2Fx%2Fy%2F9876543%3Futm_source%3Daff'
+
+        self.assertEqual(product_key(wrapped), 'myntra.com:9876543')
+        self.assertEqual(canonicalize_url(wrapped), 'https://www.myntra.com/shirts/x/y/9876543')
+        self.assertEqual(
+            canonicalize_url('https://www.flipkart.com/x/p/itm1?pid=ABC&lid=L&otracker=s'),
+            'https://www.flipkart.com/x/p/itm1?pid=ABC'
+        )
+        self.assertIsNone(product_key('https://fkrt.cc/abc'))
+
+
+class FakeResponse:
+    def __init__(self, url, payload):
+        self.url = url
+        self.payload = payload
+
+    async def json(self):
+        return self.payload
+
+
+class FakeEventPage:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def remove_listener(self, event, handler):
+        self.handlers.pop(event, None)
+
+
+class ApiCaptureTests(unittest.IsolatedAsyncioTestCase):
+    def test_paths_support_wildcards(self):
+        payload = {'RESPONSE': {'slots': [{'widget': {}}, {'widget': {'data': {'pricing': {'value': {
+            'finalPrice': {'value': 1299}, 'mrp': {'value': 1999}
+        }}}}}]}}
+
+        self.assertEqual(first_value(payload, ['**.pricing.value.finalPrice.value']), 1299)
+        self.assertEqual(first_value(payload, ['RESPONSE.slots.*.widget.data.pricing.value.mrp.value']), 1999)
+        self.assertEqual(format_price(1299), '1,299')
+        self.assertEqual(format_price('Rs. 499.50'), '499.50')
+        self.assertIsNone(format_price(0))
+
+    def test_configured_site_payload_is_parsed(self):
+        capture = ApiResponseCapture.for_site('myntra')
+        extraction = capture.parse({'style': {
+            'name': 'Roadster Tshirt',
+            'price': {'mrp': 1299, 'discounted': 649},
+            'flags': {'outOfStock': False},
+        }})
+
+        self.assertEqual(extraction['price'], '649')
+        self.assertEqual(extraction['original_price'], '1,299')
+        self.assertEqual(extraction['details']['name'], 'Roadster Tshirt')
+        self.assertTrue(extraction['stock']['in_stock'])
+        self.assertEqual(extraction['sources']['in_stock']['source'], 'api')
+        self.assertIsNone(ApiResponseCapture.for_site('amazon'))
+
+    def test_stock_is_only_attributed_to_the_api_when_flagged(self):
+        extraction = ApiResponseCapture.for_site('myntra').parse({'style': {'price': {'discounted': 649}}})
+
+        self.assertTrue(extraction['stock']['in_stock'])
+        self.assertEqual(extraction['sources']['in_stock'], {'source': 'stock_default', 'confidence': 0.5})
+
+    async def test_listener_resolves_on_matching_response(self):
+        capture = ApiResponseCapture.for_site('ajio')
+        page = FakeEventPage()
+        capture.attach(page)
+        handler = page.handlers['response']
+
+        await handler(FakeResponse('https://www.ajio.com/static/app.js', {'price': {'value': 1}}))
+        await handler(FakeResponse('https://www.ajio.com/api/p/469581234_blue', {
+            'price': {'value': 899}, 'wasPriceData': {'value': 1499},
+            'stock': {'stockLevelStatus': 'outOfStock'},
+        }))
+        extraction = await capture.wait(timeout=0.1)
+        capture.detach()
+
+        self.assertEqual(extraction['price'], '899')
+        self.assertFalse(extraction['stock']['in_stock'])
+        self.assertEqual(page.handlers, {})
+
+    async def test_dom_pipeline_races_the_api(self):
+        capture = ApiResponseCapture.for_site('flipkart')
+        capture.attach(FakeEventPage())
+        dom_result = {'price': '1,299', 'sources': {}}
+
+        async def dom(delay, value):
+            await asyncio.sleep(delay)
+            return value
+
+        started = asyncio.get_running_loop().time()
+        self.assertEqual(await capture.race(dom(0, dom_result)), (dom_result, False))
+        self.assertLess(asyncio.get_running_loop().time() - started, 1)
+
+        capture.attach(FakeEventPage())
+        slow_dom = asyncio.ensure_future(dom(10, dom_result))
+        asyncio.get_running_loop().call_later(0.01, capture._future.set_result, {'price': '999'})
+        self.assertEqual(await capture.race(slow_dom), ({'price': '999'}, True))
+        self.assertTrue(slow_dom.cancelled())
+
+    async def test_wait_times_out_without_response(self):
+        capture = ApiResponseCapture.for_site('nykaa')
+        capture.attach(FakeEventPage())
+
+        self.assertIsNone(await capture.wait(timeout=0.01))
+
+
+NYKAA_STATE_CONFIG = {
+    'blobs': ['__PRELOADED_STATE__'],
+    'price_paths': ['productPage.product.offerPrice'],
+    'original_price_paths': ['productPage.product.mrp'],
+    'name_paths': ['productPage.product.name'],
+    'image_paths': ['productPage.product.imageUrl'],
+    'in_stock_paths': ['productPage.product.inStock'],
+}
+NYKAA_STATE_HTML = (
+    '<script>window.__PRELOADED_STATE__ = {"productPage": {"product": {"name": "Lakme Kajal", '
+    '"offerPrice": 199, "mrp": 250, "imageUrl": "https://img/k.jpg", "inStock": false}}};</script>'
+)
+
+
+class PageStateTests(unittest.IsolatedAsyncioTestCase):
+    def test_blob_is_parsed_into_product_view(self):
+        state = extract_page_state(NYKAA_STATE_HTML, NYKAA_STATE_CONFIG)
+
+        self.assertEqual(state.source, '__PRELOADED_STATE__')
+        self.assertEqual((state.price, state.original_price), ('199', '250'))
+        self.assertEqual(state.name, 'Lakme Kajal')
+        self.assertFalse(state.stock()['in_stock'])
+
+    def test_next_data_and_size_bound(self):
+        html = '<script id="__NEXT_DATA__" type="application/json">{"props": {"offerPrice": "1,499"}}</script>'
+
+        self.assertEqual(extract_page_state(html, {'blobs': ['__NEXT_DATA__']}).price, '1,499')
+        self.assertIsNone(find_blob(html, '__NEXT_DATA__', max_bytes=10))
+        self.assertIsNone(extract_page_state('<html></html>', NYKAA_STATE_CONFIG))
+
+    async def test_scrape_page_skips_dom_for_fields_in_page_state(self):
+        scraper = DemoScraper({'page_state': NYKAA_STATE_CONFIG, 'price_selectors': ['.price']})
+        browser = FakeBrowser({'.price': [FakeElement('₹999')]}, content=NYKAA_STATE_HTML)
+
+        extraction = await scraper.scrape_page(browser)
+
+        self.assertEqual(extraction['price'], '199')
+        self.assertEqual(extraction['original_price'], '250')
+        self.assertEqual(extraction['details']['image_url'], 'https://img/k.jpg')
+        self.assertFalse(extraction['stock']['in_stock'])
+        self.assertEqual(browser.queried, [])
+
+
+PRODUCT_JSONLD_HTML = '''
+<meta property="og:title" content="Demo Phone">
+<meta property="product:price:amount" content="14999">
+<script type="application/ld+json">
+{"@context": "https://schema.org", "@graph": [{"@type": "BreadcrumbList"}, {
+  "@type": "Product", "name": "Demo Phone 5G", "image": ["https://img/phone.jpg"],
+  "offers": {"@type": "Offer", "price": "14999", "availability": "https://schema.org/InStock",
+             "priceSpecification": [{"@type": "UnitPriceSpecification", "priceType": "https://schema.org/ListPrice", "price": 19999}]}
+}]}
+</script>
+'''
+
+
+class StructuredDataTests(unittest.IsolatedAsyncioTestCase):
+    def test_jsonld_offer_and_meta_are_merged(self):
+        data = extract_structured_data(PRODUCT_JSONLD_HTML)
+
+        self.assertEqual(data.source, 'json-ld+opengraph')
+        self.assertEqual((data.price, data.original_price), ('14,999', '19,999'))
+        self.assertEqual(data.name, 'Demo Phone 5G')
+        self.assertTrue(data.in_stock)
+        self.assertTrue(data.consistent)
+        self.assertTrue(data.is_complete())
+
+    def test_microdata_and_conflicting_prices(self):
+        html = ('<span itemprop="price">₹1,299</span><link itemprop="availability" href="http://schema.org/OutOfStock">'
+                '<meta property="og:price:amount" content="999">')
+        data = extract_structured_data(html)
+
+        self.assertEqual(data.price, '1,299')
+        self.assertFalse(data.in_stock)
+        self.assertFalse(data.consistent)
+        self.assertIsNone(parse_availability('maybe'))
+        self.assertIsNone(extract_structured_data('<html></html>'))
+
+    def test_microdata_comes_from_the_main_product_scope(self):
+        html = ('<h1>Demo Phone 5G (Blue, 128 GB)</h1>'
+                '<div itemscope itemtype="https://schema.org/Product"><span itemprop="name">Other Phone</span>'
+                '<span itemprop="price" content="7999"></span></div>'
+                '<div itemscope itemtype="https://schema.org/Product"><span itemprop="name">Demo Phone 5G</span>'
+                '<span itemprop="price" content="14999"></span></div>')
+
+        self.assertEqual(parse_microdata(html).price, '14,999')
+        self.assertIsNone(parse_microdata(html.replace('Demo Phone 5G</span>', 'Third Phone</span>')))
+        self.assertLess(confidence_for('microdata'), CONFIDENCE_THRESHOLD)
+
+    async def test_complete_structured_data_skips_selector_cascade(self):
+        scraper = DemoScraper({'price_selectors': ['.price'], 'name_selectors': ['h1']})
+        browser = FakeBrowser({'.price': [FakeElement('₹1')]}, content=PRODUCT_JSONLD_HTML)
+
+        extraction = await scraper.scrape_page(browser)
+
+        self.assertEqual(extraction['price'], '14,999')
+        self.assertEqual(extraction['original_price'], '19,999')
+        self.assertEqual(extraction['details']['image_url'], 'https://img/phone.jpg')
+        self.assertTrue(extraction['stock']['in_stock'])
+        self.assertEqual(browser.queried, [])
+
+    async def test_structured_data_without_list_price_leaves_mrp_to_the_dom(self):
+        html = PRODUCT_JSONLD_HTML.replace('"14999"', '"12999"').replace(
+            ',\n             "priceSpecification": [{"@type": "UnitPriceSpecification", "priceType": "https://schema.org/ListPrice", "price": 19999}]', '')
+        html = html.replace('<meta property="product:price:amount" content="14999">', '')
+        self.assertIsNone(extract_structured_data(html).original_price)
+        self.assertTrue(extract_structured_data(html).is_complete())
+        scraper = DemoScraper({'original_price_selectors': ['.mrp']})
+        browser = FakeBrowser({'.mrp': [FakeElement('MRP ₹15,999')]}, content=html)
+
+        extraction = await scraper.scrape_page(browser)
+
+        self.assertEqual(extraction['price'], '12,999')
+        self.assertEqual(extraction['original_price'], '15,999')
+        self.assertEqual(extraction['sources']['original_price']['source'], 'mrp_sweep')
+
+        extraction = await scraper.scrape_page(FakeBrowser({}, content=html))
+        self.assertIsNone(extraction['original_price'])
+
+    async def test_inconsistent_structured_data_falls_back_to_dom(self):
+        html = '<span itemprop="price">1299</span><meta property="og:price:amount" content="999">'
+        scraper = DemoScraper({'price_selectors': ['.price']})
+        browser = FakeBrowser({'.price': [FakeElement('₹1,099')]}, content=html)
+
+        extraction = await scraper.scrape_page(browser)
+
+        self.assertEqual(extraction['price'], '1,099')
+        self.assertIn('.price', browser.queried)
+
+
+class ConfidenceTests(unittest.IsolatedAsyncioTestCase):
+    def test_field_picks_keep_most_confident_value(self):
+        picks = FieldPicks(threshold=0.8)
+        picks.offer('price', '999', 'opengraph')
+        self.assertFalse(picks.settled('price'))
+
+        picks.offer('price', '1,099', 'selector')
+        picks.offer('price', None, 'json-ld')
+        self.assertEqual(picks.value('price'), '1,099')
+        self.assertEqual(picks.report()['price'], {'source': 'selector', 'confidence': 0.75})
+        self.assertEqual(confidence_for('__PRELOADED_STATE__'), 0.9)
+
+    async def test_fields_report_their_source(self):
+        scraper = DemoScraper({'price_selectors': ['.price']})
+        browser = FakeBrowser({}, content=PRODUCT_JSONLD_HTML)
+
+        extraction = await scraper.scrape_page(browser)
+
+        self.assertEqual(extraction['sources']['price']['source'], 'json-ld')
+        self.assertEqual(extraction['sources']['image_url']['source'], 'json-ld')
+        self.assertEqual(extraction['sources']['in_stock']['confidence'], 0.9)
+
+    async def test_low_confidence_field_runs_dom_and_dom_wins(self):
+        html = '<meta property="og:price:amount" content="999"><meta property="og:title" content="Demo">'
+        scraper = DemoScraper({'price_selectors': ['.price'], 'name_selectors': ['h1']})
+        browser = FakeBrowser({'.price': [FakeElement('₹1,099')], 'h1': [FakeElement('Demo Product')]},
+                              content=html)
+
+        extraction = await scraper.scrape_page(browser)
+
+        self.assertEqual(extraction['price'], '1,099')
+        self.assertEqual(extraction['details']['name'], 'Demo Product')
+        self.assertEqual(extraction['sources']['price']['source'], 'selector')
+        self.assertEqual(extraction['sources']['in_stock']['source'], 'stock_default')
+
+    async def test_site_threshold_lowers_bar_for_meta_tags(self):
+        html = '<meta property="og:price:amount" content="999">'
+        scraper = DemoScraper({'price_selectors': ['.price'], 'confidence_threshold': 0.7})
+        browser = FakeBrowser({'.price': [FakeElement('₹1,099')]}, content=html)
+
+        extraction = await scraper.scrape_page(browser)
+
+        self.assertEqual(extraction['price'], '999')
+        self.assertNotIn('.price', browser.queried)
+
+
+class FieldProjectionTests(unittest.IsolatedAsyncioTestCase):
+    def test_parse_fields(self):
+        self.assertIsNone(parse_fields(None))
+        self.assertIsNone(parse_fields(''))
+        self.assertEqual(parse_fields('stock_status'), frozenset({'price', 'stock'}))
+        self.assertEqual(parse_fields(['details']), frozenset({'price', 'name', 'image_url'}))
+        with self.assertRaises(ValueError):
+            parse_fields('price,colour')
+
+    async def test_price_only_scrape_skips_other_stages(self):
+        scraper = DemoScraper({
+            'price_selectors': ['.price'],
+            'name_selectors': ['h1'],
+            'original_price_selectors': ['.mrp'],
+            'out_of_stock': ['sold out'],
+        })
+        browser = FakeBrowser({
+            '.price': [FakeElement('₹999')],
+            'h1': [FakeElement('Demo Product')],
+            '.mrp': [FakeElement('₹1,299')],
+        }, content='<p>Sold out</p>')
+
+        extraction = await scraper.scrape_page(browser, parse_fields('price'))
+
+        self.assertEqual(extraction['price'], '999')
+        self.assertIsNone(extraction['original_price'])
+        self.assertIsNone(extraction['details']['name'])
+        self.assertIsNone(extraction['stock'])
+        self.assertEqual(browser.queried, ['.price'])
+        self.assertEqual(set(extraction['sources']), {'price'})
+
+    async def test_price_and_stock_scrape(self):
+        scraper = DemoScraper({'price_selectors': ['.price'], 'name_selectors': ['h1'],
+                               'out_of_stock': ['sold out']})
+        browser = FakeBrowser({'.price': [FakeElement('₹999')]}, content='<p>Sold out</p>')
+
+        extraction = await scraper.scrape_page(browser, parse_fields('price,stock'))
+
+        self.assertFalse(extraction['stock']['in_stock'])
+        self.assertNotIn('h1', browser.queried)
+
+
+class ExtractionPlanTests(unittest.IsolatedAsyncioTestCase):
+    def test_plan_is_validated_and_read_only(self):
+        plan = compile_plan('demo', {'price_selectors': ['.price'], 'out_of_stock': ['Sold Out']})
+
+        self.assertEqual(plan.price_selectors, ('.price',))
+        self.assertEqual(plan.stock_phrases, ('sold out',))
+        with self.assertRaises(AttributeError):
+            plan.price_pick = 'lowest'
+        with self.assertRaises(ValueError):
+            compile_plan('demo', {'extraction': {'price': {'pick': 'highest'}}})
+
+    async def test_declarative_lowest_pick_and_per_selector_mrp(self):
+        scraper = DemoScraper({
+            'price_selectors': ['.f_price'],
+            'original_price_selectors': ['.old', '.mrp'],
+            'extraction': {
+                'price': {'pick': 'lowest', 'limit': 5, 'attributes': ['content'], 'range': [50, None]},
+                'original_price': {'mode': 'per_selector'},
+            },
+        })
+        browser = FakeBrowser({
+            '.f_price': [FakeElement('₹20'), FakeElement('₹899'), FakeElement('', {'content': '349'})],
+            '.old': [FakeElement('')],
+            '.mrp': [FakeElement('MRP ₹899')],
+        }, content='<div>MRP ₹1,499</div>')
+
+        price = await scraper.extract_price(browser)
+
+        self.assertEqual(price, '349')
+        self.assertEqual(await scraper.extract_original_price(browser, price), '899')
+
+    async def test_sources_limit_the_pipeline(self):
+        scraper = DemoScraper({'price_selectors': ['.price'],
+                               'extraction': {'sources': ['structured_data']}})
+        browser = FakeBrowser({'.price': [FakeElement('₹1')]},
+                              content='<meta property="og:price:amount" content="999">')
+
+        extraction = await scraper.scrape_page(browser)
+
+        self.assertEqual(extraction['price'], '999')
+        self.assertEqual(browser.queried, [])
+
+    async def test_cascades_report_to_selector_stats(self):
+        stats = SelectorStats(path=None, adaptive=True, min_attempts=1, reprobe_rate=0)
+        scraper = DemoScraper({'price_selectors': ['.gone', '.price']})
+        scraper.selector_stats = stats
+        browser = FakeBrowser({'.price': [FakeElement('₹999')]})
+
+        self.assertEqual(await scraper.extract_price(browser), '999')
+        self.assertEqual(browser.queried, ['.gone', '.price'])
+        self.assertEqual(await scraper.extract_price(browser), '999')
+        self.assertEqual(browser.queried[2:], ['.price'])
+
+    def test_factory_reuses_one_scraper_per_site(self):
+        first = ScraperFactory.get_scraper('https://www.shopclues.com/demo.html')
+
+        self.assertIs(first, ScraperFactory.get_scraper('https://www.shopclues.com/other.html'))
+        self.assertEqual(first.plan.price_pick, 'lowest')
+        self.assertEqual(first.plan.original_price_mode, 'per_selector')
+
+    def test_reload_swaps_plans_and_keeps_in_flight_scrapers(self):
+        old = ScraperFactory.scraper_for_site('shopclues')
+        old_version = ScraperFactory.config_version()
+        selectors = json.loads(json.dumps(load_selectors()))
+        selectors['shopclues']['price_selectors'] = ['.f_price_new']
+        self.addCleanup(ScraperFactory.reload)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'selectors.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(selectors, f)
+            reloaded = ScraperFactory.reload(path)
+
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('{"shopclues": {"extraction": {"price": {"pick": "highest"}}}}')
+            with self.assertRaises(ValueError):
+                ScraperFactory.reload(path)
+
+        new = ScraperFactory.scraper_for_site('shopclues')
+        self.assertTrue(reloaded['changed'])
+        self.assertEqual(reloaded['previous_version'], old_version)
+        self.assertEqual(ScraperFactory.config_version(), reloaded['version'])
+        self.assertEqual(new.config_version, reloaded['version'])
+        self.assertEqual(new.plan.price_selectors, ('.f_price_new',))
+        self.assertNotEqual(old.plan.price_selectors, ('.f_price_new',))
+
+
+
+class StockMatcherTests(unittest.IsolatedAsyncioTestCase):
+    def test_phrases_match_in_one_pass_on_word_boundaries(self):
+        matcher = PhraseMatcher(['Out of stock', 'out of stock!', 'Unavailable', 'Sold Out'])
+
+        self.assertEqual(matcher.search('This item is OUT OF\n  STOCK! for now'), 'out of stock!')
+        self.assertIsNone(matcher.search('{"unavailableSizes": []}'))
+        self.assertEqual(matcher.find_all('Sold out. Size M unavailable'), [('sold out', 0), ('unavailable', 17)])
+
+    async def test_script_bodies_do_not_mark_a_product_out_of_stock(self):
+        scraper = DemoScraper({'out_of_stock': ['Sold Out']})
+        page = '<script>window.__STATE__={"XL": "sold out"}</script><!-- sold out --><div>Add to bag</div>'
+
+        stock = await scraper.check_stock_status(FakeBrowser({}, content=page))
+        self.assertTrue(stock['in_stock'])
+
+        stock = await scraper.check_stock_status(FakeBrowser({}, content=page + '<p>Sold Out</p>'))
+        self.assertFalse(stock['in_stock'])
+        self.assertEqual(stock['message'], 'Found out-of-stock phrase: sold out')
+
+    async def test_regions_limit_the_phrase_scan(self):
+        scraper = DemoScraper({'out_of_stock': ['Sold Out'],
+                               'extraction': {'stock': {'regions': ['#pdp']}}})
+        browser = FakeBrowser({'#pdp': [FakeElement('Men Cotton Shirt ₹999')]},
+                              content='<div id="pdp">Men Cotton Shirt ₹999</div><div class="reco">Sold Out</div>')
+
+        stock = await scraper.check_stock_status(browser)
+
+        self.assertTrue(stock['in_stock'])
+
+    async def test_visible_stock_badge_marks_out_of_stock(self):
+        scraper = DemoScraper({'extraction': {'stock': {'badges': ['.sold-out'], 'regions': ['#pdp']}}})
+
+        stock = await scraper.check_stock_status(FakeBrowser({'#pdp .sold-out': [FakeElement('Sold', visible=False)],
+                                                              '.sold-out': [FakeElement('Sold')]}))
+        self.assertTrue(stock['in_stock'])
+
+        stock = await scraper.check_stock_status(FakeBrowser({'#pdp .sold-out': [FakeElement('Sold')]}))
+        self.assertFalse(stock['in_stock'])
+        self.assertEqual(stock['message'], 'Found out-of-stock badge: #pdp .sold-out')
+
+    async def test_amazon_availability_element_needs_an_out_of_stock_phrase(self):
+        scraper = ScraperFactory.scraper_for_site('amazon')
+
+        stock = await scraper.check_stock_status(FakeBrowser({'#availability span': [FakeElement('In stock')],
+                                                              '.a-color-state': [FakeElement('In stock')]}))
+        self.assertTrue(stock['in_stock'])
+
+        stock = await scraper.check_stock_status(FakeBrowser({'#availability span': [FakeElement('Currently unavailable.')]}))
+        self.assertFalse(stock['in_stock'])
+        self.assertEqual(stock['message'], 'Found out-of-stock phrase: currently unavailable')
+
+
+class PriceParsingTests(unittest.TestCase):
+    def test_indian_and_western_grouping(self):
+        self.assertEqual(clean_price('MRP ₹1,29,999 (incl. of all taxes)'), '1,29,999')
+        self.assertEqual(clean_price('INR 1,299,999.50'), '1,299,999.50')
+        self.assertEqual(clean_price('Rs.499'), '499')
+        self.assertEqual(clean_price('₹1,299₹2,49948% off'), '1,299')
+        self.assertEqual(find_prices('₹1,29,999')[0].value, 129999.0)
+
+    def test_ranges_and_per_unit_prices_are_flagged(self):
+        matches = find_prices('₹ 499 – ₹ 999 | ₹49.90/100 ml')
+
+        self.assertEqual([m.text for m in matches], ['499', '999', '49.90'])
+        self.assertTrue(matches[1].range_high)
+        self.assertEqual(matches[2].per_unit, '100 ml')
+        self.assertEqual(price_candidates('₹ 499 – ₹ 999'), ['499'])
+        self.assertEqual(price_candidates('₹49.90/100 ml'), [])
+        self.assertEqual(price_candidates('1,299'), ['1,299'])
+
+    def test_original_price_candidates_in_page_order(self):
+        content = '''<p>wasabi 12</p><div>MRP ₹1,499</div><span>₹1,999 (M.R.P.)</span>
+            <script>{"maximumRetailPrice":"2,499", 'mrp': 3000}</script>'''
+
+        self.assertEqual(original_price_candidates(content), ['1,499', '1,999', '2,499', '3000'])
+
+
+class PageAnalysisTests(unittest.IsolatedAsyncioTestCase):
+    async def test_small_pages_run_inline_and_large_pages_on_the_pool(self):
+        analyzer = PageAnalyzer(workers=1, min_chars=1000, max_chars=100_000, timeout=30)
+        self.addCleanup(analyzer.shutdown)
+        small = '<div>MRP ₹1,499</div>'
+        large = small + ' ' * 5000 + '<div>Was ₹2,999</div>'
+
+        self.assertEqual(await analyzer.run(original_price_candidates, small), ['1,499'])
+        self.assertEqual(await analyzer.run(original_price_candidates, large), ['1,499', '2,999'])
+
+        stats = analyzer.stats()['tasks']['original_price_candidates']
+        self.assertEqual((stats['calls'], stats['offloaded'], stats['timeouts']), (2, 1, 0))
+        self.assertEqual(analyzer.stats()['pending'], 0)
+
+    async def test_hung_analysis_terminates_the_pool(self):
+        analyzer = PageAnalyzer(workers=1, min_chars=1, timeout=0.5)
+        self.addCleanup(analyzer.shutdown)
+        catastrophic = re.compile(r'(a+)+$').match
+        self.assertEqual(await analyzer.run(original_price_candidates, 'MRP ₹1,499'), ['1,499'])
+        workers = list(analyzer._pool._processes.values())
+
+        self.assertEqual(await analyzer.run(catastrophic, 'a' * 64 + '!', default='skipped'), 'skipped')
+
+        self.assertIsNone(analyzer._pool)
+        workers[0].join(5)
+        self.assertFalse(workers[0].is_alive())
+        self.assertEqual(await analyzer.run(original_price_candidates, 'MRP ₹2,999'), ['2,999'])
+        self.assertEqual(analyzer.stats()['tasks']['Pattern.match']['timeouts'], 1)
+
+    async def test_pages_are_truncated_and_disabled_pool_stays_inline(self):
+        analyzer = PageAnalyzer(workers=0, min_chars=0, max_chars=25)
+
+        result = await analyzer.run(original_price_candidates, '<div>MRP ₹1,499</div>' + '<p>MRP ₹9,999</p>')
+
+        self.assertEqual(result, ['1,499'])
+        self.assertEqual(analyzer.stats()['tasks']['original_price_candidates']['offloaded'], 0)
+
+
+DETECTOR_PAGE = {
+    'viewportHeight': 800,
+    'structured': [],
+    'candidates': [
+        {'text': '₹1,299', 'fontSize': 28, 'fontWeight': 700, 'top': 320, 'struck': False,
+         'cartDistance': 180, 'label': 'pdp-selling-price'},
+        {'text': 'MRP ₹1,999', 'fontSize': 14, 'fontWeight': 400, 'top': 360, 'struck': True,
+         'cartDistance': 200, 'label': 'pdp-mrp'},
+        {'text': '₹40.50/100 ml', 'fontSize': 12, 'fontWeight': 400, 'top': 380, 'struck': False,
+         'cartDistance': 220, 'label': ''},
+        {'text': '₹499', 'fontSize': 14, 'fontWeight': 400, 'top': 2400, 'struck': False,
+         'cartDistance': None, 'label': 'card-price'},
+    ],
+}
+
+
+class FakeDetectorBrowser(FakeBrowser):
+    def __init__(self, elements, detection, content=''):
+        super().__init__(elements, content)
+        self.detection = detection
+
+    async def evaluate_script(self, script, arg=None):
+        return self.detection
+
+
+class PriceDetectorTests(unittest.IsolatedAsyncioTestCase):
+    def test_prominent_price_near_cart_wins_and_struck_price_is_mrp(self):
+        detected = score_detection(DETECTOR_PAGE)
+
+        self.assertEqual(detected.price, '1,299')
+        self.assertEqual(detected.original_price, '1,999')
+        self.assertGreater(detected.confidence, 0.7)
+        self.assertEqual(detected.signals['font'], 1.0)
+        self.assertIsNone(score_detection({'candidates': [DETECTOR_PAGE['candidates'][1]]}))
+
+    def test_regular_label_is_the_price_unless_a_sale_price_sits_beside_it(self):
+        page = {'viewportHeight': 800, 'structured': [], 'candidates': [
+            {'text': '₹999', 'fontSize': 22, 'fontWeight': 600, 'top': 300, 'cartDistance': 120,
+             'label': 'price-item price-item--regular price__regular'},
+            {'text': '₹1,299', 'fontSize': 16, 'top': 1900, 'cartDistance': None, 'label': 'card-price'},
+        ]}
+
+        detected = score_detection(page)
+        self.assertEqual(detected.price, '999')
+        self.assertIsNone(detected.original_price)
+
+        page['candidates'][0]['text'] = '₹1,499'
+        page['candidates'].append({'text': '₹999', 'fontSize': 22, 'fontWeight': 600, 'top': 330,
+                                   'cartDistance': 110, 'label': 'price-item price-item--sale'})
+        detected = score_detection(page)
+        self.assertEqual((detected.price, detected.original_price), ('999', '1,499'))
+
+    def test_structured_price_breaks_ties(self):
+        page = {'viewportHeight': 800, 'structured': ['999.00'], 'candidates': [
+            {'text': '₹1,099', 'fontSize': 20, 'top': 300, 'cartDistance': 100},
+            {'text': '₹999', 'fontSize': 20, 'top': 340, 'cartDistance': 100},
+        ]}
+
+        detected = score_detection(page)
+
+        self.assertEqual(detected.price, '999')
+        self.assertEqual(detected.signals['structured'], 1.0)
+        self.assertIsNone(detected.original_price)
+
+    async def test_generic_scraper_resolves_price_from_detector(self):
+        scraper = ScraperFactory.scraper_for_site('generic')
+        browser = FakeDetectorBrowser({'.price': [FakeElement('₹499')]}, DETECTOR_PAGE)
+
+        extraction = await scraper.scrape_page(browser)
+
+        self.assertIn('price_detector', scraper.plan.sources)
+        self.assertEqual(extraction['price'], '1,299')
+        self.assertEqual(extraction['original_price'], '1,999')
+        self.assertEqual(extraction['sources']['price']['source'], 'price_detector')
+        self.assertGreaterEqual(extraction['sources']['price']['confidence'], scraper.confidence_threshold)
+
+        # Sites keep the detector off unless their sources list it
+        self.assertNotIn('price_detector', DemoScraper({}).plan.sources)
+
+
+class SiteRegistryTests(unittest.TestCase):
+    def test_hosts_resolve_through_the_suffix_index(self):
+        sites = ScraperFactory.sites()
+
+        self.assertEqual(sites.identify('WWW.Amazon.in:443'), 'amazon')
+        self.assertEqual(sites.identify('www.amazon.co.uk'), 'amazon')
+        self.assertEqual(ScraperFactory.identify_site('https://www.amazon.ae/dp/B0C1'), 'amazon')
+        self.assertEqual(sites.identify('dl.flipkart.com'), 'flipkart')
+        self.assertEqual(sites.identify('notamazon.in'), 'generic')
+        self.assertEqual(sites.identify('in'), 'generic')
+        self.assertTrue(sites.is_shortener('msho.in'))
+        self.assertTrue(sites.is_shortener('bitli.in'))
+        self.assertFalse(sites.is_shortener('www.meesho.com'))
+        self.assertEqual(ScraperFactory.identify_site('https://myntr.it/abc'), 'myntra')
+
+    def test_navigation_policy_defaults_and_overrides(self):
+        amazon = ScraperFactory.site_config('amazon')
+        nykaa = ScraperFactory.site_config('nykaa')
+        unknown = ScraperFactory.site_config('example')
+
+        self.assertEqual(amazon.navigation_timeout, 15000)
+        self.assertEqual(nykaa.prior_strategy, ('selenium', 'desktop'))
+        self.assertEqual(nykaa.ua_profile, 'googlebot')
+        self.assertEqual((unknown.name, unknown.wait_until, unknown.javascript), ('generic', 'domcontentloaded', True))
+
+    def test_invalid_site_blocks_are_rejected(self):
+        with self.assertRaises(ValueError):
+            compile_site('demo', {'site': {'engine': 'lynx'}})
+        with self.assertRaises(ValueError):
+            compile_site('demo', {'site': {'navigation': {'wait_until': 'idle'}}})
+        with self.assertRaises(ValueError):
+            compile_sites({'a': {'site': {'domains': ['shop.in']}}, 'b': {'site': {'shorteners': ['shop.in']}}})
+        self.assertIsInstance(compile_sites({}), SiteRegistry)
+
 if __name__ == '__main__':
     unittest.main()
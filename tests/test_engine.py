@@ -0,0 +1,397 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+import httpx
+
+from browser_config import GOOGLEBOT_UA, PLAYWRIGHT_ARGS, STEALTH_JS, get_browser_profile
+from driver_pool import DriverPool
+from engine_router import STRATEGIES, EngineRouter
+from engine_stats import HEDGE_DEFAULT_DELAY, HEDGE_MIN_DELAY, LatencyHistory
+from selector_stats import SelectorStats
+from session_store import SessionStore, looks_blocked
+from site_limits import SiteLimiter
+from url_resolver import RedirectCache, ShortUrlResolver, is_short_url
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def new_window(self, kind):
+        self.driver.handle_count += 1
+        handle = f'w{self.driver.handle_count}'
+        self.driver.window_handles.append(handle)
+        self.driver.current_window_handle = handle
+
+    def window(self, handle):
+        self.driver.current_window_handle = handle
+
+
+class FakeDriver:
+    def __init__(self):
+        self.window_handles = ['w0']
+        self.current_window_handle = 'w0'
+        self.handle_count = 0
+        self.switch_to = FakeSwitchTo(self)
+        self.cookies_cleared = 0
+        self.quit_called = False
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == 'Network.clearBrowserCookies':
+            self.cookies_cleared += 1
+
+    def execute_script(self, script):
+        return 'https://www.myntra.com'
+
+    def close(self):
+        self.window_handles.remove(self.current_window_handle)
+
+    def quit(self):
+        self.quit_called = True
+
+
+class DriverPoolTests(unittest.IsolatedAsyncioTestCase):
+    async def test_sessions_are_reset_and_reused(self):
+        started = []
+
+        def factory():
+            driver = FakeDriver()
+            started.append(driver)
+            return driver
+
+        pool = DriverPool(factory, size=1, max_uses=5, max_rss_mb=10 ** 6)
+
+        async with pool.session() as first:
+            pass
+        async with pool.session() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.assertEqual(len(started), 1)
+        self.assertEqual(first.cookies_cleared, 2)
+        self.assertEqual(first.window_handles, [first.current_window_handle])
+        self.assertEqual(pool.stats()['reused'], 1)
+
+    async def test_session_is_recycled_after_max_uses(self):
+        pool = DriverPool(FakeDriver, size=1, max_uses=1, max_rss_mb=10 ** 6)
+
+        async with pool.session() as first:
+            pass
+        async with pool.session() as second:
+            pass
+
+        self.assertIsNot(first, second)
+        self.assertTrue(first.quit_called)
+        self.assertEqual(pool.stats()['recycled'], 2)
+
+    async def test_failed_session_is_not_returned_to_pool(self):
+        pool = DriverPool(FakeDriver, size=1, max_uses=5, max_rss_mb=10 ** 6)
+
+        with self.assertRaises(RuntimeError):
+            async with pool.session() as driver:
+                raise RuntimeError('page crashed')
+
+        self.assertTrue(driver.quit_called)
+        self.assertEqual(pool.stats()['idle'], 0)
+
+    async def test_warm_prestarts_up_to_pool_size(self):
+        pool = DriverPool(FakeDriver, size=2)
+
+        self.assertEqual(await pool.warm(), 2)
+        self.assertEqual(await pool.warm(), 0)
+        self.assertEqual(pool.stats()['idle'], 2)
+
+
+class LatencyHistoryTests(unittest.TestCase):
+    def test_quantile_needs_minimum_samples(self):
+        history = LatencyHistory()
+        history.record('ajio', 'playwright', 4.0)
+
+        self.assertIsNone(history.quantile('ajio', 'playwright', 0.8, min_samples=2))
+        self.assertEqual(history.hedge_delay('ajio'), HEDGE_DEFAULT_DELAY)
+
+    def test_hedge_delay_tracks_site_quantile(self):
+        history = LatencyHistory()
+        for seconds in [3, 4, 5, 6, 7, 8, 9, 10, 11, 30]:
+            history.record('flipkart', 'playwright', seconds)
+
+        self.assertEqual(history.quantile('flipkart', 'playwright', 0.8), 10)
+        self.assertEqual(history.hedge_delay('flipkart', q=0.8), 10)
+        self.assertEqual(history.count('meesho', 'playwright'), 0)
+
+    def test_hedge_delay_has_a_floor(self):
+        history = LatencyHistory()
+        for _ in range(10):
+            history.record('meesho', 'playwright', 0.2)
+
+        self.assertEqual(history.hedge_delay('meesho'), HEDGE_MIN_DELAY)
+
+
+class EngineRouterTests(unittest.TestCase):
+    def make_router(self, path=None, **kwargs):
+        kwargs.setdefault('explore_rate', 0)
+        return EngineRouter(path=path, min_attempts=3, **kwargs)
+
+    def test_priors_match_previous_routing(self):
+        router = self.make_router()
+
+        self.assertEqual(router.plan('myntra'), [('selenium', 'desktop'), ('playwright', 'desktop')])
+        self.assertEqual(router.plan('ajio')[0], ('playwright', 'googlebot'))
+        self.assertEqual(router.plan('flipkart'), [('playwright', 'desktop'), ('selenium', 'desktop')])
+
+    def test_cheapest_successful_strategy_wins(self):
+        router = self.make_router()
+        for _ in range(4):
+            router.record('flipkart', 'playwright', 'desktop', False, 30.0)
+            router.record('flipkart', 'selenium', 'desktop', True, 8.0)
+
+        self.assertEqual(router.plan('flipkart'), [('selenium', 'desktop'), ('playwright', 'desktop')])
+        self.assertLess(router.cost('flipkart', 'selenium', 'desktop'), 9)
+
+    def test_undetected_engine_is_routed_only_when_available(self):
+        router = self.make_router()
+        for _ in range(4):
+            router.record('ajio', 'playwright', 'googlebot', False, 20.0)
+            router.record('ajio', 'undetected', 'desktop', True, 9.0)
+
+        self.assertEqual(router.plan('ajio')[0], ('undetected', 'desktop'))
+
+        without = self.make_router(strategies=[s for s in STRATEGIES if s[0] != 'undetected'])
+        self.assertNotIn('undetected', {method for method, _ in without.rank('ajio')})
+
+    def test_fallback_prefers_the_site_ua_profile(self):
+        router = self.make_router()
+
+        self.assertEqual(router.plan('nykaa'), [('selenium', 'desktop'), ('playwright', 'googlebot')])
+
+    def test_exploration_starts_with_another_strategy(self):
+        router = self.make_router(explore_rate=1)
+
+        self.assertNotEqual(router.plan('myntra')[0], ('selenium', 'desktop'))
+
+    def test_stats_persist_across_restarts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'engine_stats.json')
+            router = self.make_router(path, save_interval=3600)
+            for _ in range(4):
+                router.record('nykaa', 'playwright', 'googlebot', True, 5.0)
+            router.save()
+
+            restored = self.make_router(path)
+            self.assertEqual(restored.plan('nykaa')[0], ('playwright', 'googlebot'))
+            self.assertFalse(os.path.exists(path + '.tmp'))
+
+
+class SelectorStatsTests(unittest.TestCase):
+    def make_stats(self, path=None, **kwargs):
+        kwargs.setdefault('reprobe_rate', 0)
+        return SelectorStats(path=path, min_attempts=3, **kwargs)
+
+    def test_file_order_is_kept_by_default(self):
+        stats = self.make_stats()
+        # The fallback only runs when the preferred selector misses, so it always "hits"
+        for hit in (True, False, True, False, False, True):
+            tried = ['.prod-sp'] if hit else ['.prod-sp', '.prod-cp']
+            stats.record_cascade('ajio', 'price', tried, '.prod-sp' if hit else '.prod-cp')
+
+        self.assertGreater(stats.hit_rate('ajio', 'price', '.prod-cp'), stats.hit_rate('ajio', 'price', '.prod-sp'))
+        self.assertEqual(stats.order('ajio', 'price', ['.prod-sp', '.prod-cp']), ['.prod-sp', '.prod-cp'])
+
+    def test_cascade_is_reordered_by_hit_rate(self):
+        stats = self.make_stats(adaptive=True)
+        for _ in range(5):
+            stats.record_cascade('ajio', 'price', ['.old', '.new'], '.new')
+
+        self.assertEqual(stats.order('ajio', 'price', ['.old', '.new', '.untried']), ['.new', '.untried', '.old'])
+        self.assertEqual(stats.hit_rate('ajio', 'price', '.old'), 0)
+        self.assertEqual(stats.order('flipkart', 'price', ['.a', '.b']), ['.a', '.b'])
+
+    def test_dead_selectors_are_dropped_and_broken_ones_reported(self):
+        stats = self.make_stats(drop_after=3, broken_streak=3)
+        stats.record('nykaa', 'price', '.css-1jczs19', True)
+        for _ in range(4):
+            stats.record_cascade('nykaa', 'price', ['.css-1jczs19', '.never'], None)
+
+        self.assertEqual(stats.order('nykaa', 'price', ['.css-1jczs19', '.never']), ['.css-1jczs19', '.never'])
+        stats.record('nykaa', 'price', '.fresh', True)
+        self.assertEqual(stats.order('nykaa', 'price', ['.css-1jczs19', '.never', '.fresh']), ['.fresh'])
+        self.assertEqual([b['selector'] for b in stats.broken('nykaa')], ['.css-1jczs19'])
+
+    def test_sources_and_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # The state directory is created on first save
+            path = os.path.join(tmp, 'state', 'selector_stats.json')
+            stats = self.make_stats(path)
+            stats.record_sources('myntra', {'price': {'source': 'api', 'confidence': 0.95}})
+            stats.record_sources('myntra', {'price': {'source': 'selector', 'confidence': 0.75}})
+            stats.record('myntra', 'price', '.pdp-price', True)
+            stats.save()
+
+            snapshot = self.make_stats(path).snapshot('myntra')
+
+        self.assertEqual(set(snapshot['sources']['myntra']['price']), {'api', 'selector'})
+        self.assertGreater(snapshot['sources']['myntra']['price']['selector'],
+                           snapshot['sources']['myntra']['price']['api'])
+        self.assertEqual(snapshot['selectors']['myntra']['price']['.pdp-price']['hit_rate'], 1.0)
+
+
+class ShortUrlResolverTests(unittest.IsolatedAsyncioTestCase):
+    REDIRECTS = {
+        'https://fkrt.cc/abc': 'https://dl.flipkart.com/s/xyz',
+        'https://dl.flipkart.com/s/xyz': 'https://www.flipkart.com/p/itm1',
+        'https://msho.in/q1': 'https://www.meesho.com/p/42',
+    }
+
+    def make_resolver(self, cache):
+        self.requests = []
+
+        def handler(request):
+            url = str(request.url)
+            self.requests.append(url)
+            if url in self.REDIRECTS:
+                return httpx.Response(302, headers={'location': self.REDIRECTS[url]})
+            return httpx.Response(200)
+
+        return ShortUrlResolver(cache=cache, transport=httpx.MockTransport(handler))
+
+    async def test_follows_redirect_chain(self):
+        resolver = self.make_resolver(RedirectCache(path=None))
+
+        final = await resolver.resolve('https://fkrt.cc/abc')
+
+        self.assertEqual(final, 'https://www.flipkart.com/p/itm1')
+        self.assertEqual(len(self.requests), 3)
+        self.assertEqual(resolver.cache.get('https://fkrt.cc/abc')[-1], final)
+
+    async def test_non_short_urls_are_untouched(self):
+        resolver = self.make_resolver(RedirectCache(path=None))
+
+        self.assertFalse(is_short_url('https://www.amazon.in/dp/B01'))
+        self.assertEqual(await resolver.resolve('https://www.amazon.in/dp/B01'), 'https://www.amazon.in/dp/B01')
+        self.assertEqual(self.requests, [])
+
+    async def test_batch_resolution_is_cached_on_disk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'redirects.json')
+            resolver = self.make_resolver(RedirectCache(path=path))
+            urls = ['https://msho.in/q1', 'https://www.myntra.com/p/1', 'https://msho.in/q1']
+
+            resolved = await resolver.resolve_many(urls)
+
+            self.assertEqual(resolved, ['https://www.meesho.com/p/42', 'https://www.myntra.com/p/1',
+                                        'https://www.meesho.com/p/42'])
+            self.assertEqual(self.requests, ['https://msho.in/q1', 'https://www.meesho.com/p/42'])
+
+            restarted = self.make_resolver(RedirectCache(path=path))
+            self.assertEqual(await restarted.resolve('https://msho.in/q1'), 'https://www.meesho.com/p/42')
+            self.assertEqual(self.requests, [])
+
+    async def test_chains_ending_on_a_shortener_are_not_cached(self):
+        resolver = self.make_resolver(RedirectCache(path=None))
+
+        self.assertEqual(await resolver.resolve('https://bitli.in/js-redirect'), 'https://bitli.in/js-redirect')
+        self.assertIsNone(resolver.cache.get('https://bitli.in/js-redirect'))
+
+    async def test_expired_entries_are_resolved_again(self):
+        cache = RedirectCache(path=None, ttl=-1)
+        cache.put('https://msho.in/q1', ['https://msho.in/q1', 'https://old.example'])
+
+        self.assertIsNone(cache.get('https://msho.in/q1'))
+
+
+class BrowserProfileTests(unittest.TestCase):
+    def test_desktop_profile_bundles_config(self):
+        profile = get_browser_profile('flipkart')
+        options = profile.new_context_options('Mozilla/5.0 Test')
+
+        self.assertEqual(profile.launch_options(headless=True), {'headless': True, 'args': PLAYWRIGHT_ARGS})
+        self.assertEqual(options['user_agent'], 'Mozilla/5.0 Test')
+        self.assertEqual(options['locale'], 'en-IN')
+        self.assertEqual(options['viewport'], {'width': 1920, 'height': 1080})
+        self.assertEqual(profile.init_scripts, [STEALTH_JS])
+
+    def test_googlebot_profile_pins_user_agent(self):
+        profile = get_browser_profile('ajio', 'googlebot')
+
+        self.assertEqual(profile.new_context_options('Mozilla/5.0 Test')['user_agent'], GOOGLEBOT_UA)
+
+    def test_site_overrides_are_memoised(self):
+        amazon = get_browser_profile('amazon')
+
+        self.assertEqual(amazon.navigation_timeout, 15000)
+        self.assertEqual(get_browser_profile('myntra').navigation_timeout, 30000)
+        self.assertIs(get_browser_profile('amazon'), amazon)
+        self.assertEqual(amazon.context_options, get_browser_profile('myntra').context_options)
+        self.assertEqual(amazon.wait_until, 'domcontentloaded')
+
+
+class SiteLimiterTests(unittest.IsolatedAsyncioTestCase):
+    async def test_scrapes_beyond_the_cap_wait_for_a_slot(self):
+        limiter = SiteLimiter(poll_interval=0.01)
+        running, peak = 0, 0
+
+        async def scrape():
+            nonlocal running, peak
+            async with limiter.slot('myntra', 2):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.03)
+                running -= 1
+
+        task = asyncio.ensure_future(asyncio.gather(*(scrape() for _ in range(5))))
+        await asyncio.sleep(0.01)
+        self.assertEqual(limiter.stats()['myntra'], {'active': 2, 'waiting': 3})
+        await task
+
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter.stats(), {})
+        async with limiter.slot('flipkart', None):
+            self.assertEqual(limiter.stats(), {})
+
+
+class FakeContext:
+    def __init__(self, cookies='[]'):
+        self.cookies = cookies
+
+    async def storage_state(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{"cookies": %s, "origins": []}' % self.cookies)
+
+
+class SessionStoreTests(unittest.IsolatedAsyncioTestCase):
+    async def test_snapshots_rotate_and_are_pruned(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SessionStore(root=tmp, ttl=3600, max_per_site=2, enabled=True)
+            self.assertIsNone(store.pick('amazon'))
+            self.assertTrue(store.should_capture('amazon', None))
+
+            paths = [await store.capture(FakeContext(), 'amazon') for _ in range(3)]
+
+            live = store._snapshots('amazon')
+            self.assertEqual(len(live), 2)
+            self.assertEqual({store.pick('amazon'), store.pick('amazon')}, set(live))
+            self.assertFalse(store.should_capture('amazon', live[0]))
+            self.assertTrue(all(p is not None for p in paths))
+
+    async def test_expired_and_blocked_snapshots_are_dropped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SessionStore(root=tmp, ttl=3600, enabled=True)
+            path = await store.capture(FakeContext(), 'myntra')
+            store.discard(path)
+            self.assertIsNone(store.pick('myntra'))
+
+            await store.capture(FakeContext(), 'myntra')
+            store.ttl = -1
+            self.assertIsNone(store.pick('myntra'))
+            self.assertIsNone(store.pick('generic'))
+
+    def test_block_markers(self):
+        self.assertTrue(looks_blocked('Amazon.in: Robot Check'))
+        self.assertTrue(looks_blocked('Access Denied'))
+        self.assertFalse(looks_blocked('Buy Lakme Kajal Online'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,6 +9,8 @@ from pathlib import Path
 from urllib.parse import urlparse
 from dotenv import load_dotenv
 
+from url_resolver import ShortUrlResolver
+
 
 load_dotenv()
 
@@ -26,6 +28,9 @@ DB_CONFIG = {
 API_BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:6000')
 UPDATE_PRICE_URL = os.getenv('UPDATE_PRICE_URL')
 
+# Short links are expanded once per cache TTL, not on every run
+url_resolver = ShortUrlResolver()
+
 
 def get_product_urls():
     """Get all product URLs from products table"""
@@ -61,24 +66,8 @@ async def update_product_price(id, price, client):
         print(f"Failed to update product price for {id}")
 
 async def expand_short_url(url, client):
-    """Expand short URLs (like amzn.to) to full URLs by following redirects"""
-    # Only expand if it's a short link (amzn.to) or doesn't contain a full domain
-    if 'amzn.to' in url.lower():
-        try:
-            # Follow redirects to get the final URL
-            response = await client.get(url, follow_redirects=True, timeout=30.0)
-            final_url = str(response.url)
-            # Only return if it's actually an Amazon URL
-            if 'amazon.in' in final_url or 'amazon.com' in final_url:
-                print(f"Expanded short URL to: {final_url[:80]}...")
-                return final_url
-            else:
-                print(f"Warning: Short URL redirects to non-Amazon URL: {final_url[:80]}...")
-                return url  # Return original if redirect doesn't go to Amazon
-        except Exception as e:
-            print(f"Warning: Could not expand short URL {url}: {e}")
-            return url  # Return original URL if expansion fails
-    return url
+    """Expand short URLs (amzn.to, fkrt.cc, msho.in, ...) to full URLs, using the persistent redirect cache"""
+    return await url_resolver.resolve(url, client)
 
 
 async def scraping_product_price(id, url, client, semaphore):
@@ -108,7 +97,9 @@ async def scraping_product_price(id, url, client, semaphore):
                     site = 'nykaa'
 
                 max_retries_param = 3 if site in difficult_sites else 2
-                api_url = f"{API_BASE_URL}/api/price?url={encoded_url}&max_retries={max_retries_param}"
+                # The updater only reads price and stock, so skip the details and MRP stages
+                api_url = (f"{API_BASE_URL}/api/price?url={encoded_url}&max_retries={max_retries_param}"
+                           f"&fields=price,stock")
                 timeout_value = 180.0 if attempt == 0 else 240.0
                 response = await client.get(api_url, timeout=timeout_value)
 
@@ -275,6 +266,9 @@ async def main():
             writer = csv.writer(csvfile)
             writer.writerow(['id', 'url', 'price'])  # price will be number, 'OUT_OF_STOCK', or empty
     
+    # Expand all short links concurrently before scheduling the scrapes
+    await url_resolver.resolve_many([url for _, url in urls_to_process])
+
     # Create semaphore to limit concurrent requests to 10
     semaphore = asyncio.Semaphore(3)
     # Create lock for CSV writing
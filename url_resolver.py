@@ -0,0 +1,204 @@
+"""
+Async short-URL resolver with a persistent redirect cache.
+
+Affiliate short links (amzn.to, fkrt.cc, bitli.in, msho.in, extp.in, ...)
+used to be resolved by a full browser navigation on every scrape, or by
+blocking ``requests`` calls inside the async engine. The resolver follows
+the redirect chain hop by hop over pooled httpx connections within a total
+timeout budget, and caches the hop chain on disk with a TTL so the same link
+is only expanded once per TTL across runs and processes. A chain that still
+ends on a shortener host (a JS/meta redirect or a challenge page answered
+with 200) is not cached, so the link keeps reaching the browser-side
+redirect handling.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlparse
+
+import httpx
+
+from scrapers.scraper_factory import ScraperFactory
+from state_dir import ensure_parent, state_path
+
+
+REDIRECT_CACHE_PATH = os.getenv('REDIRECT_CACHE_PATH', state_path('redirect_cache.json'))
+REDIRECT_CACHE_TTL = float(os.getenv('REDIRECT_CACHE_TTL', 7 * 24 * 3600))
+RESOLVE_TIMEOUT = float(os.getenv('RESOLVE_TIMEOUT', 10))
+RESOLVE_MAX_HOPS = int(os.getenv('RESOLVE_MAX_HOPS', 10))
+RESOLVE_MAX_CONCURRENT = int(os.getenv('RESOLVE_MAX_CONCURRENT', 20))
+
+RESOLVE_HEADERS = {
+    'User-Agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+}
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+def is_short_url(url: str) -> bool:
+    """Host is a shortener listed in the site registry (selectors.json "site.shorteners")."""
+    return ScraperFactory.sites().is_shortener(urlparse(url).netloc)
+
+
+class RedirectCache:
+    """Hop chains keyed by short URL, persisted as JSON with a TTL per entry."""
+
+    def __init__(self, path: Optional[str] = REDIRECT_CACHE_PATH, ttl: float = REDIRECT_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def get(self, url: str) -> Optional[List[str]]:
+        """Return the cached hop chain (short URL first, final URL last) or None."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if not entry:
+                return None
+            if time.time() - entry['resolved_at'] > self.ttl:
+                del self._entries[url]
+                return None
+            return list(entry['chain'])
+
+    def put(self, url: str, chain: List[str]) -> None:
+        with self._lock:
+            self._entries[url] = {'chain': list(chain), 'resolved_at': time.time()}
+
+    def load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock:
+                self._entries = data.get('entries', {})
+        except Exception as e:
+            print(f"Warning: Could not load redirect cache from {self.path}: {e}")
+
+    def save(self) -> None:
+        """Write the cache atomically, dropping expired entries."""
+        if not self.path:
+            return
+        now = time.time()
+        with self._lock:
+            self._entries = {
+                url: entry for url, entry in self._entries.items()
+                if now - entry['resolved_at'] <= self.ttl
+            }
+            payload = {'version': 1, 'entries': dict(self._entries)}
+        # Unique temp name: Flask request threads may save concurrently
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            ensure_parent(self.path)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Warning: Could not save redirect cache to {self.path}: {e}")
+
+
+class ShortUrlResolver:
+    """Follows short-link redirect chains over pooled connections, with caching."""
+
+    def __init__(self, cache: Optional[RedirectCache] = None, timeout: float = RESOLVE_TIMEOUT,
+                 max_hops: int = RESOLVE_MAX_HOPS, max_concurrent: int = RESOLVE_MAX_CONCURRENT,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Args:
+            cache: Redirect cache (defaults to the persistent REDIRECT_CACHE_PATH store)
+            timeout: Total seconds allowed for resolving one URL, across all hops
+            max_hops: Maximum redirects followed per URL
+            max_concurrent: Concurrent resolutions in resolve_many()
+            transport: Optional httpx transport for the clients the resolver creates
+        """
+        self.cache = cache if cache is not None else RedirectCache()
+        self.timeout = timeout
+        self.max_hops = max_hops
+        self.max_concurrent = max_concurrent
+        self._transport = transport
+
+    def _client(self) -> httpx.AsyncClient:
+        # httpx clients are bound to the event loop they were created on, and
+        # each Flask request thread runs its own loop, so clients are per call.
+        return httpx.AsyncClient(
+            headers=RESOLVE_HEADERS,
+            timeout=self.timeout,
+            follow_redirects=False,
+            limits=httpx.Limits(max_connections=self.max_concurrent),
+            transport=self._transport,
+        )
+
+    async def resolve(self, url: str, client: Optional[httpx.AsyncClient] = None) -> str:
+        """Return the final URL for a short link (unchanged for other URLs or on failure)."""
+        return await self._resolve(url, client, save=True)
+
+    async def resolve_many(self, urls: List[str]) -> List[str]:
+        """Resolve every short link in ``urls`` concurrently over one pooled client."""
+        pending = [url for url in dict.fromkeys(urls) if is_short_url(url) and not self.cache.get(url)]
+        resolved = {}
+        if pending:
+            semaphore = asyncio.Semaphore(self.max_concurrent)
+
+            async def resolve_bounded(url, client):
+                async with semaphore:
+                    return await self._resolve(url, client, save=False)
+
+            async with self._client() as client:
+                finals = await asyncio.gather(*(resolve_bounded(url, client) for url in pending))
+            resolved = dict(zip(pending, finals))
+            self.cache.save()
+
+        return [resolved[url] if url in resolved else await self.resolve(url) for url in urls]
+
+    async def _resolve(self, url: str, client: Optional[httpx.AsyncClient], save: bool) -> str:
+        if not is_short_url(url):
+            return url
+
+        chain = self.cache.get(url)
+        if chain:
+            return chain[-1]
+
+        try:
+            if client is None:
+                async with self._client() as own_client:
+                    chain = await asyncio.wait_for(self._follow(url, own_client), self.timeout)
+            else:
+                chain = await asyncio.wait_for(self._follow(url, client), self.timeout)
+        except Exception as e:
+            print(f"  Failed to resolve short URL {url}: {e!r}")
+            return url
+
+        if is_short_url(chain[-1]):
+            print(f"  Short URL {url} did not redirect over HTTP, leaving it to the browser")
+            return chain[-1]
+        self.cache.put(url, chain)
+        if save:
+            self.cache.save()
+        print(f"  Resolved short URL in {len(chain) - 1} hop(s): {chain[-1][:80]}")
+        return chain[-1]
+
+    async def _follow(self, url: str, client: httpx.AsyncClient) -> List[str]:
+        """Walk the redirect chain hop by hop, unwrapping affiliate destination params."""
+        chain = [url]
+        current = url
+        for _ in range(self.max_hops):
+            unwrapped = ScraperFactory.unwrap_destination_url(current)
+            if unwrapped != current:
+                current = unwrapped
+                chain.append(current)
+
+            response = await client.head(current)
+            if response.status_code in (405, 403) or response.status_code >= 500:
+                # Some shorteners reject HEAD; a streamed GET stops after the headers
+                async with client.stream('GET', current) as streamed:
+                    response = streamed
+            location = response.headers.get('location')
+            if response.status_code not in REDIRECT_STATUSES or not location:
+                break
+            current = urljoin(current, location)
+            chain.append(current)
+        return chain